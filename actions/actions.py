@@ -1,3 +1,6 @@
+import random
+
+
 class Action:
     """ The template for a game action. Every action has an entity that is performing it."""
     def __init__(self, entity):
@@ -14,6 +17,15 @@ class Action:
         """Return the engine this action belongs to."""
         return self.entity.gamemap.engine
 
+    @property
+    def rng(self):
+        """ Returns the random stream for actions (the engine's GameRNG.combat stream).
+            Falls back to the random module when the action isn't part of a game with an engine.
+        """
+        engine = getattr(self.entity.components.get("parent"), "engine", None)
+        game_rng = getattr(engine, "rng", None)
+        return game_rng.combat if game_rng else random
+
     def perform(self):
         """ Perform this action with the objects needed to determine its scope.
 
@@ -67,7 +67,7 @@ class AttackAction(ActionWithDirection):
 
     def roll_hit_die(self):
         """Rolls a 1d20 die to determine if the attacker will land the hit."""
-        return random.randint(1, self.die)
+        return self.rng.randint(1, self.die)
 
     def calc_target_number(self, target):
         """Calculates the target number that the attacker has to roll under to get a successful hit."""
@@ -77,7 +77,7 @@ class AttackAction(ActionWithDirection):
 
         if target.fighter.ac < 0:
             # If the defender has negative AC, choose a number from -1 to their AC
-            defender_ac = -random.randint(1, abs(target.fighter.ac))
+            defender_ac = -self.rng.randint(1, abs(target.fighter.ac))
 
         num = self.target_base + defender_ac + attacker_level
 
@@ -91,15 +91,15 @@ class AttackAction(ActionWithDirection):
         the damage.
         """
         # It's a hit! Calculate the damage
-        dmg = atk.roll_dies()
+        dmg = atk.roll_dies(self.rng)
 
         # Calculate damage reduction from targets AC
-        dmg = self.reduce_dmg(target, dmg)
+        dmg = self.reduce_dmg(target, dmg, self.rng)
         target.fighter.hp -= dmg
         return dmg
 
     @staticmethod
-    def reduce_dmg(target, dmg):
+    def reduce_dmg(target, dmg, rng=random):
         """ Calculates how much damage the defender takes after  factoring in it's AC.
             There is no damage reduction if the defender has 0+ AC.
             If the target has negative AC, calculates how much damage reduction it recieves.
@@ -108,7 +108,7 @@ class AttackAction(ActionWithDirection):
         if target.fighter.ac >= 0:
             return dmg
 
-        dmg_reduced = random.randint(1, abs(target.fighter.ac))
+        dmg_reduced = rng.randint(1, abs(target.fighter.ac))
         result = dmg - dmg_reduced
         if result < 1:
             return 1
@@ -2,7 +2,6 @@ from actions.actions import ActionWithDirection
 from actions.attack_actions import MeleeAttack, WeaponAttack
 from actions.movement_action import MovementAction, WriggleAction
 from src import settings
-import random
 
 
 class BumpAction(ActionWithDirection):
@@ -17,7 +16,7 @@ class BumpAction(ActionWithDirection):
         """
         # Is the actor confused? If so, we'll hijack the destination.
         if "confused" in self.entity.states.states:
-            self.dx, self.dy = random.choice(settings.DIRECTIONS)
+            self.dx, self.dy = self.rng.choice(settings.DIRECTIONS)
 
         if self.target_actor:
             # Does the entity have a weapon?
@@ -14,20 +14,16 @@ class DownStairsAction(Action):
         stair_location = self.dungeon.current_map.downstairs_location
 
         if player_location == stair_location:
-            new_level_generated = False
-
             # Do we have a level below us yet?
             if self.dungeon.dlevel == len(self.dungeon.map_list):
-                # Generate a new level and add it to the map_list
-                self.dungeon.generate_floor()
-                new_level_generated = True
+                # Add the populated level that was built in the background (or build it now).
+                # Monsters are never placed on the upstairs, so the player won't land on top of one.
+                self.dungeon.add_next_floor()
 
             self.dungeon.move_downstairs(self.entity)
 
-            if new_level_generated:
-                # This solves the annoying problem of the player appearing on top of other monsters.
-                # We have to populate after placing the player.
-                self.dungeon.populate_map(self.dungeon.dlevel)
+            # Get the level below the new one ready, it is built while the player explores.
+            self.dungeon.prepare_next_floor()
 
             self.msg = "You descend the stairs."
         else:
@@ -3,7 +3,6 @@ from actions.wait_action import WaitAction
 from actions.movement_action import MovementAction
 from actions.bump_action import BumpAction
 from src import settings, tiles
-import numpy as np
 import tcod
 
 
@@ -46,17 +45,11 @@ class BaseAI(Component):
             If diagonal is 0, the actor will only use cardinal directions.
 
         """
-        # Copy the walkable array.
-        cost = np.array(self.parent.gamemap.tiles["walkable"], dtype=np.int8)
-
-        for entity in self.parent.gamemap.entities:
-            # Check that an enitiy blocks movement and the cost isn't zero (blocking.)
-            if entity.blocks_movement and cost[entity.x, entity.y]:
-                # Add to the cost of a blocked position.
-                # A lower number means more enemies will crowd behind each other in
-                # hallways.  A higher number means enemies will take longer paths in
-                # order to surround the player.
-                cost[entity.x, entity.y] += 10
+        # Copy the walkable array and add to the cost of blocked positions.
+        # A lower number means more enemies will crowd behind each other in
+        # hallways.  A higher number means enemies will take longer paths in
+        # order to surround the player.
+        cost = self.parent.gamemap.movement_cost()
 
         # Create a graph from the cost array and pass that graph to a new pathfinder.
         graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=diagonal)
@@ -70,6 +63,20 @@ class BaseAI(Component):
         # Convert from List[List[int]] to List[Tuple[int, int]].
         return [(index[0], index[1]) for index in path]
 
+    def get_path_downhill(self, distance, diagonal=3):
+        """ Returns a path from the parent's position to the root of a distance field (like the one from
+            GameMap.distance_to_player) by stepping to the lowest neighbor each time. The starting point is not
+            included. If the root can't be reached, this returns an empty list.
+
+            If diagonal is 3, the actor will use diagonal movement.
+            If diagonal is 0, the actor will only use cardinal directions.
+        """
+        start = (self.parent.x, self.parent.y)
+        path = tcod.path.hillclimb2d(distance, start, True, bool(diagonal))[1:].tolist()
+
+        # Convert from List[List[int]] to List[Tuple[int, int]].
+        return [(index[0], index[1]) for index in path]
+
 
 class HostileAI(BaseAI):
     """ Makes monsters aggressively seek out and attack the player. Monsters will only chase
@@ -88,7 +95,9 @@ class HostileAI(BaseAI):
         if self.can_attack(target, dx, dy):
             return BumpAction(self.parent, dx, dy)
 
-        self.path = self.get_path_to(target.x, target.y, self.diagonal)
+        # All the monsters chasing the player share the same distance field.
+        distance = self.parent.gamemap.distance_to_player(self.diagonal)
+        self.path = self.get_path_downhill(distance, self.diagonal)
 
         # Only chase the player if we're under a chase distance threshold.
         if self.path and len(self.path) < self.chase_distance:
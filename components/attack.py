@@ -42,9 +42,9 @@ class Attack:
         """Returns the highest possible damage this can deal."""
         return sum(self.dies)
 
-    def roll_dies(self):
+    def roll_dies(self, rng=random):
         """Rolls all of dice in self.dies, and returns the sum of the results."""
-        return sum(random.randint(1, d) for d in self.dies)
+        return sum(rng.randint(1, d) for d in self.dies)
 
     def to_text(self):
         """Returns a Dnotation representation of the dice."""
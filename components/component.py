@@ -1,3 +1,6 @@
+import copy
+
+
 class Component:
     """Represents a single component that can plug into an entity."""
     # entity: Entity  # Owning entity instance.
@@ -12,3 +15,21 @@ class Component:
     def engine(self):
         """Returns the owning entity's gamemap's engine reference."""
         return self.gamemap.engine
+
+    def clone(self):
+        """ Returns a copy of this component without a parent, so it can be added to a new entity.
+            Attributes holding lists, dicts or sets are copied so the two components don't share them, but
+            other objects (like Attacks) are shared. Components with deeper state should override this.
+        """
+        new_comp = copy.copy(self)
+        for k, v in vars(new_comp).items():
+            if isinstance(v, (list, dict, set)):
+                setattr(new_comp, k, copy.copy(v))
+        new_comp.parent = None
+        return new_comp
+
+    def deep_clone(self):
+        """ Fallback for clone: deepcopies this component, without copying the entity it belongs to."""
+        new_comp = copy.deepcopy(self, memo={id(self.parent): None})
+        new_comp.parent = None
+        return new_comp
@@ -42,7 +42,7 @@ class HealConsumable(Consumable):
     def activate(self, action):
         """Heals the consumer and consumes the entity holding this consumable."""
         consumer = action.entity
-        healing_amount = self.amount + random.randint(1, self.amount)
+        healing_amount = self.amount + action.rng.randint(1, self.amount)
         amount_recovered = consumer.fighter.heal(healing_amount)
 
         if amount_recovered > 0:
@@ -60,7 +60,7 @@ class PoisonConsumable(Consumable):
     def activate(self, action):
         """Poisons the consumer and consumes the entity holding this consumable."""
         consumer = action.entity
-        damage = self.amount + random.randint(1, self.amount)
+        damage = self.amount + action.rng.randint(1, self.amount)
 
         action.msg = f"You consume the {self.parent.name}, and take {damage} damage!"
         consumer.fighter.hp -= damage
@@ -9,20 +9,25 @@ class EnergyComponent(Component):
         component. The standard threshold is 12.
         A refill value of 0 makes the actor a stationary actor, since it will never act.
     """
-    def __init__(self, refill):
+    def __init__(self, refill, rng=random):
         if refill < 0:
             raise ValueError("refill amount must be greater than or equal to 0!")
 
         self.threshold = ENERGY_THRESHOLD  # Standard is 12 for all actors.
         self.refill = refill
 
-        # Start each actor with a random amount of energy so movements
-        # are staggered for like enemies.
-        self.energy = random.randint(0, refill)
+        self.energy = 0
+        self.stagger(rng)
 
-    def add_energy(self):
-        """ Adds the refill amount to the actor's entergy."""
-        self.energy += self.refill
+    def stagger(self, rng=random):
+        """ Start each actor with a random amount of energy so movements
+            are staggered for like enemies.
+        """
+        self.energy = rng.randint(0, self.refill)
+
+    def add_energy(self, turns=1):
+        """ Adds the refill amount to the actor's entergy, once for each turn."""
+        self.energy += self.refill * turns
 
     def burn_turn(self):
         """ Depletes the actor's energy by a turn's amount (standard is 12)"""
@@ -34,3 +39,13 @@ class EnergyComponent(Component):
     def burned_out(self):
         """Returns True if the actor has enough energy for another turn, False otherwise."""
         return self.energy < self.threshold
+
+    def turns_until_ready(self):
+        """ Returns how many more refills the actor needs before it has enough energy for a turn (0 if it
+            already has enough), or None if it will never get enough because it has no refill.
+        """
+        if self.energy >= self.threshold:
+            return 0
+        if self.refill == 0:
+            return None
+        return -(-(self.threshold - self.energy) // self.refill)  # Ceiling division
@@ -20,8 +20,13 @@ class Fighter(Component):
         """Attempts to set the actor's hp to the given value.
         The hp cannot be set above the actor's max_hp or lower than 0.
         """
+        was_dead = self.is_dead()
         self._hp = max(0, min(value, self.max_hp))
 
+        # Let the actor's map know when the actor dies (or is revived) so it can keep track of the living.
+        if was_dead != self.is_dead() and self.parent is not None:
+            self.parent._reindex_comp("fighter")
+
     def hp_full(self):
         return self.hp == self.max_hp
 
@@ -14,6 +14,12 @@ class Inventory(Component, EntityManager):
         # Only accepts entities with the item component
         super().__init__(capacity=capacity, required_comp="item")
 
+    def clone(self):
+        """Returns a copy of the inventory. The items need to be copied too, so this falls back to deep_clone."""
+        if self.is_empty():
+            return Inventory(self.capacity)
+        return self.deep_clone()
+
     def add_inv_item(self, item, qty=0):
         """Adds an item to the inventory. just a wrapper for EntityManager.add_item."""
         return self.add_item(item, qty)
@@ -34,6 +40,10 @@ class PlayerInventory(Component, EntityManager):
         self.letterroll = LetterRoll()
         self.current_letter = self.letterroll.next_letter()
 
+    def clone(self):
+        """Returns a copy of the inventory, with copies of the items and letters (see Component.deep_clone)."""
+        return self.deep_clone()
+
     def add_inv_item(self, item, qty=0):
         """Attempts to add an item to the inventory.
         Returns True if successful, False otherwise.
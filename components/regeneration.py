@@ -15,21 +15,21 @@ class Regeneration(Component):
         """Returns True if the actor is eligible for regeneration this turn, False otherwise."""
         return turns % self.x_turns(level) == 0
 
-    def regen_amt(self, con, level):
+    def regen_amt(self, con, level, rng=random):
         """Calculates the amount of regeneration based on the actor's level and constitution."""
         if level < 10 or con <= 12:
             return 1
         max_gain = level - 9
-        gain = random.randint(1, con)
+        gain = rng.randint(1, con)
         if gain > max_gain:
             return max_gain
         return gain
 
-    def activate(self, turns):
+    def activate(self, turns, rng=random):
         """Determines if the actor is able to regenerate, and if it is, regenerates itself for a
         certain amount.
         """
         level = self.parent.level.current_level
         if self.eligible_for_regen(level, turns):
-            heal_amt = self.regen_amt(self.parent.attributes.constitution, level)
+            heal_amt = self.regen_amt(self.parent.attributes.constitution, level, rng)
             self.parent.fighter.heal(heal_amt)
\ No newline at end of file
@@ -1,4 +1,3 @@
-import copy
 from components.component import Component
 
 
@@ -35,7 +34,7 @@ class StackableComponent(Component):
         if qty > self.size:
             raise ValueError("split_stack received qty greater than stack size!")
 
-        cloned_item = copy.deepcopy(self.parent)
+        cloned_item = self.parent.clone()
         cloned_item.stackable.size = qty
         self.size -= qty
         return cloned_item
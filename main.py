@@ -1,6 +1,7 @@
 import traceback
 import tcod
 import time
+from src import autosave
 from src import color, logger
 from src import exceptions
 from src import handlers
@@ -14,6 +15,7 @@ def main():
     # Our first event handler is the Main Menu handler.
     handler = handlers.MainMenuHandler()
     renderer = rendering.Renderer()
+    autosaver = autosave.Autosaver(settings.save_file, settings.autosave_interval)
 
     # Game loop
     while True:
@@ -28,6 +30,8 @@ def main():
         try:
             engine = getattr(handler, "engine", None)
             if engine:
+                autosaver.update(engine)
+
                 # Handle Behaviors/AI's
                 if engine.player.ai:
                     handle_ai(engine, handler)
@@ -46,8 +50,10 @@ def main():
                 handler = handler.handle_events(event)
 
         except exceptions.QuitWithoutSaving:
+            autosaver.wait()
             raise
         except SystemExit:  # Save and Quit
+            autosaver.wait()
             save_game(handler, settings.save_file)
             raise
         except Exception:  # Handle exceptions in game.
@@ -59,6 +65,7 @@ def main():
                     traceback.format_exc(), color.error
                 )
         except BaseException:  # Save on any other unexpected exception
+            autosaver.wait()
             save_game(handler, settings.save_file)
             raise
 
@@ -0,0 +1,97 @@
+""" Saves the game every so many turns without stalling the game loop. The game is snapshotted on the game's
+thread (pickling the engine and the changed levels, see savefile.snapshot), and the chunks are compressed and
+written on a worker thread. The save file is written next to the old one and renamed over it, so a crash while
+autosaving leaves the last save intact.
+"""
+from . import logger
+from . import savefile
+import concurrent.futures
+import os
+
+log = logger.setup_logger(__name__)
+
+_executor = None
+
+
+def executor():
+    """Returns the worker thread that writes the autosaves, starting it the first time."""
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+    return _executor
+
+
+class Autosaver:
+    """Saves the game to filename every interval turns. An interval of None turns autosaving off."""
+    def __init__(self, filename, interval):
+        self.filename = os.path.abspath(filename)
+        self.interval = interval
+        self.engine = None  # The game being autosaved.
+        self.last_turn = 0  # The turn it was last saved on.
+        self.future = None  # The save being written.
+        self.game_over = False  # The save file has been deleted because the player died.
+
+    @property
+    def writing(self):
+        return self.future is not None and not self.future.done()
+
+    def update(self, engine):
+        """ Called from the game loop. Starts a save if the interval has passed since the last one. Returns True
+            if a save was started. A save isn't started while the last one is still being written, it is
+            tried again next time instead.
+        """
+        if engine is not self.engine:
+            # A new or loaded game, count from where it starts.
+            self.engine = engine
+            self.last_turn = engine.turns
+            self.game_over = False
+
+        if not engine.player.is_alive:
+            if not self.game_over:
+                self.discard()
+                self.game_over = True
+            return False
+
+        if self.interval is None or engine.turns - self.last_turn < self.interval:
+            return False
+        if self.writing:
+            return False
+
+        self.save(engine)
+        return True
+
+    def save(self, engine):
+        """Snapshots the game and queues the snapshot to be written."""
+        chunks, sources, info = savefile.snapshot(engine, self.filename)
+        # Nothing can be reused from the file (or loaded from it by the dungeon) until the new one is written.
+        engine.dungeon.saved_to = None
+        self.last_turn = engine.turns
+        self.future = executor().submit(self.write, engine.dungeon, chunks, sources, info)
+
+    def write(self, dungeon, chunks, sources, info):
+        """Writes a snapshot. This only touches the snapshot, so it is safe to run on the worker."""
+        try:
+            savefile.write(self.filename, chunks, sources, info)
+        except Exception:
+            log.exception(f"Autosave to {self.filename} failed")
+            return False
+
+        dungeon.saved_to = self.filename
+        return True
+
+    def discard(self):
+        """ Deletes the save file when the game is over, so a finished game can't be continued. A save that is
+            still queued is dropped, and one that is being written is waited for first.
+        """
+        if self.future is not None and not self.future.cancel():
+            self.future.result()
+        self.future = None
+
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def wait(self):
+        """Waits for the save being written, if there is one. Returns True if it was written."""
+        if self.future is None:
+            return True
+        return self.future.result()
@@ -0,0 +1,187 @@
+""" Benchmarks for the hot paths of the game: map generation, FOV, pathfinding, monster turns, making entities,
+rendering the map and saving/loading. Everything runs offline with no window, and each benchmark seeds the
+random module and the game's random streams before setting up and before timing, so runs are repeatable and
+comparable between releases.
+
+Results are printed (or written with --output) as JSON so they can be stored and diffed.
+
+Usage: python -m src.benchmark --repeat 5 --number 10 --seed 1 --output results.json
+"""
+from components import ai
+from . import factory
+from . import procgen
+from . import rendering
+from . import settings
+from . import setup_game
+import argparse
+import json
+import numpy as np
+import os
+import platform
+import random
+import statistics
+import tcod
+import tempfile
+import timeit
+
+
+def populated_engine(seed=1):
+    """ Returns a new seeded game with a populated first level. The player is made (nearly) unkillable, so they
+        survive any number of monster turns during a benchmark.
+    """
+    engine = setup_game.new_game(seed)
+    engine.dungeon.pregenerate = False  # No level building in the background while the code is timed.
+    engine.player.fighter.max_hp = 10 ** 9
+    engine.player.fighter.hp = engine.player.fighter.max_hp
+    return engine
+
+
+def setup_generate_map(seed):
+    rng = random.Random(seed)
+    return lambda: procgen.generate_map(
+        max_rooms=settings.max_rooms,
+        room_min_size=settings.room_min_size,
+        room_max_size=settings.room_max_size,
+        map_width=settings.map_width,
+        map_height=settings.map_height,
+        max_distance=50,
+        difficulty=1,
+        rng=rng,
+    )
+
+
+def setup_update_fov(seed):
+    engine = populated_engine(seed)
+    return engine.update_fov
+
+
+def setup_get_path_to(seed):
+    engine = populated_engine(seed)
+    pathfinder = ai.BaseAI()
+    pathfinder.parent = engine.player
+    x, y = engine.game_map.downstairs_location
+    return lambda: pathfinder.get_path_to(x, y)
+
+
+def setup_end_of_turn(seed):
+    engine = populated_engine(seed)
+    return engine.end_of_turn
+
+
+def setup_factory_make(seed):
+    names = ["grid bug", "henchman", "dagger", "healing vial", "money"]
+
+    def make_all():
+        for name in names:
+            factory.make(name)
+    return make_all
+
+
+def setup_render_map(seed):
+    engine = populated_engine(seed)
+    console = tcod.Console(settings.map_width, settings.map_height, order="F")
+    return lambda: rendering.render_map(console, engine.game_map)
+
+
+def save_load_engine(seed, full):
+    """ Returns a function that saves a populated game to a temporary directory and loads it again. If full is
+        True, every call saves the whole game as if to a new file; otherwise the game is saved once beforehand
+        and each call only rewrites what changed since then. The directory is removed by the function's cleanup.
+    """
+    engine = populated_engine(seed)
+    directory = tempfile.TemporaryDirectory(prefix="benchmark_")
+    filename = os.path.join(directory.name, settings.save_file)
+    if not full:
+        engine.save_as(filename)
+
+    def save_load():
+        if full:
+            engine.dungeon.saved_to = None  # Nothing is reused from the last call's file.
+        engine.save_as(filename)
+        setup_game.load_game(filename)
+    save_load.cleanup = directory.cleanup
+    return save_load
+
+
+def setup_save_load(seed):
+    return save_load_engine(seed, full=True)
+
+
+def setup_save_load_delta(seed):
+    return save_load_engine(seed, full=False)
+
+
+# Each benchmark's setup function takes the seed and returns the function that gets timed. If that function has
+# a cleanup attribute, it is called once the timing is done.
+BENCHMARKS = {
+    "generate_map": setup_generate_map,
+    "update_fov": setup_update_fov,
+    "get_path_to": setup_get_path_to,
+    "end_of_turn": setup_end_of_turn,
+    "factory_make": setup_factory_make,
+    "render_map": setup_render_map,
+    "save_load": setup_save_load,
+    "save_load_delta": setup_save_load_delta,
+}
+
+
+def time_benchmark(name, number=10, repeat=5, seed=1):
+    """ Times a single benchmark. The timed function is called number times in a row, and that is repeated
+        repeat times. Returns a dict of the per-call times in seconds.
+    """
+    random.seed(seed)
+    func = BENCHMARKS[name](seed)
+
+    random.seed(seed)
+    try:
+        times = [t / number for t in timeit.Timer(func).repeat(repeat=repeat, number=number)]
+    finally:
+        if hasattr(func, "cleanup"):
+            func.cleanup()
+
+    return {
+        "name": name,
+        "number": number,
+        "repeat": repeat,
+        "best": min(times),
+        "mean": statistics.mean(times),
+        "median": statistics.median(times),
+        "times": times,
+    }
+
+
+def run_benchmarks(names=None, number=10, repeat=5, seed=1):
+    """ Runs the benchmarks (all of them if names is None) and returns the results with some information
+        about the environment they ran in.
+    """
+    names = names if names else list(BENCHMARKS)
+    return {
+        "version": settings.version,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "tcod": tcod.__version__,
+        "seed": seed,
+        "benchmarks": [time_benchmark(name, number, repeat, seed) for name in names],
+    }
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of Lab Hack.")
+    parser.add_argument("--number", type=int, default=10, help="Calls per timing.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timings per benchmark.")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the games and the random module.")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Only run these benchmarks.")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of printing them.")
+    options = parser.parse_args(args)
+
+    results = run_benchmarks(options.only, options.number, options.repeat, options.seed)
+
+    if options.output:
+        with open(options.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+""" Routes the corridors of a map while procgen.generate_map connects its rooms.
+A CorridorRouter is made once the rooms are drawn, and keeps the cost grid for digging (and a mask of the tiles
+corridors must not cross) up to date as corridors are dug, instead of building them again from the tiles for
+every path. One search from a closet finds the nearest of any number of target closets.
+"""
+from . import tiles
+import collections
+import numpy as np
+import tcod
+
+
+class CorridorRouter:
+    """Finds and digs corridors on one map. stats counts the searches, targets, unreachable searches, rejected
+    paths, digs and dug tiles.
+    """
+    def __init__(self, new_map):
+        self.map = new_map
+        self.cost = np.array(new_map.tiles["diggable"], dtype=np.int8)
+
+        # The tiles a corridor must not go through: room corners and inner room floors.
+        self.blocked = new_map.tiles == tiles.room_floor
+        for corner in tiles.room_corners:
+            self.blocked |= new_map.tiles == corner
+
+        self.stats = collections.Counter()
+
+    def valid(self, path):
+        """ Checks that a path doesn't dig out anything important, on the blocked mask. Empty (no path found)
+            and single tile paths are not valid.
+        """
+        if len(path) <= 1:
+            self.stats["rejected"] += 1
+            return False
+
+        xs, ys = zip(*path)
+        if self.blocked[xs, ys].any():
+            self.stats["rejected"] += 1
+            return False
+        return True
+
+    def search(self, start):
+        """Returns the digging distance from start to every tile on the map."""
+        self.stats["searches"] += 1
+        dist = np.full(self.cost.shape, np.iinfo(np.int32).max, dtype=np.int32)
+        dist[start] = 0
+        tcod.path.dijkstra2d(dist, self.cost, cardinal=2, diagonal=0, out=dist)
+        return dist
+
+    def nearest(self, start, targets):
+        """ Finds the target that can be reached by digging the least from start, in a single search.
+            Returns its index in targets and the path to it (start and target included), or (None, []) if none
+            of them can be reached.
+        """
+        self.stats["targets"] += len(targets)
+        dist = self.search(start)
+
+        xs, ys = zip(*targets)
+        target_dist = dist[xs, ys]
+        i = int(np.argmin(target_dist))
+        if target_dist[i] == np.iinfo(dist.dtype).max:
+            self.stats["unreachable"] += 1
+            return None, []
+
+        path = tcod.path.hillclimb2d(dist, targets[i], cardinal=True, diagonal=False)[::-1]
+        return i, [(x, y) for x, y in path.tolist()]
+
+    def path_to(self, start, dest):
+        """Returns the path from start to dest (both included), or an empty list if dest can't be reached."""
+        return self.nearest(start, [dest])[1]
+
+    def dig(self, path):
+        """Digs the path out as floor and updates the cost grid and blocked mask."""
+        if not path:
+            return
+        xs, ys = zip(*path)
+        self.map.tiles[xs, ys] = tiles.floor
+        self.cost[xs, ys] = tiles.floor["diggable"]
+        self.blocked[xs, ys] = False
+        self.stats["digs"] += 1
+        self.stats["dug"] += len(path)
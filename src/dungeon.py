@@ -1,6 +1,10 @@
 from src import factory, db
 from src import settings
+from . import pregen
 from . import procgen
+from . import savefile
+from .rng import GameRNG
+import uuid
 
 
 class Dungeon:
@@ -13,12 +17,24 @@ class Dungeon:
         self.dlevel = 1  # The number of the current floor the player is on.
         self.map_list = []
         self.test_map = test_map  # Just pass a reference to the function.
+        self.next_level = None  # The LevelJob for the level below the bottom one (see pregen.py).
+        self.pregenerate = settings.pregenerate_levels  # Build next_level in the background (see start_next_floor).
+
+        # Levels that may have changed since the game was last saved (see savefile.py). Only the current level
+        # changes during play, so this is every level the player has been on since then, and any new levels.
+        self.changed_levels = set()
+        self.saved_to = None  # The file the game was last saved to.
+        self.game_id = uuid.uuid4().hex  # Tells the save files of this game apart from others.
+        self.level_store = None  # Keeps the levels that aren't in memory (see savefile.LevelStore).
+        # The game's random streams, for building and populating levels.
+        self.rng = getattr(self.engine, "rng", None) or GameRNG()
 
         # Entity factory
         self.entity_factory = factory.EntityFactory(
             entity_dict=db.actor_dict,
             dungeon=self,
-            player=self.engine.player
+            player=self.engine.player,
+            rng=self.rng.spawn,
         )
 
         # Create a first map for the dungeon
@@ -28,33 +44,30 @@ class Dungeon:
         # Set the engine's map ref
         self.engine.game_map = self.current_map
 
+        self.prepare_next_floor()
+
+    def __getstate__(self):
+        """The next level is saved as its LevelJob (its seeds), the level itself gets built again after loading."""
+        state = self.__dict__.copy()
+        state["level_store"] = None
+        return state
+
     @property
     def current_map(self):
         """Returns the floor that the player is currently on."""
         if self.map_list:
-            return self.map_list[self.dlevel - 1]
+            return self.get_map(self.dlevel)
         return None
 
     def generate_floor(self):
         """Generate new map each time we go down a floor. Adds the map to the list of maps and
         returns the created map.
         """
-        if self.test_map:
-            # Easy way to speed up testing with test maps.
-            new_map = self.test_map()  # Generate a new test map each time.
-        else:
-            new_map = procgen.generate_map(
-                max_rooms=settings.max_rooms,
-                room_min_size=settings.room_min_size,
-                room_max_size=settings.room_max_size,
-                map_width=settings.map_width,
-                map_height=settings.map_height,
-                max_distance=50,
-                difficulty=self.dlevel
-            )
+        new_map = self.build_floor(self.dlevel, self.rng.mapgen)
 
         # Add map to list
         self.map_list.append(new_map)
+        self.changed_levels.add(len(self.map_list))
 
         # Add the engine to the map
         new_map.engine = self.engine
@@ -62,6 +75,60 @@ class Dungeon:
         # Return the map for other uses
         return new_map
 
+    def build_floor(self, difficulty, rng):
+        """Builds a new unpopulated map, without adding it to the dungeon."""
+        if self.test_map:
+            # Easy way to speed up testing with test maps.
+            return self.test_map()  # Generate a new test map each time.
+
+        return procgen.generate_map(
+            max_rooms=settings.max_rooms,
+            room_min_size=settings.room_min_size,
+            room_max_size=settings.room_max_size,
+            map_width=settings.map_width,
+            map_height=settings.map_height,
+            max_distance=50,
+            difficulty=difficulty,
+            rng=rng,
+        )
+
+    def prepare_next_floor(self):
+        """ Draws the seeds for the level below this one, if the player is on the bottom level. This happens
+            whether or not the level is built in the background, so a seeded game plays out the same either way.
+            A job that is already preparing that level is kept, a job for an older level that is still waiting
+            in the queue is dropped.
+        """
+        if self.dlevel != len(self.map_list):
+            return
+        if self.next_level:
+            if self.next_level.dlevel == self.dlevel + 1:
+                return
+            self.next_level.cancel()
+        self.next_level = pregen.LevelJob(self, self.dlevel + 1)
+
+    def start_next_floor(self):
+        """ Starts building the prepared level in the background, if it isn't being built already. This is done
+            after the player's turn (see Engine.end_of_turn), so making a game doesn't start a build.
+            Does nothing if pregenerate is off.
+        """
+        if self.pregenerate and self.next_level and not self.next_level.started:
+            self.next_level.start()
+
+    def add_next_floor(self):
+        """ Adds a new populated level to the bottom of the dungeon and returns it. Uses the level built in the
+            background by prepare_next_floor if there is one, otherwise the level is built now.
+        """
+        job = self.next_level
+        if job is None or job.dlevel != len(self.map_list) + 1:
+            job = pregen.LevelJob(self, len(self.map_list) + 1)
+        self.next_level = None
+
+        new_map = job.result()
+        self.map_list.append(new_map)
+        self.changed_levels.add(len(self.map_list))
+        new_map.engine = self.engine
+        return new_map
+
     def populate_map(self, dlevel):
         """Place entities, items, and actors in a new map."""
         # map_to_populate = self.get_map(dlevel)
@@ -75,10 +142,10 @@ class Dungeon:
         # Create a new monster based on difficulty
         new_monster = self.entity_factory.difficulty_specific_monster(self.dlevel, player_level)
         # Place it at a random open spot in the level.
-        x, y = self.current_map.get_random_unoccupied_tile()
+        x, y = self.current_map.get_random_unoccupied_tile(self.rng.spawn)
 
         # Spawn the monster to the current level
-        factory.spawn(new_monster, self.current_map, x, y)
+        factory.spawn(new_monster, self.current_map, x, y, self.rng.spawn)
 
     def move_downstairs(self, entity):
         """Moves the specified entity downstairs to the next upstair."""
@@ -101,6 +168,8 @@ class Dungeon:
 
         # Set the engine's map ref
         self.engine.game_map = self.current_map
+
+        self.evict_levels()
         return True
 
     def move_upstairs(self, entity):
@@ -125,6 +194,7 @@ class Dungeon:
         # Set the engine's map ref
         self.engine.game_map = self.current_map
 
+        self.evict_levels()
         return True
 
     def place_entity(self, entity, map_num, x, y):
@@ -132,20 +202,13 @@ class Dungeon:
         # Returns True if successful, False otherwise.
 
         # Remove the entity from current map
-        if entity in self.current_map.entities:
-            self.current_map.entities.remove(entity)
+        self.current_map.rm_entity(entity)
 
         # Change the dlevel
         self.set_dlevel(map_num)
 
-        # Add the player to the new map
-        self.current_map.entities.add(entity)
-
-        # set the players parent
-        entity.parent = self.current_map
-
-        # Change the entity position
-        entity.x, entity.y = x, y
+        # Add the player to the new map at the new position (this also sets the parent)
+        self.current_map.place(entity, x, y)
 
     def set_dlevel(self, new_dlevel):
         """Sets the number of the current level.
@@ -161,12 +224,28 @@ class Dungeon:
 
         if new_dlevel <= len(self.map_list):
             self.dlevel = new_dlevel
+            self.changed_levels.add(new_dlevel)
             return True
 
         return False
 
+    def evict_levels(self):
+        """ Takes the levels more than settings.resident_levels away from the current one out of memory. They are
+            loaded again by get_map when they are needed.
+        """
+        if settings.resident_levels is None:
+            return
+        if self.level_store is None:
+            self.level_store = savefile.LevelStore(self)
+
+        for dlevel in range(1, len(self.map_list) + 1):
+            if abs(dlevel - self.dlevel) > settings.resident_levels and dlevel not in self.level_store:
+                self.level_store.evict(dlevel)
+
     def get_map(self, dlevel):
-        """Returns the current map."""
+        """Returns the map for the level, loading it back first if it isn't in memory (see evict_levels)."""
+        if self.level_store and dlevel in self.level_store:
+            self.level_store.load(dlevel)
         return self.map_list[dlevel - 1]
 
     # get_map(num)
@@ -3,11 +3,11 @@ from . import dungeon
 from . import exceptions
 from . import gamemap
 from . import messages
+from . import rng
+from . import savefile
+from . import settings
 from actions import actions
 from actions.wait_action import WaitAction
-import lzma
-import pickle
-import random
 import tcod
 
 log = logger.setup_logger(__name__)
@@ -19,9 +19,11 @@ class Engine:
     """
     game_map: gamemap.GameMap
 
-    def __init__(self, player):
+    def __init__(self, player, seed=None):
         # TODO: Remove requirement for player
-        self.msglog = messages.MsgLog()
+        # The game's random streams. This must be set before the dungeon builds its first map.
+        self.rng = rng.GameRNG(seed)
+        self.msglog = messages.MsgLog(settings.msg_capacity, settings.msg_keep_history, settings.msg_saved_history)
         self.helplog = messages.HelpInfo()
         self.mouse_location = (0, 0)
         self.player = player
@@ -31,9 +33,10 @@ class Engine:
 
     def enemy_turns(self):
         """Goes through each actor in the current gamemap (excluding the player) and
-        processes the actions provided by their AI.
+        processes the actions provided by their AI. Actors go in order of their location, so a
+        seeded game always plays out the same way.
         """
-        actors = set(self.game_map.actors) - {self.player}
+        actors = sorted(set(self.game_map.actors) - {self.player}, key=lambda a: a.xy)
         for actor in actors:
             self.handle_actor_turn(actor)
 
@@ -54,6 +57,15 @@ class Engine:
             except exceptions.Impossible:
                 pass  # Ignore impossible action exceptions from AI
 
+    def scheduled_turns(self):
+        """ Processes the turns of the actors that the current map's EnergyScheduler says can act this turn.
+            This does the same work as add_energy and enemy_turns, without touching actors that aren't ready.
+        """
+        scheduler = self.game_map.scheduler
+        for actor in scheduler.ready_actors(self.player):
+            self.handle_actor_turn(actor)
+            scheduler.reschedule(actor)
+
     def add_energy(self):
         """All actors gets an energy reboost!"""
         for entity in self.game_map.actors:
@@ -61,27 +73,11 @@ class Engine:
 
     def update_fov(self):
         """Recompute the visible area based on the players point of view."""
-        transparent_tiles = self.game_map.tiles["transparent"].copy()
-
-        # Account for any entities that block vision
-        blocking_entities = [e for e in self.game_map.entities if e.transparent is False]
-
-        for e in blocking_entities:
-            transparent_tiles[e.x, e.y] = False
-
-        lit_tiles = self.game_map.lit.copy()
-
-        # Scan all entities for light components and add their light to the lit_tiles.
-
-        for e in self.game_map.has_comp("light"):
-            for x, y in e.light.area():
-                # Bounds safety check
-                if not self.game_map.in_bounds(x, y):
-                    continue
-                # Skip room walls
-                if self.game_map.tiles[x, y] in tiles.room_walls:
-                    continue
-                lit_tiles[x, y] = True
+        if settings.incremental_fov:
+            transparent_tiles, lit_tiles = self.game_map.fov_cache.update(self.game_map)
+            lit_tiles = lit_tiles.copy()  # The cache owns these, the lit walls below change lit_tiles.
+        else:
+            transparent_tiles, lit_tiles = self.fov_masks()
 
         # Set the game_map’s visible tiles to the result of the compute_fov.
         # radius is the maximum view distance from pov. If this is zero then the maximum distance is used.
@@ -107,12 +103,10 @@ class Engine:
         )
 
         # Add walls that are in player's fov
-        for x, y in self.game_map.get_visible_tiles():
-            for x, y in self.game_map.lighters.get((x, y), {}):
-                lit_tiles[x, y] = True
+        lit_tiles[self.game_map.lit_walls()] = True
 
         # Remove hidden blockers from visible
-        for e in blocking_entities:
+        for e in self.game_map.opaque:
             if "hidden" in e:
                 self.game_map.visible[e.x, e.y] = False
 
@@ -122,19 +116,51 @@ class Engine:
         # If a tile is "visible" it should be added to "explored".
         self.game_map.explored |= self.game_map.visible
 
+    def fov_masks(self):
+        """ Builds the transparency and lit masks for update_fov from scratch, without using the map's FovCache.
+        :return: A tuple of (transparent_tiles, lit_tiles) arrays.
+        """
+        transparent_tiles = self.game_map.tiles["transparent"].copy()
+
+        # Account for any entities that block vision
+        for e in self.game_map.opaque:
+            transparent_tiles[e.x, e.y] = False
+
+        lit_tiles = self.game_map.lit.copy()
+
+        # Scan all entities for light components and add their light to the lit_tiles.
+        for e in self.game_map.has_comp("light"):
+            for x, y in e.light.area():
+                # Bounds safety check
+                if not self.game_map.in_bounds(x, y):
+                    continue
+                # Skip room walls
+                if self.game_map.tiles[x, y] in tiles.room_walls:
+                    continue
+                lit_tiles[x, y] = True
+
+        return transparent_tiles, lit_tiles
+
     def render(self, renderer):
         """ Render the current GameMap and it's entities to the screen."""
         renderer.render_all(self)
 
-    def save_as(self, filename):
-        """Save this Engine instance as a compressed file."""
-        # pickle serializes an object hierarchy in Python.
-        # lzma compresses the data
+    def __getstate__(self):
+        """The help log is loaded from help.txt again instead of being saved, and the renderer is not saved."""
+        state = self.__dict__.copy()
+        del state["helplog"]
+        state["renderer"] = None
+        return state
 
-        save_data = lzma.compress(pickle.dumps(self))
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.helplog = messages.HelpInfo()
 
-        with open(filename, "wb") as f:
-            f.write(save_data)
+    def save_as(self, filename):
+        """ Save this Engine instance as a compressed file. Each level is saved in its own chunk, and only the
+            levels that changed since the game was last saved to the file are rewritten (see savefile.py).
+        """
+        savefile.save(self, filename)
 
     def check_level(self):
         """Checks the status of the player's experience to see if they qualify for an upgrade."""
@@ -144,7 +170,7 @@ class Engine:
             self.msglog.add_message(f"You advance to level {next_level}!", tcod.light_blue)
 
             # Instead, boost a random stat.
-            choice = random.randint(1, 3)
+            choice = self.rng.combat.randint(1, 3)
             if choice == 1:
                 self.player.level.increase_max_hp()
                 self.msglog.add_message("Your health improves!")
@@ -205,7 +231,7 @@ class Engine:
         """ Creates a random monster in a random valid location on the current map. """
         # 1 out of 70 chance of creating a monster
         CHANCE = 70
-        if random.randint(1, CHANCE) == 1:
+        if self.rng.spawn.randint(1, CHANCE) == 1:
             self.dungeon.summon_random_monster(self.player.level.current_level)
 
     def reduce_timeouts(self):
@@ -225,11 +251,16 @@ class Engine:
         return WaitAction(actor)
 
     def end_of_turn(self):
-        # All actors get an energy recharge every turn
-        self.add_energy()
+        if settings.energy_scheduler:
+            # The player gets their energy recharge, the scheduler handles everyone else's.
+            self.player.energy.add_energy()
+            self.scheduled_turns()
+        else:
+            # All actors get an energy recharge every turn
+            self.add_energy()
 
-        # Once player turn is complete, run the monsters turns.
-        self.enemy_turns()
+            # Once player turn is complete, run the monsters turns.
+            self.enemy_turns()
 
         # If the player leveled up, handle it.
         self.check_level()
@@ -241,7 +272,10 @@ class Engine:
         self.reduce_timeouts()
 
         # Check if player regenerates
-        self.player.regeneration.activate(self.turns)
+        self.player.regeneration.activate(self.turns, self.rng.combat)
+
+        # Build the next level while the player is busy on this one.
+        self.dungeon.start_next_floor()
 
 
 
@@ -44,11 +44,22 @@ class Entity(object):
         raise AttributeError('Entity has no component with attribute {}'.format(name))
 
     def __setattr__(self, key, value):
-        """Sets a component to a value. This should also set the parent of the component."""
+        """Sets a component to a value. This should also set the parent of the component.
+            Changing x or y also lets the parent update its spatial index.
+        """
         if key == 'components':
             super().__setattr__('components', value)
+        elif key == 'x' or key == 'y':
+            old_xy = self.xy
+            self.components[key] = value
+            self._reindex(old_xy)
+        elif key in self.components:
+            self.components[key] = value
+            if key in ('fighter', 'transparent', 'blocks_movement'):
+                self._reindex_comp(key)  # These also decide if the entity is living, opaque or a blocker
         else:
             self.components[key] = value
+            self._reindex_comp(key)  # This is a new component
 
     def __getstate__(self):
         """But if we try to pickle our d instance, we get RecursionError because
@@ -63,6 +74,25 @@ class Entity(object):
         """See comment for __getstate__"""
         self.components = state
 
+    def clone(self):
+        """ Returns a copy of this entity, made by cloning each of its components (see Component.clone).
+            This is much cheaper than a deepcopy, and the copy doesn't have a parent.
+        """
+        new_entity = object.__new__(type(self))  # Skip __init__, we're copying the components directly.
+        new_entity.components = {}
+
+        for k, v in self.components.items():
+            if k == 'parent':
+                v = None
+            elif isinstance(v, Component):
+                v = v.clone()
+                v.parent = new_entity
+            elif isinstance(v, (list, dict, set)):
+                v = copy.copy(v)
+            new_entity.components[k] = v
+
+        return new_entity
+
     def is_similar(self, other):
         """Compares another entity to this one to see if their components and values match.
         The purpose of this method is to enable easy identfication of entities that can stack together so
@@ -84,10 +114,30 @@ class Entity(object):
         """Returns a reference to this entity's parent's gamemap."""
         return self.parent.gamemap
 
+    @property
+    def xy(self):
+        """Returns the entity's location as an (x, y) tuple. Entities without coordinates return (None, None)."""
+        return self.components.get('x'), self.components.get('y')
+
+    def _reindex(self, old_xy):
+        """Tells the parent (if it keeps a spatial index) that this entity moved from old_xy."""
+        reindex = getattr(self.components.get('parent'), 'reindex', None)
+        if reindex and old_xy != self.xy:
+            reindex(self, old_xy)
+
+    def _reindex_comp(self, component):
+        """Tells the parent (if it keeps a component index) that this entity gained or lost a component."""
+        reindex_comp = getattr(self.components.get('parent'), 'reindex_comp', None)
+        if reindex_comp:
+            reindex_comp(self, component)
+
     def add_comp(self, **kwargs):
         """Adds a set of component/value pairs to the collection of components.
             If the component is a valid Component - we also set the parent.
         """
+        old_xy = self.xy
+        new_comps = [k for k in kwargs if k not in self.components]
+
         for k, v in kwargs.items():
             self.components[k] = v
 
@@ -95,6 +145,17 @@ class Entity(object):
             if isinstance(v, Component):
                 v.parent = self
 
+        if 'x' in kwargs or 'y' in kwargs:
+            self._reindex(old_xy)
+
+        for k in new_comps:
+            self._reindex_comp(k)
+
+        # A new fighter or transparency value also decides if the entity is living or opaque.
+        for k in ('fighter', 'transparent'):
+            if k in kwargs and k not in new_comps:
+                self._reindex_comp(k)
+
     def rm_comp(self, component):
         """Removes the specified component from the entity. If it is a valid Component, it also resets the parent.
             Returns True if the operation succeeded, False otherwise.
@@ -106,6 +167,7 @@ class Entity(object):
             if isinstance(component, Component):
                 component.parent = None
 
+            self._reindex_comp(component)
             return True
         return False
 
@@ -121,8 +183,10 @@ class Entity(object):
 
     def move(self, dx, dy):
         # Move the entity by a given amount
-        self.x += dx
-        self.y += dy
+        old_xy = self.xy
+        self.components['x'] += dx
+        self.components['y'] += dy
+        self._reindex(old_xy)  # Only reindex once for the whole move.
 
     def distance(self, x, y):
         """Return the distance between the current entity and the given (x, y) coordinate.
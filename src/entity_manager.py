@@ -1,3 +1,4 @@
+from collections import defaultdict
 from src.entity import Entity
 
 NO_LIMIT = -1
@@ -11,6 +12,25 @@ class EntityManager:
     """
     def __init__(self, required_comp=None, capacity=NO_LIMIT):
         self.entities = set()
+
+        # Spatial index: (x, y) keys and sets of the entities at that location. This lets point queries
+        # skip scanning every entity. It is kept up to date by the add/rm methods here and by Entity
+        # whenever its x or y changes (see reindex).
+        self.locations = defaultdict(set)
+
+        # Component index: component names and the sets of entities that have that component, so has_comp
+        # doesn't have to check every entity. Entity keeps it up to date when components are added or removed.
+        self.comp_index = defaultdict(set)
+
+        # Entities with a fighter component that are still alive. Fighter lets us know when this changes.
+        self.living = set()
+
+        # Entities that block vision (transparent is False), for the FOV calculations.
+        self.opaque = set()
+
+        # Goes up whenever an entity that blocks movement is added, removed or moved, or starts or stops blocking,
+        # so pathfinding caches can tell when the blockers have changed.
+        self.blocker_version = 0
         # REQUIRED_COMPONENTS: item for items, fighter for fighters, etc.
         self.required_comp = required_comp
 
@@ -50,7 +70,7 @@ class EntityManager:
 
         e.parent = self  # Set the parent
 
-        self.entities.add(e)
+        self._add(e)
         return True
 
     def add_item(self, e: Entity, qty: int = 0):
@@ -93,14 +113,14 @@ class EntityManager:
             if qty == e.stackable.size:
                 # Full stack: Just add the reference
                 e.parent = self  # Set the parent
-                self.entities.add(e)  # Add the new stack to the inventory.
+                self._add(e)  # Add the new stack to the inventory.
                 return True
 
             # Split the source stack according to the qty
             print('split stack')
             add_me = e.stackable.split_stack(qty)
             add_me.parent = self  # Set the parent
-            self.entities.add(add_me)  # Add the new stack to the inventory.
+            self._add(add_me)  # Add the new stack to the inventory.
             return True
 
         if self.is_full():  # Can't add if the container is full
@@ -109,7 +129,7 @@ class EntityManager:
         # Not stackable, just add the item as normal.
         e.parent = self  # Set the parent
 
-        self.entities.add(e)
+        self._add(e)
         return True
 
     def add_entities(self, *args):
@@ -120,7 +140,7 @@ class EntityManager:
     def rm_entity(self, e: Entity):
         """ Removes an entity from the set. """
         if e in self.entities:
-            self.entities.remove(e)
+            self._remove(e)
             e.parent = None
             return e
         return None
@@ -144,7 +164,7 @@ class EntityManager:
             if twin:  # Found match we can add the stack to
                 if qty == 0 or qty == twin.stackable.size:
                     # Just return the same object
-                    self.entities.remove(twin)
+                    self._remove(twin)
                     twin.parent = None  # Reset parent.
                     return twin
 
@@ -152,7 +172,7 @@ class EntityManager:
                 result = twin.stackable.split_stack(qty)
 
                 if twin.stackable.size == 0:  # If the stack is empty, remove it.
-                    self.entities.remove(twin)
+                    self._remove(twin)
 
                 result.parent = None  # Reset parent.
                 return result
@@ -181,7 +201,7 @@ class EntityManager:
     def has_comp(self, comp):
         """Searches for entities that contain the specified component and returns a set. """
         # Returns a set of entities that contain the component
-        return {e for e in self.entities if comp in e}
+        return set(self.comp_index.get(comp, ()))
 
     # def has_comps(self, *args):
 
@@ -192,21 +212,61 @@ class EntityManager:
         Example usage: filter("fighter", x=1, y=5)
             Returns all entities that are fighters that are at coordinates (1, 5)
         """
-        entities_copy = self.entities.copy()
+        # When filtering by location or component, only the entities at that location or with the
+        # first component need to be checked.
+        if "x" in kwargs and "y" in kwargs:
+            candidates = self.locations.get((kwargs["x"], kwargs["y"]), ())
+        elif args:
+            candidates = self.comp_index.get(args[0], ())
+        else:
+            candidates = self.entities
+
+        return {
+            e for e in candidates
+            if e.has_compval(**kwargs) and all(comp in e for comp in args)
+        }
+
+    def get_entities_at(self, x, y):
+        """Returns a set of all the entities at the given location."""
+        return set(self.locations.get((x, y), ()))
+
+    def reindex(self, e, old_xy):
+        """ Updates the spatial index for an entity whose coordinates have changed.
+            Entity calls this on its parent when its x or y is set.
+
+        :param e: The entity that moved.
+        :param old_xy: The (x, y) location the entity was indexed under before the move.
+        """
+        if e not in self.entities:
+            return
 
-        for e in self.entities:
-            # Check the component/value pairs passed in as **kwargs
-            if not e.has_compval(**kwargs):
-                entities_copy.remove(e)
-                continue
+        self._unindex(e, old_xy)
+        self.locations[e.xy].add(e)
+        self._blockers_changed(e)
+
+    def reindex_comp(self, e, comp):
+        """ Updates the component index for an entity that gained or lost a component.
+            Entity calls this on its parent when a component is added or removed, and Fighter calls it
+            (through the entity) when the entity dies or comes back to life. Changes to fighter or transparent
+            also update the living and opaque sets.
+
+        :param e: The entity that changed.
+        :param comp: The name of the component that was added or removed.
+        """
+        if e not in self.entities:
+            return
 
-            # Check the components passed in *args
-            for comp in args:
-                if comp not in e:
-                    entities_copy.remove(e)
-                    continue
+        if comp in e:
+            self.comp_index[comp].add(e)
+        else:
+            self._discard(self.comp_index, comp, e)
 
-        return entities_copy
+        if comp == "fighter":
+            self._update_living(e)
+        elif comp == "transparent":
+            self._update_opaque(e)
+        elif comp == "blocks_movement":
+            self.blocker_version += 1
 
     def is_empty(self):
         """ Returns True if the set of entities is empty, False if not."""
@@ -227,11 +287,87 @@ class EntityManager:
         :param e: The entity we want to match.
         :return: The first matching entity we find.
         """
-        # optional x, y args for locating items at coordinates?
-        # raise NotImplementedError()
-        for f in self.entities:
-            # Needs to match name and coordinates to be similar
+        # Needs to match name and coordinates to be similar
+        for f in self.locations.get(e.xy, ()):
             if f.name == e.name:
-                if f.x == e.x and f.y == e.y:
-                    return f
+                return f
         return None
+
+    def rebuild_indexes(self):
+        """Builds the spatial, component, living and opaque indexes again from the entities."""
+        self.locations = defaultdict(set)
+        self.comp_index = defaultdict(set)
+        self.living = set()
+        self.opaque = set()
+        for e in self.entities:
+            self._index(e)
+
+    def _add(self, e):
+        """Adds an entity to the set of entities and the indexes."""
+        self.entities.add(e)
+        self._index(e)
+        self._blockers_changed(e)
+
+    def _index(self, e):
+        """Adds an entity to the indexes."""
+        self.locations[e.xy].add(e)
+
+        for comp in e.components:
+            self.comp_index[comp].add(e)
+        self._update_living(e)
+        self._update_opaque(e)
+
+    def _remove(self, e):
+        """Removes an entity from the set of entities and the indexes."""
+        self.entities.remove(e)
+        self._unindex(e, e.xy)
+
+        for comp in e.components:
+            self._discard(self.comp_index, comp, e)
+        if e in self.living:
+            self.living.remove(e)
+            self._left_living(e)
+        self.opaque.discard(e)
+        self._blockers_changed(e)
+
+    def _unindex(self, e, xy):
+        """Removes an entity from the spatial index at xy, and drops the location if it is now empty."""
+        self._discard(self.locations, xy, e)
+
+    def _update_living(self, e):
+        """Adds or removes the entity from the living set depending on whether it is a live fighter."""
+        if "fighter" in e and not e.fighter.is_dead():
+            if e not in self.living:
+                self.living.add(e)
+                self._joined_living(e)
+        elif e in self.living:
+            self.living.remove(e)
+            self._left_living(e)
+
+    def _joined_living(self, e):
+        """Called when an entity is added to the living set. Subclasses can override this to track the actors."""
+
+    def _left_living(self, e):
+        """Called when an entity dies or leaves and is removed from the living set."""
+
+    def _update_opaque(self, e):
+        """Adds or removes the entity from the opaque set depending on whether it blocks vision."""
+        if e.components.get("transparent") is False:
+            self.opaque.add(e)
+        else:
+            self.opaque.discard(e)
+
+    def _blockers_changed(self, e):
+        """Bumps the blocker version if the entity blocks movement."""
+        if e.components.get("blocks_movement"):
+            self.blocker_version += 1
+
+    @staticmethod
+    def _discard(index, key, e):
+        """Removes an entity from the set at index[key], and drops the key if the set is now empty."""
+        entities = index.get(key)
+        if entities is None:
+            return
+        entities.discard(e)
+        if not entities:
+            del index[key]
@@ -16,7 +16,9 @@ class EntityFactory:
     # TODO: Contains
     # TODO: Needs Player and Dungeon to work properly.
     """
-    def __init__(self, entity_dict, dungeon=None, player=None):
+    def __init__(self, entity_dict, dungeon=None, player=None, rng=random):
+        self.rng = rng  # The random stream for spawning (see GameRNG.spawn)
+
         # We'll create a dict of names and their Entities for easy accessibility
         self.entities = {k: make(k) for k in entity_dict}
         # Don't include the player
@@ -40,110 +42,147 @@ class EntityFactory:
         if len(qualifiers) == 0:
             raise Exception('No valid monsters for difficulty!')
 
-        choice = random.choice(qualifiers)
+        choice = self.rng.choice(qualifiers)
         # return make(choice)
         return choice
 
-    def populate_level(self, dlevel):
-        """Adds monsters, items, traps, and features to the map."""
-        new_map = self.dungeon.get_map(dlevel)
+    def with_rng(self, rng):
+        """Returns a copy of this factory that spawns from another random stream. The copies share the entities."""
+        spawner = copy.copy(self)
+        spawner.rng = rng
+        return spawner
+
+    def populate_level(self, dlevel, new_map=None, player_level=None):
+        """ Adds monsters, items, traps, and features to the map. The map defaults to the dungeon's map for
+            dlevel, and the player level to the player's current level.
+        """
+        if new_map is None:
+            new_map = self.dungeon.get_map(dlevel)
+        if player_level is None:
+            player_level = self.player.level.current_level
+
         for r in new_map.rooms:
             # Populate the room with monsters and items
 
-            self.place_monsters(new_map, r)
+            self.place_monsters(new_map, r, dlevel, player_level)
 
-            if random.random() < .50:
+            if self.rng.random() < .50:
                 # 50% chance of each room having items.
-                self.place_items(new_map, r)
+                self.place_items(new_map, r, dlevel)
 
-            if random.random() < .25:
+            if self.rng.random() < .25:
                 # 25% for each new room to have a trap
                 self.place_traps(new_map, r)
 
             # place secrets
 
-            self.place_money(new_map, r)
+            self.place_money(new_map, r, dlevel)
 
-    def place_items(self, new_map, new_room):
+    def place_items(self, new_map, new_room, dlevel):
         """Places a random amount of items in the new room."""
-        max_items = get_max_value_for_floor(settings.max_items_by_floor, self.dungeon.dlevel)
-        number_of_items = random.randint(0, max_items)
+        max_items = get_max_value_for_floor(settings.max_items_by_floor, dlevel)
+        number_of_items = self.rng.randint(0, max_items)
 
         items = get_entities_at_random(
-            db.item_chances, number_of_items, self.dungeon.dlevel
+            db.item_chances, number_of_items, dlevel, self.rng
         )
 
         for entity in items:
-            x, y = new_room.random_point_inside()
+            x, y = new_room.random_point_inside(self.rng)
             # We don't care if they stack on the map
-            spawn(entity, new_map, x, y)
+            spawn(entity, new_map, x, y, self.rng)
 
-    def place_monsters(self, new_map, new_room):
+    def place_monsters(self, new_map, new_room, dlevel, player_level):
         """Places a random amount of monsters in the new room."""
-        new_monster = self.difficulty_specific_monster(
-            self.dungeon.dlevel,
-            self.player.level.current_level
-        )
+        new_monster = self.difficulty_specific_monster(dlevel, player_level)
 
         # Test insertion area
         # new_monster = "brown mold"
 
-        x, y = new_room.random_point_inside()
+        x, y = new_room.random_point_inside(self.rng)
 
         # Don't spawn them on top of each other.
         not_occupied = not new_map.get_actor_at(x, y)
         not_upstairs = new_map.upstairs_location != (x, y)
         if not_occupied and not_upstairs:
-            spawn(new_monster, new_map, x, y)
+            spawn(new_monster, new_map, x, y, self.rng)
 
     def place_traps(self, new_map, new_room):
         """Places a random amount of traps in the new room."""
-        x, y = new_room.random_point_inside()
+        x, y = new_room.random_point_inside(self.rng)
 
         # No traps on stairs!
         if not new_map.tiles[x][y] in [tiles.up_stairs, tiles.down_stairs]:
             # Choose a random dungeon feature/trap
-            new_trap = make(random.choice(list(db.dungeon_features.keys())))
+            new_trap = make(self.rng.choice(list(db.dungeon_features.keys())), self.rng)
             new_map.place(new_trap, x, y)
 
-    def place_money(self, new_map, new_room):
+    def place_money(self, new_map, new_room, dlevel):
         """Places a random amount of money in the new room."""
-        x, y = new_room.random_point_inside()
+        x, y = new_room.random_point_inside(self.rng)
         # 1d10 * level for the amount of the pile?
-        money_pile = make("money")
-        money_max = (self.dungeon.dlevel ** 2) * 10
+        money_pile = make("money", self.rng)
+        money_max = (dlevel ** 2) * 10
         money_min = int(money_max * .1)
-        money_pile.stackable.size = random.randint(money_min, money_max)
+        money_pile.stackable.size = self.rng.randint(money_min, money_max)
 
         new_map.place(money_pile, x, y)
 
 
-def make(entity_name):
-    """Generates entities from the db.py database of entities."""
+class PrototypeRegistry:
+    """ Builds each entity in the db.py database once, and keeps it as a prototype. New entities are made by
+        cloning the prototype (see Entity.clone), which is much cheaper than building and deepcopying a new
+        entity every time one is spawned.
+    """
+    def __init__(self):
+        self.prototypes = {}
+
+    def get(self, entity_name):
+        """Returns the prototype for the entity, building it the first time it is asked for."""
+        if entity_name not in self.prototypes:
+            self.prototypes[entity_name] = build(entity_name)
+        return self.prototypes[entity_name]
+
+    def make(self, entity_name):
+        """Returns a new copy of the specified entity, cloned from its prototype."""
+        return self.get(entity_name).clone()
+
+
+prototypes = PrototypeRegistry()
+
+
+def make(entity_name, rng=None):
+    """ Generates entities from the db.py database of entities.
+        If a random stream is passed in, actors get a random starting energy from it, so spawning is
+        reproducible for a seeded game.
+    """
+    if settings.entity_prototypes:
+        new_entity = prototypes.make(entity_name)
+    else:
+        new_entity = build(entity_name)
+
+    if rng and "energy" in new_entity:
+        new_entity.energy.stagger(rng)
+    return new_entity
+
+
+def build(entity_name):
+    """ Builds a new entity from scratch from the db.py database of entities. This deepcopies the whole
+        entity, so make uses it to build each prototype once, or as a fallback if prototypes are turned off.
+    """
     # Returns a new copy of the specified entity.
     if entity_name in db.actor_dict:
         # Create an Actor entity
-        components = db.actor_dict.get(entity_name)
-        components['name'] = entity_name
+        components = {**db.actor_dict[entity_name], 'name': entity_name}
         return copy.deepcopy(Actor(**components))
 
-        # Add the components common to all actors
-        # components.update(db.actor_components)
-        # Add the name component
-        # components['name'] = entity_name
-        # return Entity(**components)
-        # return copy.deepcopy(db.actor_dict[entity_name])
-
     if entity_name in db.item_dict:
         # Create an Item entity
-        components = db.item_dict.get(entity_name)
-        components['name'] = entity_name
+        components = {**db.item_dict[entity_name], 'name': entity_name}
         return copy.deepcopy(Item(**components))
 
-        # return copy.deepcopy(db.item_dict[entity_name])
     if entity_name in db.dungeon_features:
-        components = db.dungeon_features.get(entity_name)
-        components['name'] = entity_name
+        components = {**db.dungeon_features[entity_name], 'name': entity_name}
         return copy.deepcopy(Entity(**components))
 
     if entity_name == "money":
@@ -155,11 +194,11 @@ def make(entity_name):
     raise ValueError(f"'{entity_name}' is not a valid Entity!")
 
 
-def spawn(entity_name, gamemap, x, y):
+def spawn(entity_name, gamemap, x, y, rng=None):
     """Spawn a copy of the entity at the given map and location.
     Returns the instance of the entity.
     """
-    e = make(entity_name)
+    e = make(entity_name, rng)
     gamemap.place(e, x, y)
     return e
 
@@ -178,7 +217,7 @@ def get_max_value_for_floor(weighted_chances_by_floor, floor):
     return current_value
 
 
-def get_entities_at_random(weighted_chances_by_floor, number_of_entities, floor):
+def get_entities_at_random(weighted_chances_by_floor, number_of_entities, floor, rng=random):
     """ This function goes through they keys (floor numbers) and values (list of
         weighted entities), stopping when the key is higher than the given floor
         number. It sets up a dictionary of the weights for each entity, based on
@@ -207,7 +246,7 @@ def get_entities_at_random(weighted_chances_by_floor, number_of_entities, floor)
     entities = list(entity_weighted_chances.keys())
     entity_weighted_chance_values = list(entity_weighted_chances.values())
 
-    chosen_entities = random.choices(
+    chosen_entities = rng.choices(
         entities, weights=entity_weighted_chance_values, k=number_of_entities
     )
 
@@ -0,0 +1,71 @@
+""" Caching for the field of view and lighting calculations in Engine.update_fov. """
+from . import tiles
+import numpy as np
+
+
+class FovCache:
+    """ Keeps the transparency and lit masks that Engine.update_fov starts from, so they are only rebuilt when
+        something that affects them changes:
+            * The map's transparent tiles or lit array change (ex: a hidden door is revealed).
+            * An entity that blocks vision is added, removed or moves.
+            * A light is added, removed, moves or changes radius.
+        The masks are built with array operations instead of looping over the map cells in Python.
+    """
+    def __init__(self):
+        # Snapshots of the map arrays the masks were built from.
+        self.base_transparent = None
+        self.base_lit = None
+
+        self.room_walls = None  # Room wall tiles, which entity lights never light up.
+
+        # What the masks were built from: (entity, x, y) for blockers and (entity, x, y, radius) for lights.
+        self.opaque_key = None
+        self.light_key = None
+
+        self.transparent = None
+        self.lit = None
+
+    def update(self, game_map):
+        """ Returns the (transparent, lit) masks for the current state of the map, only rebuilding what changed.
+            The arrays belong to the cache, so they must be copied before they are modified.
+        """
+        tiles_changed = not np.array_equal(self.base_transparent, game_map.tiles["transparent"])
+        if tiles_changed:
+            self.base_transparent = game_map.tiles["transparent"].copy()
+            self.room_walls = np.isin(game_map.tiles, tiles.room_walls)
+
+        lit_changed = not np.array_equal(self.base_lit, game_map.lit)
+        if lit_changed:
+            self.base_lit = game_map.lit.copy()
+
+        # Account for any entities that block vision
+        opaque_key = {(e, e.x, e.y) for e in game_map.opaque}
+        if tiles_changed or opaque_key != self.opaque_key:
+            self.transparent = self.base_transparent.copy()
+            for e, x, y in opaque_key:
+                self.transparent[x, y] = False
+            self.opaque_key = opaque_key
+
+        # Add the light from every entity with a light component, skipping room walls.
+        light_key = {(e, e.x, e.y, e.light.radius) for e in game_map.has_comp("light")}
+        if tiles_changed or lit_changed or light_key != self.light_key:
+            self.lit = self.base_lit.copy()
+            for e, x, y, radius in light_key:
+                area = light_area(game_map, x, y, radius)
+                if area:
+                    self.lit[area] |= ~self.room_walls[area]
+            self.light_key = light_key
+
+        return self.transparent, self.lit
+
+
+def light_area(game_map, x, y, radius):
+    """ Returns the square area lit by a light at x, y as a 2D array index, clipped to the map bounds.
+        Returns None if none of the area is on the map.
+    """
+    x1, x2 = max(x - radius, 0), min(x + radius + 1, game_map.width)
+    y1, y2 = max(y - radius, 0), min(y + radius + 1, game_map.height)
+
+    if x1 >= x2 or y1 >= y2:
+        return None
+    return slice(x1, x2), slice(y1, y2)
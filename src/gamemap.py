@@ -1,10 +1,16 @@
 from . import settings, utils
 from . import tiles
+from .fov import FovCache
+from .scheduler import EnergyScheduler
 from .entity import Entity
 from .entity_manager import EntityManager
 from .room import Room
 import numpy as np
 import random
+import tcod
+
+# The EntityManager indexes, which GameMap doesn't save.
+INDEXES = ("locations", "comp_index", "living", "opaque")
 
 
 class GameMap(EntityManager):
@@ -21,6 +27,7 @@ class GameMap(EntityManager):
         self.upstairs_location = (-1, -1)
         self.room_coords = None
         self.dlevel = dlevel  # difficulty level
+        self.profile = None  # How the map was generated, if it was profiled (see mapprofile.py).
 
         # create a 2D array, filled with the same values: walls.
         self.tiles = np.full((width, height), fill_value=fill_tile, order="F")
@@ -34,7 +41,70 @@ class GameMap(EntityManager):
         # Track which tiles are light
         self.lit = np.full((width, height), fill_value=False, order="F")
 
-        self.lighters = {}  # Tracks floor tiles which "light up" adjacent walls.
+        # Tracks floor tiles which "light up" adjacent walls. Each column is (floor x, floor y, wall x, wall y),
+        # so all the walls next to visible floors can be lit with a couple of array operations.
+        self.lighters = np.zeros((4, 0), dtype=np.int16)
+
+        # Distance-to-player fields shared by all the monsters chasing the player, keyed by the diagonal
+        # movement cost. See distance_to_player.
+        self.player_distances = {}
+
+        # Transparency and light masks for Engine.update_fov, rebuilt only when something changes.
+        self.fov_cache = FovCache()
+
+        # Decides which actors can act each turn when settings.energy_scheduler is on.
+        self.scheduler = EnergyScheduler()
+
+    def __getstate__(self):
+        """ Saves the map compactly:
+                * The tiles are saved as a palette and an index array (see tiles.pack).
+                * The explored and lit arrays are packed into bits.
+                * visible isn't saved, the next FOV update rebuilds it. Neither are the FOV cache, the distance
+                  fields and the room coordinates, which are rebuilt when they are needed.
+                * The entity indexes (see EntityManager) aren't saved, they are rebuilt from the entities (see
+                  __getattr__).
+        """
+        state = self.__dict__.copy()
+        state["tiles"] = tiles.pack(self.tiles)
+        state["explored"] = np.packbits(self.explored.ravel(order="F"))
+        state["lit"] = np.packbits(self.lit.ravel(order="F"))
+        for name in ("visible", "fov_cache", "player_distances", "room_coords") + INDEXES:
+            state.pop(name, None)  # The indexes may not have been rebuilt since the map was loaded.
+        return state
+
+    def __setstate__(self, state):
+        if "visible" in state:
+            # Saved before maps were packed (and before the indexes and caches they now keep were added).
+            raise ValueError("This save was made by an older version of Lab Hack and can't be loaded.")
+        self.__dict__.update(state)
+        shape = (self.width, self.height)
+
+        self.tiles = tiles.unpack(*state["tiles"], shape)
+        self.explored = unpack_bools(state["explored"], shape)
+        self.lit = unpack_bools(state["lit"], shape)
+        self.visible = np.full(shape, fill_value=False, order="F")
+
+        self.fov_cache = FovCache()
+        self.player_distances = {}
+        self.room_coords = self.room_coordinates() if self.rooms else None
+
+    def __getattr__(self, name):
+        """ The entity indexes aren't saved, so they are rebuilt the first time one is used after loading. By
+            then the entities are loaded too, which isn't always so in __setstate__ (when the map is loaded
+            through one of its entities).
+        """
+        if name in INDEXES and "entities" in self.__dict__:
+            self.rebuild_indexes()
+            return self.__dict__[name]
+        raise AttributeError(f"'GameMap' object has no attribute '{name}'")
+
+    def _joined_living(self, e):
+        """New actors are handed to the scheduler."""
+        self.scheduler.add(e)
+
+    def _left_living(self, e):
+        """Actors that die or leave the map are dropped from the scheduler right away."""
+        self.scheduler.remove(e)
 
     @property
     def gamemap(self):
@@ -47,12 +117,12 @@ class GameMap(EntityManager):
     @property
     def actors(self):
         """ Iterate over this maps living actors."""
-        yield from (e for e in self.has_comp("fighter") if e.is_alive)
+        yield from list(self.living)  # Copy, in case an actor dies or leaves while iterating.
 
     @property
     def items(self):
         """ Iterate over this maps items."""
-        yield from (e for e in self.has_comp("item"))
+        yield from self.has_comp("item")
 
     def in_bounds(self, x, y):
         """Returns True if x and y are inside of the bounds of this map."""
@@ -70,11 +140,7 @@ class GameMap(EntityManager):
         if not self.in_bounds(x, y) or not self.visible[x, y]:
             return ""
         # Filter out hidden
-        entities = [e for e in self.entities if e.x == x and e.y == y]
-        names = [str(e) for e in entities if "hidden" not in e]
-
-        # Testig this...
-        # names = [str(e) for e in self.filter(x=x, y=y) if "hidden" not in e]
+        names = [str(e) for e in self.get_entities_at(x, y) if "hidden" not in e]
 
         # Format nicely, the sort makes it easier to test.
         sorted_names = sorted(n.capitalize() for n in names)
@@ -172,38 +238,6 @@ class GameMap(EntityManager):
             return False
         return True
 
-    def get_nearest_unconnected_room(self, room):
-        """ Searches from the center of a room to find the next nearest room. Only returns
-        the found room if it is unconnected to the source room. Uses tiles_around to look
-        for a tiles that belong to rooms and keeps pushing outward until we find a room that
-        is not connected to this room.
-
-        :param room: The room to start searching from
-        :return: A room if we are able to find one, or None.
-        """
-        x, y = room.center
-
-        min_radius = 3  # Required to create the minimum sized Rect.
-
-        for r in range(min_radius, self.height):
-            # Get all the tiles in the new radius
-            surrounding_tiles = self.tiles_around(x, y, r)
-
-            for st in surrounding_tiles:
-                # Check each tile and see if it belongs to a room.
-                result = self.room_coords.get(st)
-                if not result:
-                    continue
-                # Make sure it's not the same room we are looking out from.
-                if room.label == result.label:
-                    continue
-                # Make sure it's not connected to this room already.
-                if result.label in room.connections:
-                    continue
-
-                # Passed all checks!
-                return result
-
     def on_edge_of_map(self, x, y):
         """ Checks if a coordinate is on the edge of the map perimeter.
         returns True if it is, False otherwise.
@@ -215,7 +249,7 @@ class GameMap(EntityManager):
 
         return False
 
-    def get_random_unoccupied_tile(self):
+    def get_random_unoccupied_tile(self, rng=random):
         """ Attempts to find a tile on the map that is open for an actor to occupy - so it must
         be walkable and non-occupied by any other actors or blocking entities.
 
@@ -226,7 +260,7 @@ class GameMap(EntityManager):
                   for y in range(self.height) if self.walkable(x, y)]
 
         while floors:
-            result = random.choice(floors)
+            result = rng.choice(floors)
             if not self.get_actor_at(*result):
                 return result
             floors.remove(result)
@@ -241,8 +275,8 @@ class GameMap(EntityManager):
     def get_actor_at(self, x, y):
         """ Looks for an actor at the given coordinates and returns it if it exists. """
         # Returns an ALIVE actor at the specified location.
-        for a in self.actors:
-            if a.x == x and a.y == y:
+        for a in self.locations.get((x, y), ()):
+            if "fighter" in a and a.is_alive:
                 return a
         return None
 
@@ -261,4 +295,56 @@ class GameMap(EntityManager):
         return False
 
     def get_visible_tiles(self):
-        return {(x, y) for x in range(self.width) for y in range(self.height) if self.visible[x, y]}
+        return {(x, y) for x, y in np.argwhere(self.visible).tolist()}
+
+    def lit_walls(self):
+        """ Returns the coordinates of the room walls lit up by the currently visible floor tiles, as an
+            (x array, y array) tuple for indexing.
+        """
+        floor_x, floor_y, wall_x, wall_y = self.lighters
+        lights_on = self.visible[floor_x, floor_y]
+        return wall_x[lights_on], wall_y[lights_on]
+
+    def movement_cost(self):
+        """ Returns a cost array for pathfinding across this map. Walkable tiles cost 1 and everything else is
+            0 (blocked). Tiles with an entity that blocks movement cost 10 more, so actors will path around
+            each other instead of crowding behind each other in hallways.
+        """
+        cost = np.array(self.tiles["walkable"], dtype=np.int8)
+
+        for entity in self.entities:
+            # Check that an entity blocks movement and the cost isn't zero (blocking.)
+            if entity.blocks_movement and cost[entity.x, entity.y]:
+                cost[entity.x, entity.y] += 10
+        return cost
+
+    def distance_to_player(self, diagonal=3):
+        """ Returns a Dijkstra distance field with the player as the root. Every monster chasing the player
+            can walk downhill on the same field (see BaseAI.get_path_downhill), so we only need one search
+            per turn instead of one search per monster.
+
+            The field is rebuilt when the turn changes, the player moves or the blockers change (see
+            EntityManager.blocker_version), so monsters acting later in a turn path around the ones that moved.
+
+        :param diagonal: The cost of diagonal moves: 3 allows diagonal movement, 0 is cardinal-only movement.
+        :return: A numpy array of distances, the same shape as the map.
+        """
+        player = self.engine.player
+        key = (self.engine.turns, player.x, player.y, self.blocker_version)
+
+        cached = self.player_distances.get(diagonal)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        distance = tcod.path.maxarray((self.width, self.height), order="F")
+        distance[player.x, player.y] = 0
+        tcod.path.dijkstra2d(distance, self.movement_cost(), 2, diagonal)
+
+        self.player_distances[diagonal] = (key, distance)
+        return distance
+
+
+def unpack_bools(packed, shape):
+    """Rebuilds a 2D bool array packed with np.packbits (in F order)."""
+    count = shape[0] * shape[1]
+    return np.unpackbits(packed, count=count).astype(bool).reshape(shape, order="F")
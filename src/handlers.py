@@ -8,7 +8,7 @@ from . import settings
 from .input_keys import MOVE_KEYS, WAIT_KEYS, CURSOR_Y_KEYS, CONFIRM_KEYS
 from .maze import Maze
 from .setup_game import load_game, new_game
-from src import procgen
+from src import mapbatch
 from typing import Union
 import actions.actions
 import actions.bump_action
@@ -19,6 +19,7 @@ import actions.equip_action
 import actions.pickup_action
 import actions.wait_action
 import actions.search_action
+import concurrent.futures
 import os
 import tcod
 import tcod.event
@@ -222,8 +223,8 @@ class MainGameHandler(EventHandler):
 class GameOverHandler(EventHandler):
     def on_quit(self):
         """Handle exiting out of a finished game."""
-        if os.path.exists("../savegame.sav"):
-            os.remove("../savegame.sav")  # Deletes the active save file.
+        if os.path.exists(settings.save_file):
+            os.remove(settings.save_file)  # Deletes the active save file.
 
         raise exceptions.QuitWithoutSaving()  # Avoid saving a finished game.
 
@@ -246,7 +247,7 @@ class HistoryHandler(EventHandler):
 
     def __init__(self, engine):
         super().__init__(engine)
-        self.log_length = len(engine.msglog.messages)
+        self.log_length = len(engine.msglog)
         self.cursor = self.log_length - 1
 
     def on_render(self, renderer):
@@ -560,20 +561,42 @@ class MapDebugHandler(BaseEventHandler):
         self.maze_path_width = 1
         self.map_func = self.generate_map
         self.mode = ''
+        self.show_profile = False  # Show how each map was generated (see mapprofile.py), toggled with P.
+
+        # Maps are generated in parallel batches (one per core), so flipping through them is instant.
+        self.batch_size = os.cpu_count() or 1
+        self.batch = []
+        self.batch_options = None
+        self.executor = None  # Started with the first batch and kept until the handler is left.
+
         self.map = self.map_func()  # Do this last!
 
     def generate_map(self):
+        """ Returns the next map from the current batch. A new batch is generated when the batch is used up or
+            when the options have changed.
+        """
         self.mode = "ROOMS & CORRIDORS"
-        # Generate a new map
-        return procgen.generate_map(
+        options = mapbatch.map_options(
             max_rooms=self.max_rooms,
             room_min_size=self.room_min_size,
             room_max_size=self.room_max_size,
-            map_width=settings.map_width,
-            map_height=settings.map_height,
             max_distance=self.room_max_distance,
         )
 
+        if not self.batch or options != self.batch_options:
+            if self.executor is None:
+                self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.batch_size)
+            self.batch = mapbatch.generate_maps(self.batch_size, profile=True, executor=self.executor, **options)
+            self.batch_options = options
+
+        return self.batch.pop()
+
+    def shutdown(self):
+        """Stops the worker processes, if any were started."""
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
     def generate_maze(self):
         self.mode = "MAZE"
         fitted_width, fitted_height = Maze.dimensions_to_fit(
@@ -605,6 +628,10 @@ class MapDebugHandler(BaseEventHandler):
             maze_path=self.maze_path_width,
         )
 
+        profile = getattr(self.map, "profile", None)
+        if self.show_profile and profile:
+            rendering.render_map_profile(renderer.root, profile)
+
     def ev_keydown(self, event):
         """Any key returns to the parent handler."""
         key = event.sym
@@ -628,11 +655,15 @@ class MapDebugHandler(BaseEventHandler):
                 return
 
         elif key == tcod.event.K_ESCAPE:
+            self.shutdown()
             return self.parent
         elif key == tcod.event.K_1:
             self.map_func = self.generate_map
         elif key == tcod.event.K_2:
             self.map_func = self.generate_maze
+        elif key == tcod.event.K_p:
+            self.show_profile = not self.show_profile
+            return  # Keep the same map.
 
         elif key == tcod.event.K_UP:
             self.room_max_size += 1
@@ -741,7 +772,7 @@ class HelpHandler(HistoryHandler):
 
     def __init__(self, engine):
         super().__init__(engine)
-        self.log_length = len(engine.helplog.messages)
+        self.log_length = len(engine.helplog)
         self.cursor = self.log_length - 1
 
     def on_render(self, renderer):
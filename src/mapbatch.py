@@ -0,0 +1,103 @@
+""" Generates batches of seeded maps across a pool of worker processes.
+procgen.generate_map is pure CPU work, so building a corpus of maps (for testing, balancing or browsing them in
+the MapDebugHandler) goes about as many times faster as there are cores. Each map is built from its own seed,
+so a batch can always be rebuilt exactly, no matter how many workers built it.
+
+Usage: python -m src.mapbatch --count 100 --seed 1 --output maps.xz
+"""
+from . import mapprofile
+from . import procgen
+from . import settings
+import argparse
+import concurrent.futures
+import lzma
+import pickle
+import random
+
+
+def map_options(**kwargs):
+    """ Returns the keyword arguments for procgen.generate_map, using the same defaults as Dungeon.generate_floor
+        for anything that isn't passed in.
+    """
+    options = dict(
+        max_rooms=settings.max_rooms,
+        room_min_size=settings.room_min_size,
+        room_max_size=settings.room_max_size,
+        map_width=settings.map_width,
+        map_height=settings.map_height,
+        max_distance=50,
+        difficulty=1,
+    )
+    options.update(kwargs)
+    return options
+
+
+def generate_seeded_map(seed, options, profile=False):
+    """ Generates a single map from its own random stream. This runs in the worker processes. If profile is
+        True, the map comes back with its MapProfile.
+    """
+    map_profile = mapprofile.MapProfile() if profile else None
+    return procgen.generate_map(**options, rng=random.Random(seed), profile=map_profile)
+
+
+def generate_maps(count, seed=None, workers=None, profile=False, executor=None, **kwargs):
+    """ Generates count maps and returns them as a list of GameMaps, in seed order.
+
+    :param count: The number of maps to generate.
+    :param seed: Map i is generated with seed + i. If this is None, each map gets a random seed.
+    :param workers: The number of worker processes (None uses one per core). 1 generates the maps in this
+        process, which is useful when processes are not available.
+    :param profile: Profile each map (see mapprofile.py).
+    :param executor: A ProcessPoolExecutor to generate the maps in, so callers that generate many batches can
+        keep one pool around. If this is None, a pool of workers processes is started for this batch only.
+    :param kwargs: Options for procgen.generate_map (see map_options).
+    """
+    if seed is None:
+        seeds = [random.randrange(2 ** 32) for _ in range(count)]
+    else:
+        seeds = [seed + i for i in range(count)]
+
+    options = map_options(**kwargs)
+
+    if executor is not None:
+        return list(executor.map(generate_seeded_map, seeds, [options] * count, [profile] * count))
+
+    if workers == 1:
+        return [generate_seeded_map(s, options, profile) for s in seeds]
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(generate_seeded_map, seeds, [options] * count, [profile] * count))
+
+
+def save_maps(maps, filename):
+    """Saves a list of maps as a pickled, lzma compressed file."""
+    with open(filename, "wb") as f:
+        f.write(lzma.compress(pickle.dumps(maps)))
+
+
+def load_maps(filename):
+    """Loads a list of maps saved with save_maps."""
+    with open(filename, "rb") as f:
+        return pickle.loads(lzma.decompress(f.read()))
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Generate a batch of Lab Hack maps in parallel.")
+    parser.add_argument("--count", type=int, default=10, help="Number of maps to generate.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the first map.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core).")
+    parser.add_argument("--difficulty", type=int, default=1, help="Dungeon level of the maps.")
+    parser.add_argument("--output", help="Save the maps to this file.")
+    options = parser.parse_args(args)
+
+    maps = generate_maps(options.count, options.seed, options.workers, difficulty=options.difficulty)
+
+    for i, m in enumerate(maps):
+        print(f"Map {i}: rooms={len(m.rooms)} doors={len(m.doors)}")
+
+    if options.output:
+        save_maps(maps, options.output)
+
+
+if __name__ == "__main__":
+    main()
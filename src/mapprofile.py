@@ -0,0 +1,115 @@
+""" Profiles map generation. Passing a MapProfile to procgen.generate_map records the wall time of each stage of
+building the map, and counts of what each stage did: room tries and rejections, door pairs scored and tried,
+L-path corridors versus routed fallbacks, tiles dug and the hidden features added. Without one, generate_map
+records nothing.
+
+The profile ends up in GameMap.profile, which the MapDebugHandler shows next to the map. Running this module
+profiles a batch of seeded maps and prints the totals and the average per map.
+
+Usage: python -m src.mapprofile --count 100 --seed 1 --workers 4
+"""
+from . import mapbatch
+import argparse
+import collections
+import contextlib
+import time
+
+
+class MapProfile:
+    """The time spent in each stage of generating one or more maps, and the counts of what was done."""
+    def __init__(self):
+        self.maps = 1  # The number of maps this profile covers (see merge).
+        self.times = {}  # Stage name: seconds, in the order the stages ran.
+        self.counts = collections.Counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Times the code in a with block as a stage. A stage that runs more than once adds up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] = self.times.get(name, 0) + time.perf_counter() - start
+
+    def count(self, name, n=1):
+        self.counts[name] += n
+
+    @property
+    def total_time(self):
+        return sum(self.times.values())
+
+    def merge(self, other):
+        """Adds another profile's times and counts to this one."""
+        self.maps += other.maps
+        for name, seconds in other.times.items():
+            self.times[name] = self.times.get(name, 0) + seconds
+        self.counts.update(other.counts)
+
+    def report(self):
+        """Returns the profile as lines of text. A profile of several maps shows the average per map."""
+        per_map = " per map" if self.maps > 1 else ""
+        lines = [f"Time{per_map}: {self.total_time / self.maps * 1000:.1f}ms"]
+        for name, seconds in self.times.items():
+            lines.append(f"  {name}: {seconds / self.maps * 1000:.1f}ms")
+
+        lines.append(f"Counts{per_map}:")
+        for name, n in sorted(self.counts.items()):
+            value = f"{n / self.maps:.1f}" if self.maps > 1 else f"{n}"
+            lines.append(f"  {name}: {value}")
+        return lines
+
+
+class NullProfile(MapProfile):
+    """Records nothing. procgen uses this when it isn't profiling."""
+    def stage(self, name):
+        return contextlib.nullcontext()
+
+    def count(self, name, n=1):
+        pass
+
+
+NO_PROFILE = NullProfile()
+
+
+def profile_maps(count, seed=None, workers=None, **kwargs):
+    """ Generates count profiled maps (see mapbatch.generate_maps) and returns all their profiles merged into
+        one, along with the maps.
+    """
+    maps = mapbatch.generate_maps(count, seed, workers, profile=True, **kwargs)
+    total = MapProfile()
+    total.maps = 0
+    for m in maps:
+        total.merge(m.profile)
+    return total, maps
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Profile the generation of a batch of Lab Hack maps.")
+    parser.add_argument("--count", type=int, default=20, help="Number of maps to generate.")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the first map.")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1, so times are fair).")
+    parser.add_argument("--width", type=int, help="Map width.")
+    parser.add_argument("--height", type=int, help="Map height.")
+    parser.add_argument("--rooms", type=int, help="Max rooms per map.")
+    parser.add_argument("--difficulty", type=int, default=1, help="Dungeon level of the maps.")
+    options = parser.parse_args(args)
+
+    kwargs = {"difficulty": options.difficulty}
+    if options.width:
+        kwargs["map_width"] = options.width
+    if options.height:
+        kwargs["map_height"] = options.height
+    if options.rooms:
+        kwargs["max_rooms"] = options.rooms
+
+    total, maps = profile_maps(options.count, options.seed, options.workers, **kwargs)
+
+    print(f"Maps: {total.maps} (seeds {options.seed} to {options.seed + options.count - 1})")
+    print("\n".join(total.report()))
+    print("Totals:")
+    for name, n in sorted(total.counts.items()):
+        print(f"  {name}: {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,10 @@
 from . import color
+import array
+import collections
+import itertools
+import json
+import os
+import tempfile
 import textwrap
 
 
@@ -13,6 +19,14 @@ class Msg:
         # crowding our message log with the same message over and over, we can
         # “stack” the messages by increasing a message’s count.
 
+        self.wrapped = {}  # The wrapped lines of the full text by width, with the count they were wrapped for.
+
+    def __getstate__(self):
+        """The wrapped lines are not saved, they are cheap to wrap again."""
+        state = self.__dict__.copy()
+        state["wrapped"] = {}
+        return state
+
     @property
     def full_text(self):
         """The full text of this message, including the count if necessary."""
@@ -20,11 +34,55 @@ class Msg:
             return f"{self.plain_text} (x{self.count})"
         return self.plain_text
 
+    def wrap(self, width):
+        """Returns the full text wrapped to the width as a list of lines. The lines are only wrapped again
+            when the count changes.
+        """
+        count, lines = self.wrapped.get(width, (None, None))
+        if count != self.count:
+            lines = list(MsgLog.wrap(self.full_text, width))
+            self.wrapped[width] = (self.count, lines)
+        return lines
+
 
 class MsgLog:
-    """Manages the message history in the game."""
-    def __init__(self):
-        self.messages = []
+    """ Manages the message history in the game. Only the latest capacity messages are kept in memory (all of
+        them if capacity is None). With keep_history, older messages are appended to a temporary file of this
+        log's own, so they can still be paged through with get_messages, and are dropped otherwise. Only the
+        latest saved_history messages of the file are saved with the log (all of them if it is None).
+    """
+    def __init__(self, capacity=None, keep_history=False, saved_history=None):
+        self.messages = collections.deque(maxlen=capacity)
+        self.version = 0  # Goes up whenever a message is added or stacked, so renderers can tell the log changed.
+
+        self.keep_history = keep_history
+        self.saved_history = saved_history
+        self.history = None  # The history file, made when the first message is spilled.
+        self.spilled = 0  # The number of messages written out to the history file.
+        self.offsets = None  # Where each message starts in the history file, found when it is first read.
+
+    def __getstate__(self):
+        """ The latest saved_history messages of the history file are saved as its contents, the offsets are
+            found again when it is read.
+        """
+        state = self.__dict__.copy()
+        state["spilled"], state["history"] = self.history_tail(self.saved_history)
+        state["offsets"] = None
+        return state
+
+    def __setstate__(self, state):
+        history = state.pop("history", None)
+        self.__dict__.update(state)
+        self.history = None
+        if history:
+            self.history = tempfile.TemporaryFile(prefix="labhack", suffix=".history")
+            self.history.write(history)
+        # A save without all of its history only shows what it has.
+        self.spilled = min(self.spilled, history.count(b"\n") if history else 0)
+
+    def __len__(self):
+        """The number of messages that can be read with get_messages."""
+        return self.spilled + len(self.messages)
 
     def add_message(self, text, fg=color.white, *, stack=True):
         """Add a message to this log.
@@ -35,7 +93,82 @@ class MsgLog:
         if stack and self.messages and text == self.messages[-1].plain_text:
             self.messages[-1].count += 1
         else:
+            if len(self.messages) == self.messages.maxlen:
+                self.spill(self.messages[0])  # The deque drops the oldest message to make room.
             self.messages.append(Msg(text, fg))
+        self.version += 1
+
+    def spill(self, msg):
+        """Appends a message that is leaving memory to the history file."""
+        if not self.keep_history:
+            return
+
+        if self.history is None:
+            self.history = tempfile.TemporaryFile(prefix="labhack", suffix=".history")
+        self.history.seek(0, os.SEEK_END)
+        if self.offsets is not None:
+            self.offsets.append(self.history.tell())
+        self.history.write((json.dumps([msg.plain_text, list(msg.fg), msg.count]) + "\n").encode("utf-8"))
+        self.spilled += 1
+
+    def get_messages(self, start, stop):
+        """ Returns a list of messages from start up to (not including) stop, counting from the first message
+            in the history file. Messages that were spilled to the file are read back from it.
+        """
+        start, stop = max(start, 0), min(stop, len(self))
+        if start >= stop:
+            return []
+
+        result = []
+        if start < self.spilled:
+            result.extend(self.read_history(start, min(stop, self.spilled)))
+
+        if stop > self.spilled:
+            result.extend(itertools.islice(self.messages, max(start - self.spilled, 0), stop - self.spilled))
+        return result
+
+    def read_history(self, start, stop):
+        """Reads the spilled messages from start up to stop back from the history file."""
+        if self.history is None:
+            return []
+
+        offsets = self.index_history()
+        if start >= len(offsets):
+            return []
+        self.history.seek(offsets[start])
+        msgs = []
+        for line in itertools.islice(self.history, stop - start):
+            text, fg, count = json.loads(line)
+            msg = Msg(text, tuple(fg))
+            msg.count = count
+            msgs.append(msg)
+        return msgs
+
+    def index_history(self):
+        """ Returns where each message starts in the history file. Every line is indexed once, the offsets of
+            newer lines are added as they are written.
+        """
+        if self.offsets is None:
+            self.offsets = array.array("q")
+            offset = 0
+            self.history.seek(0)
+            for line in itertools.islice(self.history, self.spilled):
+                self.offsets.append(offset)
+                offset += len(line)
+        return self.offsets
+
+    def history_tail(self, count=None):
+        """Returns the number of messages and the contents of the last count lines of the history file."""
+        if self.history is None:
+            return 0, None
+        count = self.spilled if count is None else min(count, self.spilled)
+        if count == 0:
+            return 0, None
+
+        offsets = self.index_history()
+        count = min(count, len(offsets))
+        self.history.seek(offsets[len(offsets) - count])
+        return count, self.history.read()
 
     @staticmethod
     def wrap(string, width):
@@ -0,0 +1,74 @@
+""" Finds free spots for the rooms of a new map (see procgen.generate_rooms).
+An OccupancyGrid keeps a summed-area table of the tiles that rooms cover, so checking whether a rectangle is
+free takes four lookups instead of a pass over every room. The free positions for a room of a given size are
+found for the whole map at once, and one is picked at random, so a room only fails to be placed when it really
+doesn't fit anywhere.
+"""
+import numpy as np
+
+
+class OccupancyGrid:
+    """ The tiles covered by rooms (walls included) on a map. If max_distance is set, a room's center also has to
+        be within max_distance of the center of every room placed so far.
+    """
+    def __init__(self, width, height, max_distance=None):
+        self.width = width
+        self.height = height
+        self.max_distance = max_distance
+
+        self.occupied = np.zeros((width, height), dtype=bool)
+        self.near = np.ones((width, height), dtype=bool)  # Tiles within max_distance of all the room centers.
+        self.sat = None  # Summed-area table of occupied, built when it's first needed after a change.
+
+    def summed_area(self):
+        """ Returns the summed-area table: sat[x, y] is the number of occupied tiles above and to the left of
+            (x, y), not including that row and column.
+        """
+        if self.sat is None:
+            self.sat = np.zeros((self.width + 1, self.height + 1), dtype=np.int32)
+            np.cumsum(np.cumsum(self.occupied, axis=0), axis=1, out=self.sat[1:, 1:])
+        return self.sat
+
+    def is_free(self, x1, y1, x2, y2):
+        """Returns True if none of the tiles from (x1, y1) to (x2, y2) (inclusive) is covered by a room."""
+        sat = self.summed_area()
+        return sat[x2 + 1, y2 + 1] - sat[x1, y2 + 1] - sat[x2 + 1, y1] + sat[x1, y1] == 0
+
+    def free_positions(self, width, height):
+        """ Returns a boolean array of the top left corners where a room of this size fits: it is on the map with
+            room for a border on the right and bottom (like procgen.generate_random_room), doesn't overlap any
+            other room, and its center is near enough to the other rooms.
+        """
+        nx, ny = self.width - width, self.height - height
+        if nx <= 0 or ny <= 0:
+            return np.zeros((max(nx, 0), max(ny, 0)), dtype=bool)
+
+        # The number of occupied tiles under the room at every position, from the summed-area table.
+        sat = self.summed_area()
+        covered = (sat[width:width + nx, height:height + ny] - sat[:nx, height:height + ny]
+                   - sat[width:width + nx, :ny] + sat[:nx, :ny])
+
+        # Room.center of a room at (x, y) is (x + (width - 1) // 2, y + (height - 1) // 2).
+        cx, cy = (width - 1) // 2, (height - 1) // 2
+        return (covered == 0) & self.near[cx:cx + nx, cy:cy + ny]
+
+    def random_position(self, width, height, rng):
+        """Returns a random (x, y) where a room of this size fits, or None if it doesn't fit anywhere."""
+        free = self.free_positions(width, height)
+        candidates = np.flatnonzero(free)
+        if not candidates.size:
+            return None
+
+        x, y = np.unravel_index(candidates[rng.randrange(candidates.size)], free.shape)
+        return int(x), int(y)
+
+    def add(self, room):
+        """Marks the tiles of a room as occupied."""
+        self.occupied[room.full_slice] = True
+        self.sat = None
+
+        if self.max_distance is not None:
+            x, y = room.center
+            xs = np.arange(self.width)[:, np.newaxis]
+            ys = np.arange(self.height)[np.newaxis, :]
+            self.near &= (xs - x) ** 2 + (ys - y) ** 2 <= self.max_distance ** 2
@@ -0,0 +1,73 @@
+""" Builds the next dungeon level in a background thread while the player is busy on the current one, so taking
+the stairs down doesn't stall on map generation and populating the level.
+
+A LevelJob draws its seeds from the game's random streams when it is made, on the game's thread. The level it
+builds is the same whether the worker finished it, or it had to be built on the spot because the player got to
+the stairs first.
+"""
+import concurrent.futures
+import random
+
+_executor = None
+
+
+def executor():
+    """Returns the single worker thread shared by all the dungeons, starting it the first time."""
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="pregen")
+    return _executor
+
+
+class LevelJob:
+    """A populated level waiting to be built for the bottom of a dungeon."""
+    def __init__(self, dungeon, dlevel):
+        self.dungeon = dungeon
+        self.dlevel = dlevel  # The number the level will have in the dungeon.
+
+        # Same as Dungeon.generate_floor: maps get the difficulty of the level they are built from.
+        self.difficulty = dungeon.dlevel
+        self.player_level = dungeon.engine.player.level.current_level
+
+        self.mapgen_seed = dungeon.rng.mapgen.getrandbits(64)
+        self.spawn_seed = dungeon.rng.spawn.getrandbits(64)
+        self.future = None
+        self.level = None  # The finished level, once result has been called.
+
+    def build(self):
+        """Builds and populates the level. This only touches the new map, so it is safe to run on the worker."""
+        new_map = self.dungeon.build_floor(self.difficulty, random.Random(self.mapgen_seed))
+        spawner = self.dungeon.entity_factory.with_rng(random.Random(self.spawn_seed))
+        spawner.populate_level(self.dlevel, new_map, self.player_level)
+        return new_map
+
+    def __getstate__(self):
+        """Only the seeds are saved, the level is built again after loading."""
+        state = self.__dict__.copy()
+        state["future"] = None
+        state["level"] = None
+        return state
+
+    @property
+    def started(self):
+        return self.future is not None
+
+    def start(self):
+        """Queues the level on the worker."""
+        self.future = executor().submit(self.build)
+
+    def cancel(self):
+        """Drops the level from the queue if the worker hasn't started on it."""
+        if self.future:
+            self.future.cancel()
+
+    def result(self):
+        """ Returns the finished level. If the worker hasn't started on it, it is built right here instead, and
+            if the worker is part way through it, this waits for it to finish.
+        """
+        if self.level is None:
+            if self.future is None or self.future.cancel():
+                self.level = self.build()
+            else:
+                self.level = self.future.result()
+        return self.level
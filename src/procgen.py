@@ -1,10 +1,16 @@
 import copy
 
+from . import db  # db has to be imported before the consumables, or their circular imports fail.
 import components.consumable
+from . import corridors
 from . import gamemap
+from . import mapprofile
+from . import placement
 from . import room
+from . import roomgraph
+from . import settings
 from . import tiles
-from . import db
+import math
 import numpy as np
 import random
 import tcod
@@ -12,55 +18,47 @@ import tcod
 from .utils import distance
 
 
-def hide_corridors(new_map):
+def hide_corridors(new_map, rng=random):
     # Add hidden corridors.
     # For now, we'll add x hidden corridors, where x is the number of rooms divided by 2.
+    # Returns how many were added.
     qty = len(new_map.rooms) // 2
+    hidden = 0
     for i in range(qty):
-        x, y = new_map.get_random_unoccupied_tile()  # Unpack an (x, y) tuple
+        x, y = new_map.get_random_unoccupied_tile(rng)  # Unpack an (x, y) tuple
         if new_map.tiles[x, y] == tiles.floor:
             new_map.place(copy.deepcopy(db.hidden_corridor), x, y)
+            hidden += 1
+    return hidden
 
 
-def hide_doors(new_map):
-    # Hide doors
+def hide_doors(new_map, rng=random):
+    # Hide doors, returns how many were hidden.
     door_tiles = new_map.get_all_tiles_of(tiles.door)
+    hidden = 0
     for x, y in door_tiles:
         # 10% of doors are hidden
-        if random.random() > .10:
+        if rng.random() > .10:
             continue
         # Hide all doors
         hidden_door = copy.deepcopy(db.hidden_door)
         new_map.place(hidden_door, x, y)  # Need to place it before adding the consumable!
 
         hidden_door.add_comp(consumable=components.consumable.CamoflaugeConsumable(hidden_door, x, y))
+        hidden += 1
+    return hidden
 
 
-def add_closets(new_map):
-    # Added random closets
+def add_closets(new_map, rng=random):
+    # Added random closets, returns how many rooms got one.
     CLOSET_CHANCE = 10
+    closets = 0
     for r in new_map.rooms:
-        if random.randint(1, CLOSET_CHANCE) == 1:
+        if rng.randint(1, CLOSET_CHANCE) == 1:
             all_doors = r.get_all_possible_doors()
             # Pick a random one. If it works, great, otherwise just skip.
-            draw_door(new_map, random.choice(all_doors))
-
-
-def dig_path(new_map, path):
-    """Digs a preformed path in the map and converts all the coordinates in the path to floor tiles."""
-    # Dig out a pre-determined path
-    for x, y in path:
-        new_map.tiles[x, y] = tiles.floor
-
-
-def door_distance_dict(room1, room2):
-    """Create a dict of door pairs (keys) and their distances apart (values) """
-    pair_dict = {}
-    for a in room1.get_all_possible_doors():
-        for b in room2.get_all_possible_doors():
-            dist_between = distance(a.x, a.y, b.x, b.y)
-            pair_dict[(a, b)] = dist_between
-    return pair_dict
+            closets += draw_door(new_map, rng.choice(all_doors))
+    return closets
 
 
 def draw_doors(new_map):
@@ -83,9 +81,11 @@ def draw_door(new_map, d):
         if new_map.tiles[closet_x, closet_y] == tiles.wall:
             # Dig out the closet
             new_map.tiles[closet_x, closet_y] = tiles.floor
+        return True
+    return False
 
 
-def draw_room(new_map, new_room):
+def draw_room(new_map, new_room, rng=random):
     """Draws all the tiles in a new room. Consists of the walls, corners, and inner floors.
     We also calculate if the the room will be lit or not and set the lit tiles as needed.
     """
@@ -100,7 +100,7 @@ def draw_room(new_map, new_room):
         # new_map.lit[new_room.full_slice] = True
         new_map.lit[new_room.inner] = True
 
-    elif random.randint(0, 100) > dark_chance:
+    elif rng.randint(0, 100) > dark_chance:
         # light up the entire room
         # new_map.lit[new_room.full_slice] = True
         new_map.lit[new_room.inner] = True
@@ -118,79 +118,131 @@ def draw_room(new_map, new_room):
     new_map.tiles[new_room.sw_corner] = tiles.room_sw_corner
 
 
-def connect_room_to_room(new_map, room1, room2):
+def door_pair_arrays(new_map, room1, room2):
+    """ Scores every pair of possible doors between two rooms at once. Returns the distances between the doors,
+        and masks of the pairs that pass valid_pair_of_doors and the pairs where the first door faces the other
+        (Door.facing_other), as arrays indexed by [room1 door, room2 door].
+    """
+    _, x1, y1, facing1 = room1.door_candidates()
+    _, x2, y2, facing2 = room2.door_candidates()
+
+    dx = x1[:, np.newaxis] - x2[np.newaxis, :]
+    dy = y1[:, np.newaxis] - y2[np.newaxis, :]
+    distances = np.hypot(dx, dy)
+
+    # Neither door can be on the edge of the map.
+    on_edge1 = (x1 == 0) | (y1 == 0) | (x1 == new_map.width - 1) | (y1 == new_map.height - 1)
+    on_edge2 = (x2 == 0) | (y2 == 0) | (x2 == new_map.width - 1) | (y2 == new_map.height - 1)
+
+    # Doors one row (or column) apart have to be lined up, or their closets get over-extended.
+    vertical1 = ((facing1 == "N") | (facing1 == "S"))[:, np.newaxis]
+    horizontal1 = ((facing1 == "E") | (facing1 == "W"))[:, np.newaxis]
+    misaligned = (vertical1 & (abs(dy) == 1) & (dx != 0)) | (horizontal1 & (abs(dx) == 1) & (dy != 0))
+
+    valid = ~on_edge1[:, np.newaxis] & ~on_edge2[np.newaxis, :] & ~misaligned
+
+    f1, f2 = facing1[:, np.newaxis], facing2[np.newaxis, :]
+    facing = (
+        ((f1 == "N") & (f2 == "S") & (dy >= 1))
+        | ((f1 == "S") & (f2 == "N") & (dy <= -1))
+        | ((f1 == "W") & (f2 == "E") & (dx >= 1))
+        | ((f1 == "E") & (f2 == "W") & (dx <= -1))
+    )
+    return distances, valid, facing
+
+
+def connect_room_to_room(new_map, room1, room2, rng=random, router=None, profile=None):
     """ Connects two rooms by choosing a pair of doors and connecting their closets with a path.
+        router is the map's CorridorRouter (see corridors.py), one is made if it isn't passed in.
         Returns True if the room was connected successfully, False otherwise.
     """
-    # First, find a pair of doors that is suitable for connecting.
-    # Start with a list of all the possible door pairs between room1 and room2
-    # Create a dict with distances as values
-    door_pairs = door_distance_dict(room1, room2)
-
-    # Thin them down with any non-valid pairs (edge of map, adjacent)
-    door_pairs = {
-        k: y for k, y in door_pairs.items()
-        if valid_pair_of_doors(new_map, k[0], k[1])
-    }
+    if router is None:
+        router = corridors.CorridorRouter(new_map)
+    profile = profile or mapprofile.NO_PROFILE
 
-    # Create a sub-dict of facing pairs.
-    facing_pairs = {k: y for k, y in door_pairs.items() if k[0].facing_other(k[1])}
+    # First, find a pair of doors that is suitable for connecting.
+    # Score all the possible door pairs between room1 and room2, and thin them down to the valid pairs
+    # (edge of map, adjacent) and the facing pairs. Pairs are picked by their flat index into the arrays.
+    doors1 = room1.door_candidates()[0]
+    doors2 = room2.door_candidates()[0]
+    distances, door_pairs, facing_pairs = door_pair_arrays(new_map, room1, room2)
+    facing_pairs &= door_pairs
+    valid_pairs = door_pairs.copy()
+    distances = distances.ravel()
+    profile.count("door pairs scored", door_pairs.size)
 
     door1, door2 = None, None  # prevents annoying Pycharm warning.
     path = []  # prevents annoying Pycharm warning.
     # Loop until we discover a connected set of doors or we exhaust all of the door pairs.
     connected = False
     tries = 0
-    while not connected and door_pairs:
+    while not connected and door_pairs.any():
         tries += 1
-        if facing_pairs:
+        if facing_pairs.any():
+            candidates = np.flatnonzero(facing_pairs)
             # 20% of the time, use the closest facing pair.
-            if random.random() < .2:
+            if rng.random() < .2:
                 # Use the most direct pair by default.
-                next_pair = min(facing_pairs, key=facing_pairs.get)
+                next_pair = candidates[np.argmin(distances[candidates])]
 
             # The other 80%, get a random facing pair.
             else:
-                next_pair = random.choice(list(facing_pairs.keys()))
-
-            # Remove the pair from both dicts
-            facing_pairs.pop(next_pair)
-            door_pairs.pop(next_pair)
+                next_pair = candidates[rng.randrange(candidates.size)]
 
         else:
             # A* is our backup in case the facing doors don't exist.
             # Choose a random pair.
-            next_pair = random.choice(list(door_pairs.keys()))
+            candidates = np.flatnonzero(door_pairs)
+            next_pair = candidates[rng.randrange(candidates.size)]
 
-            # Remove the pair from the dict
-            door_pairs.pop(next_pair)
+        # Remove the pair from both masks
+        facing_pairs.flat[next_pair] = False
+        door_pairs.flat[next_pair] = False
 
         # We have a set of doors to work with
-        door1, door2 = next_pair
+        i, j = np.unravel_index(next_pair, door_pairs.shape)
+        door1, door2 = doors1[i], doors2[j]
 
         # To connect the doors, we have to connect the closets!
         closet1_x, closet1_y = door1.closet()
         closet2_x, closet2_y = door2.closet()
 
         # Try easiest path first.
-        path = create_L_path((closet1_x, closet1_y), (closet2_x, closet2_y))
-        connected = valid_path(new_map, path)
+        path = create_L_path((closet1_x, closet1_y), (closet2_x, closet2_y), rng=rng)
+        connected = router.valid(path)
+        profile.count("door pairs tried")
+        profile.count("L paths" if connected else "routed paths")
 
         if not connected:
             # first connector didn't work.
-            path = create_Astar_path_to(new_map, closet1_x, closet1_y, closet2_x, closet2_y)
-            connected = valid_path(new_map, path)
+            # Dig from door1's closet to the nearest closet of any door in room2 that it can pair with. If that
+            # path isn't valid, try again with the rest of them.
+            partners = list(np.flatnonzero(valid_pairs[i]))
+            while partners and not connected:
+                k, path = router.nearest((closet1_x, closet1_y), [doors2[p].closet() for p in partners])
+                if k is None:
+                    break
+                connected = router.valid(path)
+
+                if connected:
+                    door2 = doors2[partners[k]]
+                else:
+                    partners.pop(k)
+
+            if not connected:
+                # Every door in room2 has been tried from this door, so don't try it again.
+                door_pairs[i] = False
+                facing_pairs[i] = False
 
     if connected:
         # Dig out the path
-        dig_path(new_map, path)
+        router.dig(path)
 
         # Special case for doors that are right next to each other
         # TODO: We might be able to move this to draw_doors later...
         if distance(door1.x, door1.y, door2.x, door2.y) == 1:
             # Dig out as floor.
-            new_map.tiles[door1.x, door1.y] = tiles.floor
-            new_map.tiles[door2.x, door2.y] = tiles.floor
+            router.dig([(door1.x, door1.y), (door2.x, door2.y)])
         else:
             new_map.doors.append(door1)
             new_map.doors.append(door2)
@@ -203,42 +255,34 @@ def connect_room_to_room(new_map, room1, room2):
     return False
 
 
-def connecting_algorithm(new_map):
+def connecting_algorithm(new_map, rng=random, router=None, profile=None):
     """ Connects all the rooms in a map with a minimum spanning tree then performs an extra round
     of connections to make the  map easier to traverse.."""
-    edges = min_spanning_tree_for_rooms(new_map.rooms)
-    for room1, room2 in edges:
-        connect_room_to_room(new_map, room1, room2)
+    if router is None:
+        router = corridors.CorridorRouter(new_map)
+    profile = profile or mapprofile.NO_PROFILE
+
+    plan = roomgraph.RoomGraph(new_map.rooms)
+    for room1, room2 in plan.min_spanning_tree():
+        connect_rooms(new_map, plan, room1, room2, rng, router, profile)
 
     # Try to add 1/2 of the room count as extra connections.
     extra_connections = len(new_map.rooms) // 2
 
     for i in range(extra_connections):
-        room1 = random.choice(new_map.rooms)
-        room2 = new_map.get_nearest_unconnected_room(room1)
-        connect_room_to_room(new_map, room1, room2)
-
-
-def create_Astar_path_to(_map, start_x, start_y, dest_x, dest_y):
-    """ Compute and return a path to the target position.
-        If there is no valid path then returns an empty list.
-        See components.ai.BaseAI.get_path_to for full comments.
-    """
-    cost = np.array(_map.tiles["diggable"], dtype=np.int8)
-
-    # Create a graph from the cost array and pass that graph to a new pathfinder.
-    graph = tcod.path.SimpleGraph(cost=cost, cardinal=2, diagonal=0)
-    pathfinder = tcod.path.Pathfinder(graph)
-
-    pathfinder.add_root((start_x, start_y))  # Start position.
+        room1 = rng.choice(new_map.rooms)
+        room2 = plan.nearest_unconnected(room1)
+        if room2:
+            connect_rooms(new_map, plan, room1, room2, rng, router, profile)
 
-    # Compute the path to the destination (remove starting point.)
-    # path = pathfinder.path_to((dest_x, dest_y))[1:-1].tolist()
-    path = pathfinder.path_to((dest_x, dest_y)).tolist()
 
-    # Convert from List[List[int]] to List[Tuple[int, int]].
-    # noinspection PyTypeChecker
-    return [(index[0], index[1]) for index in path]
+def connect_rooms(new_map, plan, room1, room2, rng, router, profile):
+    """Connects two rooms for connecting_algorithm and records the connection in the RoomGraph."""
+    profile.count("connections tried")
+    if connect_room_to_room(new_map, room1, room2, rng, router, profile):
+        plan.connect(room1, room2)
+    else:
+        profile.count("connections failed")
 
 
 def create_diagonal_path(start, end):
@@ -254,7 +298,7 @@ def create_diagonal_path(start, end):
 
 
 # noinspection PyTypeChecker
-def create_L_path(start, end, twist=0):
+def create_L_path(start, end, twist=0, rng=random):
     """ Return an L-shaped tunnel between these two points.
         If the lines are on the same x-axis or y-axis it will simply draw a straight line.
         start: Tuple[int, int],
@@ -265,7 +309,7 @@ def create_L_path(start, end, twist=0):
     x2, y2 = end
 
     if twist == 0:
-        twist = random.randint(1, 2)
+        twist = rng.randint(1, 2)
 
     if twist == 1:  # 50% chance.
         corner_x, corner_y = x2, y1  # Move horizontally, then vertically.
@@ -284,135 +328,135 @@ def create_L_path(start, end, twist=0):
     return coordinates
 
 
-def generate_map(max_rooms, room_min_size, room_max_size, map_width, map_height, max_distance, difficulty):
-    """ Generate a new dungeon map with rooms, corridors, and stairs."""
+def generate_map(max_rooms, room_min_size, room_max_size, map_width, map_height, max_distance, difficulty,
+                 rng=random, profile=None):
+    """ Generate a new dungeon map with rooms, corridors, and stairs.
+        rng is the random stream to build it with (see GameRNG.mapgen), the same seed builds the same map.
+        If a MapProfile is passed in, the time and counts of each stage are recorded in it and it is kept in
+        the map's profile (see mapprofile.py).
+    """
     new_map = gamemap.GameMap(map_width, map_height, dlevel=difficulty)
+    new_map.profile = profile
+    profile = profile or mapprofile.NO_PROFILE
 
     # Create all the rooms
-    generate_rooms(
-        new_map=new_map,
-        max_rooms=max_rooms,
-        room_min_size=room_min_size,
-        room_max_size=room_max_size,
-        max_distance=max_distance,
-    )
+    with profile.stage("rooms"):
+        generate_rooms(
+            new_map=new_map,
+            max_rooms=max_rooms,
+            room_min_size=room_min_size,
+            room_max_size=room_max_size,
+            max_distance=max_distance,
+            rng=rng,
+            profile=profile,
+        )
+    profile.count("rooms", len(new_map.rooms))
 
-    # Draw the rooms
-    for r in new_map.rooms:
-        draw_room(new_map, r)
+    with profile.stage("draw rooms"):
+        # Build the wall lighting info for all the rooms at once.
+        new_map.lighters = build_lighters(new_map.rooms)
+
+        # Draw the rooms
+        for r in new_map.rooms:
+            draw_room(new_map, r, rng)
 
-    # Create the room coordinates for easy reference.
-    new_map.room_coords = new_map.room_coordinates()
+        # Create the room coordinates for easy reference.
+        new_map.room_coords = new_map.room_coordinates()
 
-    # Connect the rooms with corridors
-    connecting_algorithm(new_map)
+    # Connect the rooms with corridors, all routed by one CorridorRouter.
+    with profile.stage("corridors"):
+        router = corridors.CorridorRouter(new_map)
+        connecting_algorithm(new_map, rng, router, profile)
+    for name, n in router.stats.items():
+        profile.count(f"corridor {name}", n)
 
     # Place doors
-    draw_doors(new_map)
+    with profile.stage("doors & stairs"):
+        draw_doors(new_map)
 
-    # Put the upstair in the first room generated
-    center_of_first_room = new_map.rooms[0].center
-    new_map.tiles[center_of_first_room] = tiles.up_stairs
-    new_map.upstairs_location = center_of_first_room
+        # Put the upstair in the first room generated
+        center_of_first_room = new_map.rooms[0].center
+        new_map.tiles[center_of_first_room] = tiles.up_stairs
+        new_map.upstairs_location = center_of_first_room
 
-    # Put the downstair in the last room generated
-    center_of_last_room = new_map.rooms[-1].center
-    new_map.tiles[center_of_last_room] = tiles.down_stairs
-    new_map.downstairs_location = center_of_last_room
+        # Put the downstair in the last room generated
+        center_of_last_room = new_map.rooms[-1].center
+        new_map.tiles[center_of_last_room] = tiles.down_stairs
+        new_map.downstairs_location = center_of_last_room
+    profile.count("doors", len(new_map.doors))
 
     # Closets, hidden stuff, traps, etc.
-    hide_corridors(new_map)
-    hide_doors(new_map)
-    add_closets(new_map)
+    with profile.stage("hidden features"):
+        profile.count("hidden corridors", hide_corridors(new_map, rng))
+        profile.count("hidden doors", hide_doors(new_map, rng))
+    with profile.stage("closets"):
+        profile.count("closets", add_closets(new_map, rng))
 
     return new_map
 
 
-def generate_random_room(map_width, map_height, min_size, max_size):
+def generate_random_room(map_width, map_height, min_size, max_size, rng=random):
     """Creates a room with random size and position."""
-    room_width = random.randint(min_size, max_size)
-    room_height = random.randint(min_size, max_size)
+    room_width = rng.randint(min_size, max_size)
+    room_height = rng.randint(min_size, max_size)
 
-    x = random.randint(0, map_width - room_width - 1)
-    y = random.randint(0, map_height - room_height - 1)
+    x = rng.randint(0, map_width - room_width - 1)
+    y = rng.randint(0, map_height - room_height - 1)
 
     return room.Room(x, y, room_width, room_height)
 
 
-def generate_rooms(new_map, max_rooms, room_min_size, room_max_size, max_distance=50):
-    """Generates a set of rooms for a new map. We will not allow overlapping of rooms so we will try
-    max_tries times until we either have the full set of max_rooms or have exhausted our tries.
+def scale_distance(distance, width, height):
+    """ Scales a distance meant for a map of the standard size (settings.map_width by settings.map_height) to a
+        map of this size, by the ratio of their diagonals. Maps that aren't bigger keep the distance as it is.
     """
-    max_tries = 100
-    tries = 0
+    ratio = math.hypot(width, height) / math.hypot(settings.map_width, settings.map_height)
+    return distance * max(ratio, 1)
 
-    while tries < max_tries and len(new_map.rooms) < max_rooms:
-        tries += 1
-        new_room = generate_random_room(
-            map_width=new_map.width,
-            map_height=new_map.height,
-            min_size=room_min_size,
-            max_size=room_max_size
-        )
 
-        # Run through the other rooms and perform a few checks
+def generate_rooms(new_map, max_rooms, room_min_size, room_max_size, max_distance=50, rng=random,
+                   profile=None):
+    """Generates a set of rooms for a new map. Each room gets a random size and is put in a random free spot
+    (see placement.OccupancyGrid), so rooms never overlap. A room that doesn't fit anywhere counts as a failed
+    try, and we stop when we have the full set of max_rooms or have run out of tries.
+    max_distance is scaled up for maps bigger than the standard size (see scale_distance), None turns it off.
+    """
+    profile = profile or mapprofile.NO_PROFILE
+    if max_distance is not None:
+        max_distance = scale_distance(max_distance, new_map.width, new_map.height)
+    grid = placement.OccupancyGrid(new_map.width, new_map.height, max_distance)
+    for r in new_map.rooms:
+        grid.add(r)
 
-        # Does this room intersect with another?
-        if any(new_room.intersects(other_room) for other_room in new_map.rooms):
-            continue  # This room intersects, so go to the next attempt.
+    max_tries = 100
+    tries = 0
 
-        # Is the room further than the max distance allowed between rooms?
-        if any(True for other in new_map.rooms
-               if distance(*new_room.center, *other.center) > max_distance):  # Double unpacking FTW!
+    while tries < max_tries and len(new_map.rooms) < max_rooms:
+        room_width = rng.randint(room_min_size, room_max_size)
+        room_height = rng.randint(room_min_size, room_max_size)
+
+        # Only free spots that are near enough to the other rooms are picked from.
+        position = grid.random_position(room_width, room_height, rng)
+        profile.count("room tries")
+        if position is None:
+            profile.count("room rejections")
+            tries += 1
             continue
 
+        new_room = room.Room(*position, room_width, room_height)
+
         # Label the room to match it's index in new_map.rooms
         label = len(new_map.rooms)
         new_room.label = label
 
-        # Add the floor and wall lighting info to the lighters dict.
-        new_map.lighters.update(new_room.floor_light_dict())
-
         # Add this room to the map's list.
         new_map.rooms.append(new_room)
+        grid.add(new_room)
 
 
-def min_spanning_tree_for_rooms(rooms):
-    """ Connects all the rooms by using Prim's Algorithm
-    :return: A list of all the edges (room to room connections)
-    """
-    edges = []
-    visited = []
-    unvisited = rooms[:]   # Copy all vertices to this list.
-
-    # Random start point.
-    start = unvisited[0]
-    visited.append(start)
-    unvisited.pop(0)  # Remove the start point from the unvisited list.
-
-    while len(unvisited) > 0:
-        record = 100000   # A very high number, maybe even max
-        r_match = None
-        u_match = None
-
-        for r in visited:
-            for u in unvisited:
-                x1, y1 = r.center
-                x2, y2 = u.center
-                dist = distance(x1, y1, x2, y2)
-
-                if dist < record:
-                    record = dist
-                    r_match = r
-                    u_match = u
-
-        edges.append((r_match, u_match))
-
-        # Take the u_match out of unvisited and put it into visited.
-        visited.append(u_match)
-        unvisited.remove(u_match)
-
-    return edges
+def build_lighters(rooms):
+    """ Combines the wall lighting info from each room into the array used for GameMap.lighters."""
+    return np.hstack([np.zeros((4, 0), dtype=np.int16)] + [r.wall_lighters() for r in rooms])
 
 
 def valid_pair_of_doors(new_map, door1, door2):
@@ -462,20 +506,3 @@ def valid_pair_of_doors(new_map, door1, door2):
 
     # If it passed the above tests, it should be okay
     return True
-
-
-def valid_path(new_map, path):
-    """ Walks along a path and makes sure it doesn't dig out anything important. """
-    # This takes care of A* paths that are only 1 sq long.
-    if len(path) == 1:
-        return False
-
-    for x, y in path:
-        # Stop drawing if we run into room corners.
-        if new_map.tiles[x, y] in tiles.room_corners:
-            return False
-
-        # Do not draw over inner room floors
-        if new_map.tiles[x, y] == tiles.room_floor:
-            return False
-    return True
@@ -1,6 +1,5 @@
 from components.equippable import Weapon
 from . import color, utils
-from . import messages
 from . import settings
 from . import tiles
 from components import equipment
@@ -43,89 +42,138 @@ class Renderer:
         self.map_panel = tcod.Console(width=settings.map_width, height=settings.map_height, order="F",)
         self.stat_panel = tcod.Console(width=settings.screen_width, height=settings.stat_panel_height)
 
-    def render_all(self, engine):
-        player = engine.player
+        # What each panel was last drawn from (see render_all).
+        self.msg_key = None
+        self.map_snapshot = MapSnapshot()
+        self.stats = None
 
+    def render_all(self, engine):
+        """ Draws the message, map and stat panels onto the root console. Each panel is only redrawn when
+            something it shows has changed since the last frame, otherwise the panel from the last frame is
+            blitted again as it is.
+        """
         # Message Panel
-        render_messages(
-            console=self.msg_panel,
-            x=settings.msg_panel_x, y=0,
-            width=settings.screen_width,
-            height=settings.msg_panel_height,
-            msg_list=engine.msglog.messages,
-        )
+        msg_key = (engine.msglog, engine.msglog.version)
+        if msg_key != self.msg_key:
+            self.msg_panel.clear()
+            render_messages(
+                console=self.msg_panel,
+                x=settings.msg_panel_x, y=0,
+                width=settings.screen_width,
+                height=settings.msg_panel_height,
+                msg_list=engine.msglog.messages,
+            )
+            self.msg_key = msg_key
 
         # Map Panel
-        render_map(self.map_panel, engine.game_map)
+        if self.map_snapshot.update(engine.game_map):
+            render_map(self.map_panel, engine.game_map)
 
         # Stat Panel
-        render_names_at_mouse_location(
-            console=self.stat_panel,
-            x=settings.tooltip_x,
-            y=settings.tooltip_y,
-            engine=engine
-        )
+        stats = stat_panel_text(engine)
+        if stats != self.stats:
+            self.stat_panel.clear()
+            render_stats(self.stat_panel, stats)
+            self.stats = stats
 
-        ac_stat = f"AC:{player.fighter.ac}"
-        str_stat = f"Str:{player.attributes.strength}"
-        dex_stat = f"Dex:{player.attributes.dexterity}"
-        con_stat = f"Con:{player.attributes.constitution}"
-        xp_lvl_stat = f"XL:{player.level.current_level}"
-        turns = f"Turns:{engine.turns}"
-
-        render_text(
-            self.stat_panel,
-            x=22,
-            y=settings.hp_bar_y,
-            text=f"{ac_stat} | {str_stat} | {dex_stat} | {con_stat} | {xp_lvl_stat} | {turns}",
-        )
+        self.msg_panel.blit(self.root, 0, settings.msg_panel_y)
+        self.map_panel.blit(self.root, 0, settings.map_panel_y)
+        self.stat_panel.blit(self.root, 0, settings.stat_panel_y)
 
-        # Render players money
-        money = player.inventory.item_dict.get('$', '$0')
 
-        render_text(
-            self.stat_panel,
-            x=22,
-            y=settings.hp_bar_y + 1,
-            text=f"{money}",
-            fg=tcod.gold,
+class MapSnapshot:
+    """ Keeps a copy of everything render_map draws from, so the map panel is only redrawn when one of them
+        changes: the map itself, its tiles, visible or explored arrays, or the position or look of an entity.
+    """
+    def __init__(self):
+        self.game_map = None
+        self.tiles = None
+        self.visible = None
+        self.explored = None
+        self.entities = None
+
+    def update(self, game_map):
+        """Takes a new snapshot of the map. Returns True if anything changed since the last one."""
+        # Read the components directly, this runs every frame. Colors can be (unhashable) tcod Colors.
+        entities = set()
+        for e in game_map.entities:
+            c = e.components
+            entities.add(
+                (e, c["x"], c["y"], c.get("char"), tuple(c.get("color", ())), c.get("render_order"), "hidden" in c)
+            )
+
+        # The tiles are compared as raw bytes, comparing them field by field is much slower.
+        tile_bytes = game_map.tiles.ravel(order="K").view(np.uint8)
+
+        changed = (
+            game_map is not self.game_map
+            or entities != self.entities
+            or not np.array_equal(self.visible, game_map.visible)
+            or not np.array_equal(self.explored, game_map.explored)
+            or not np.array_equal(self.tiles, tile_bytes)
         )
 
-        # Render player states
-        render_text(
-            self.stat_panel,
-            x=22,
-            y=settings.tooltip_y - 2,
-            text=f"{player.states.to_string()}",
-            fg=tcod.red,
-        )
+        if changed:
+            self.game_map = game_map
+            self.tiles = tile_bytes.copy()
+            self.visible = game_map.visible.copy()
+            self.explored = game_map.explored.copy()
+            self.entities = entities
+        return changed
 
-        # Render current dungeon level
-        x, y = settings.dlevel_text_location
-        render_text(
-            self.stat_panel,
-            x=x,
-            y=y,
-            text=f"Dlevel: {engine.dungeon.dlevel}",
-        )
 
-        # Render HP Bar
-        render_bar(
-            console=self.stat_panel,
-            x=settings.hp_bar_x,
-            y=settings.hp_bar_y,
-            val=player.fighter.hp,
-            max_val=player.fighter.max_hp,
-            total_width=settings.hp_bar_width,
-            label="HP"
-        )
+def stat_panel_text(engine):
+    """ Returns everything the stat panel shows, as a tuple of the texts and the player's HP, so frames with
+        the same stats can be compared.
+    """
+    player = engine.player
+
+    ac_stat = f"AC:{player.fighter.ac}"
+    str_stat = f"Str:{player.attributes.strength}"
+    dex_stat = f"Dex:{player.attributes.dexterity}"
+    con_stat = f"Con:{player.attributes.constitution}"
+    xp_lvl_stat = f"XL:{player.level.current_level}"
+    turns = f"Turns:{engine.turns}"
+
+    return (
+        names_at_mouse_location(engine),
+        f"{ac_stat} | {str_stat} | {dex_stat} | {con_stat} | {xp_lvl_stat} | {turns}",
+        f"{player.inventory.item_dict.get('$', '$0')}",  # The player's money
+        f"{player.states.to_string()}",
+        f"Dlevel: {engine.dungeon.dlevel}",
+        player.fighter.hp,
+        player.fighter.max_hp,
+    )
 
-        self.msg_panel.blit(self.root, 0, settings.msg_panel_y)
-        self.map_panel.blit(self.root, 0, settings.map_panel_y)
-        self.stat_panel.blit(self.root, 0, settings.stat_panel_y)
 
-        self.msg_panel.clear()
-        self.stat_panel.clear()
+def render_stats(console, stats):
+    """Draws the stat panel from the texts returned by stat_panel_text."""
+    names, stat_line, money, states, dlevel, hp, max_hp = stats
+
+    console.print(x=settings.tooltip_x, y=settings.tooltip_y, string=names)
+
+    render_text(console, x=22, y=settings.hp_bar_y, text=stat_line)
+
+    # Render players money
+    render_text(console, x=22, y=settings.hp_bar_y + 1, text=money, fg=tcod.gold)
+
+    # Render player states
+    render_text(console, x=22, y=settings.tooltip_y - 2, text=states, fg=tcod.red)
+
+    # Render current dungeon level
+    x, y = settings.dlevel_text_location
+    render_text(console, x=x, y=y, text=dlevel)
+
+    # Render HP Bar
+    render_bar(
+        console=console,
+        x=settings.hp_bar_x,
+        y=settings.hp_bar_y,
+        val=hp,
+        max_val=max_hp,
+        total_width=settings.hp_bar_width,
+        label="HP"
+    )
 
 
 def render_text(console, x, y, text, fg=tcod.white):
@@ -164,17 +212,21 @@ def render_names_at_mouse_location(console, x, y, engine):
     which we can assume for the moment will return the list of entity names we want. Once we have these entity
     names as a string, we can print that string to the given x and y location on the screen, with console.print.
     """
+    console.print(x=x, y=y, string=names_at_mouse_location(engine))
+
+
+def names_at_mouse_location(engine):
+    """Returns the mouse location on the map and the names of the entities there, as a line of text."""
     mouse_x, mouse_y = engine.mouse_location
 
     # Need to correct for message window offset.
     mouse_y -= settings.msg_panel_height
 
-    names_at_mouse_location = engine.game_map.get_names_at(
+    names = engine.game_map.get_names_at(
         x=mouse_x,
         y=mouse_y,
     )
-
-    console.print(x=x, y=y, string=f"({mouse_x},{mouse_y}): {names_at_mouse_location}")
+    return f"({mouse_x},{mouse_y}): {names}"
 
 
 def render_messages(console, x, y, width, height, msg_list):
@@ -185,7 +237,7 @@ def render_messages(console, x, y, width, height, msg_list):
     y_offset = height - 1
 
     for message in reversed(msg_list):
-        for line in reversed(list(messages.MsgLog.wrap(message.full_text, width))):
+        for line in reversed(message.wrap(width)):
             console.print(x=x, y=y + y_offset, string=line, fg=message.fg)
             y_offset -= 1
             if y_offset < 0:
@@ -213,24 +265,11 @@ def render_map(console, game_map):
         default=tiles.SHROUD,
     )
 
-    # Sort the entities by render order.
-    entities_sorted_for_rendering = sorted(
-        game_map.entities, key=lambda x: x.render_order.value
-    )
-
-    for entity in entities_sorted_for_rendering:
-        # Only print entities that are in the FOV
-        if game_map.visible[entity.x, entity.y]:
-
-            # Make sure it is not hidden or invisible!
-            if "hidden" not in entity:
-                console.print(x=entity.x, y=entity.y, string=entity.char, fg=entity.color)
-
-        # Also remember items/traps that are on explored tiles
-        if game_map.explored[entity.x, entity.y]:
-            item_or_trap = "item" in entity or "trap" in entity
-            if item_or_trap and "hidden" not in entity:
-                console.print(x=entity.x, y=entity.y, string=entity.char, fg=entity.color)
+    # Draw the entities on top of the tiles, all at once.
+    x, y, ch, fg = entity_layer(game_map)
+    rgb = console.tiles_rgb
+    rgb["ch"][x, y] = ch
+    rgb["fg"][x, y] = fg
 
     # TODO: Move to separate function
     # For testing: Render the room numbers
@@ -244,6 +283,33 @@ def render_map(console, game_map):
     #     )
 
 
+def entity_layer(game_map):
+    """ Returns the glyphs of the entities that render_map draws, as (x, y, ch, fg) arrays with one glyph per
+        tile: the entity with the highest render order wins each tile.
+        Entities are drawn when they are in the FOV, and items and traps are also remembered on explored
+        tiles. Hidden entities are never drawn.
+    """
+    entities = [e.components for e in game_map.entities]
+
+    x = np.array([c["x"] for c in entities], dtype=np.intp)
+    y = np.array([c["y"] for c in entities], dtype=np.intp)
+    hidden = np.array(["hidden" in c for c in entities], dtype=bool)
+    item_or_trap = np.array(["item" in c or "trap" in c for c in entities], dtype=bool)
+    order = np.array([c["render_order"].value for c in entities], dtype=int)
+
+    drawn = ~hidden & (game_map.visible[x, y] | (game_map.explored[x, y] & item_or_trap))
+    drawn = np.flatnonzero(drawn)
+
+    # Sort by render order, then keep the last entity on each tile.
+    drawn = drawn[np.argsort(order[drawn], kind="stable")][::-1]
+    _, first = np.unique(x[drawn] * game_map.height + y[drawn], return_index=True)
+    drawn = drawn[first]
+
+    ch = np.array([ord(entities[i]["char"]) for i in drawn], dtype=np.int32)
+    fg = np.array([tuple(entities[i]["color"]) for i in drawn], dtype=np.uint8).reshape(-1, 3)
+    return x[drawn], y[drawn], ch, fg
+
+
 def render_history(console, title, cursor, msglog):
     """Renders the full message history."""
     log_console = tcod.Console(console.width - 6, console.height - 6)
@@ -259,7 +325,7 @@ def render_history(console, title, cursor, msglog):
         x=1, y=1,
         width=log_console.width - 2,
         height=log_console.height - 2,
-        msg_list=msglog.messages[: cursor + 1],
+        msg_list=msglog.get_messages(cursor + 1 - (log_console.height - 2), cursor + 1),
     )
     log_console.blit(console, 3, 3)
 
@@ -461,5 +527,28 @@ def render_map_debugger(console, mode, max_rooms, min_size, max_size, max_dist,
 
     console.print(
         x=0, y=settings.map_height + 5,
-        string=f"ESC: Return to main menu"
+        string=f"ESC: Return to main menu | P: Show profile"
     )
+
+
+def render_map_profile(console, profile):
+    """ Displays how the map on the debugging screen was generated (see mapprofile.py) in a box in the top
+        right corner.
+    """
+    lines = profile.report()
+    width = max(len(line) for line in lines) + 2
+    x = console.width - width
+
+    console.draw_frame(
+        x=x,
+        y=1,
+        width=width,
+        height=len(lines) + 2,
+        title="Profile",
+        clear=True,
+        fg=(255, 255, 255),
+        bg=(0, 0, 0),
+    )
+
+    for i, line in enumerate(lines):
+        console.print(x + 1, i + 2, line)
@@ -0,0 +1,23 @@
+""" Seeded random number streams for a single game, so a game (or a benchmark run) can be reproduced. """
+import random
+
+
+class GameRNG:
+    """ Holds a separate random.Random stream for each part of the game that uses randomness:
+            * mapgen: Building the levels (rooms, corridors, doors, hidden features).
+            * spawn: Populating levels, summoning monsters and the actors' starting energy.
+            * combat: Attacks, damage, regeneration and everything else that happens during play.
+        Each stream is seeded from the game's seed, so the same seed always builds the same dungeon, and
+        spawning more monsters doesn't change how the maps or fights turn out. The Engine owns the GameRNG,
+        so the streams are saved (and continue where they left off) with the game.
+    """
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+
+        # Derive each stream's seed from the game seed.
+        seeder = random.Random(seed)
+        self.mapgen = random.Random(seeder.getrandbits(64))
+        self.spawn = random.Random(seeder.getrandbits(64))
+        self.combat = random.Random(seeder.getrandbits(64))
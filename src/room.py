@@ -3,6 +3,7 @@ from collections import defaultdict
 
 from src import tiles
 from src.door import Door
+import numpy as np
 
 
 class Room:
@@ -19,9 +20,16 @@ class Room:
         self.connections = []  # List of which rooms this room is connected to
         self.doors = []
         self.label = None  # This will be set externally on map generation
+        self.door_cache = None  # The possible doors, worked out the first time they are needed.
 
         self.char_dict = self.get_char_dict()
 
+    def __getstate__(self):
+        """The possible doors are not saved, they are only needed while building the map."""
+        state = self.__dict__.copy()
+        state["door_cache"] = None
+        return state
+
     @property
     def center(self):
         """ Returns the coordinate closest to the center of the room."""
@@ -135,15 +143,15 @@ class Room:
         Includes corners"""
         return {(x, y) for x in [self.x1, self.x2] for y in range(self.y1, self.y2 + 1)}
 
-    def random_point_inside(self):
+    def random_point_inside(self, rng=random):
         """ Returns a random coordinate anywhere in the area of the inner room floor."""
-        x = random.randint(self.x1 + 1, self.x2 - 1)
-        y = random.randint(self.y1 + 1, self.y2 - 1)
+        x = rng.randint(self.x1 + 1, self.x2 - 1)
+        y = rng.randint(self.y1 + 1, self.y2 - 1)
         return x, y
 
-    def random_door_loc(self):
+    def random_door_loc(self, rng=random):
         """ Returns a random location that a door could be created."""
-        return random.choice(list(self.perimeter().difference(self.corners())))
+        return rng.choice(list(self.perimeter().difference(self.corners())))
 
     def all_coords(self):
         """Returns the set of all coordinates representing the room, including walls."""
@@ -187,8 +195,22 @@ class Room:
 
     def get_all_possible_doors(self):
         """Returns a list of all the possible door locations in the room."""
-        walls = self.perimeter().difference(self.corners())
-        return [Door(self, x, y) for x, y in walls]
+        return list(self.door_candidates()[0])
+
+    def door_candidates(self):
+        """ Returns the possible doors as a tuple of the Doors, and arrays of their x and y coordinates and the
+            direction each one faces. A room never changes shape, so this is only worked out once.
+        """
+        if self.door_cache is None:
+            walls = sorted(self.perimeter().difference(self.corners()))
+            doors = [Door(self, x, y) for x, y in walls]
+            self.door_cache = (
+                doors,
+                np.array([d.x for d in doors]),
+                np.array([d.y for d in doors]),
+                np.array([d.facing for d in doors]),
+            )
+        return self.door_cache
 
     def get_char_dict(self):
         """Builds a dict of coordinates and the tile to represent that tile in the room"""
@@ -239,4 +261,11 @@ class Room:
         d[self.x1 + 1, self.y2 - 1].add(self.sw_corner)  # sw corner: (+1, -1)
         d[self.x2 - 1, self.y2 - 1].add(self.se_corner)  # se corner: (-1, -1)
 
-        return d
\ No newline at end of file
+        return d
+
+    def wall_lighters(self):
+        """ Returns the floor_light_dict pairs as a (4, N) array for GameMap.lighters. Each column is
+            (floor x, floor y, wall x, wall y) for a floor tile and one of the walls it lights up.
+        """
+        pairs = [(fx, fy, wx, wy) for (fx, fy), walls in self.floor_light_dict().items() for wx, wy in walls]
+        return np.array(pairs, dtype=np.int16).reshape(-1, 4).T
\ No newline at end of file
@@ -0,0 +1,79 @@
+""" Plans which rooms of a new map to connect (see procgen.connecting_algorithm).
+A RoomGraph works out the distances between all the rooms at once as numpy arrays, so the minimum spanning tree
+and the nearest unconnected room are found with a few array operations per room instead of by comparing every
+pair of rooms in Python, or searching outward from a room tile by tile. The connections that are made are kept
+in a graph.Graph of the room labels.
+"""
+from .graph import Graph
+import numpy as np
+
+
+class RoomGraph:
+    """The distances between a map's rooms and the connections made between them so far."""
+    def __init__(self, rooms):
+        self.rooms = list(rooms)
+        self.graph = Graph(vertices=[r.label for r in self.rooms])
+        self.positions = {r.label: i for i, r in enumerate(self.rooms)}  # Room label: index
+
+        centers = np.array([r.center for r in self.rooms], dtype=float).reshape(-1, 2)
+        self.x, self.y = centers[:, 0], centers[:, 1]
+        # Distances between the room centers, by room index.
+        self.distances = np.hypot(self.x[:, np.newaxis] - self.x, self.y[:, np.newaxis] - self.y)
+
+        self.x1 = np.array([r.x1 for r in self.rooms])
+        self.y1 = np.array([r.y1 for r in self.rooms])
+        self.x2 = np.array([r.x2 for r in self.rooms])
+        self.y2 = np.array([r.y2 for r in self.rooms])
+
+    def min_spanning_tree(self):
+        """ Connects all the rooms by using Prim's Algorithm, keeping the distance from each room to the tree
+            so every step is one pass over the rooms.
+        :return: A list of all the edges (room to room connections)
+        """
+        n = len(self.rooms)
+        if n == 0:
+            return []
+
+        in_tree = np.zeros(n, dtype=bool)
+        in_tree[0] = True
+        best = self.distances[0].copy()  # Distance from each room to the closest room in the tree.
+        parent = np.zeros(n, dtype=int)  # ...and which room that is.
+        best[0] = np.inf
+
+        edges = []
+        for _ in range(n - 1):
+            u = int(np.argmin(best))
+            edges.append((self.rooms[parent[u]], self.rooms[u]))
+            in_tree[u] = True
+            best[u] = np.inf
+
+            closer = ~in_tree & (self.distances[u] < best)
+            best[closer] = self.distances[u][closer]
+            parent[closer] = u
+
+        return edges
+
+    def nearest_unconnected(self, room):
+        """ Returns the room closest to this one that it isn't connected to yet, or None if there isn't one.
+            Rooms are compared by how far their nearest tile is from the center of this room (in rings of
+            tiles), ties go to the room with the closest center.
+        """
+        i = self.positions[room.label]
+        x, y = self.x[i], self.y[i]
+
+        dx = np.maximum(np.maximum(self.x1 - x, x - self.x2), 0)
+        dy = np.maximum(np.maximum(self.y1 - y, y - self.y2), 0)
+        ring = np.maximum(dx, dy).astype(float)
+
+        ring[i] = np.inf
+        for label in self.graph.neighbors[room.label]:
+            ring[self.positions[label]] = np.inf
+
+        if not np.isfinite(ring.min()):
+            return None
+        candidates = np.flatnonzero(ring == ring.min())
+        return self.rooms[candidates[np.argmin(self.distances[i, candidates])]]
+
+    def connect(self, room1, room2):
+        """Records a connection between two rooms."""
+        self.graph.add_edge(room1.label, room2.label)
@@ -0,0 +1,307 @@
+""" Save files that store the game as separate compressed chunks: one for the engine (the player, the message log,
+the random streams...) and one for each level. Only the current level changes during play, so a level that
+hasn't been visited since the game was last saved to the same file is copied over from that file as it is,
+instead of being pickled and compressed again.
+
+Layout: MAGIC, the lzma compressed chunks, a JSON index of the chunks, then the offset of the index (8 bytes).
+Objects that are shared between chunks (the engine, the player and the levels) are pickled as persistent ids,
+and are joined up again when the chunks are loaded.
+"""
+from .gamemap import GameMap
+import io
+import json
+import lzma
+import os
+import pickle
+import struct
+import tempfile
+
+MAGIC = b"LABHACK SAVE 1\n"
+TRAILER = struct.Struct("<Q")  # The offset of the index.
+
+
+class ChunkPickler(pickle.Pickler):
+    """Pickles a chunk, with the shared objects (by id) replaced by their persistent ids."""
+    def __init__(self, file, shared):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.shared = shared
+
+    def persistent_id(self, obj):
+        return self.shared.get(id(obj))
+
+
+class ChunkUnpickler(pickle.Unpickler):
+    """Unpickles a chunk, looking up the shared objects by their persistent ids."""
+    def __init__(self, file, shared):
+        super().__init__(file)
+        self.shared = shared
+
+    def persistent_load(self, pid):
+        return self.shared[tuple(pid)]
+
+
+def level_chunk(dlevel):
+    return f"level {dlevel}"
+
+
+def level_ids(dungeon):
+    """Returns the persistent ids of the levels in the dungeon, by the id of each GameMap."""
+    return {id(m): ("level", i) for i, m in enumerate(dungeon.map_list, start=1)}
+
+
+def dumps(obj, shared):
+    f = io.BytesIO()
+    ChunkPickler(f, shared).dump(obj)
+    return f.getvalue()
+
+
+def loads(data, shared):
+    return ChunkUnpickler(io.BytesIO(data), shared).load()
+
+
+def dump_engine(engine):
+    """Pickles the engine, with the levels as persistent ids."""
+    return dumps(engine, level_ids(engine.dungeon))
+
+
+def dump_level(dungeon, dlevel):
+    """Pickles the state of a level, with the engine, the player and the levels (itself too) as persistent ids."""
+    shared = level_ids(dungeon)
+    shared[id(dungeon.engine)] = ("engine",)
+    shared[id(dungeon.engine.player)] = ("player",)
+    return dumps(get_state(dungeon.get_map(dlevel)), shared)
+
+
+def load_level(dungeon, dlevel, data):
+    """Loads a level pickled by dump_level into its GameMap in the dungeon."""
+    shared = {("level", i): m for i, m in enumerate(dungeon.map_list, start=1)}
+    shared[("engine",)] = dungeon.engine
+    shared[("player",)] = dungeon.engine.player
+    set_state(dungeon.map_list[dlevel - 1], loads(data, shared))
+
+
+def get_state(obj):
+    """Returns the state that pickle would save for the object."""
+    getstate = getattr(obj, "__getstate__", None)
+    return getstate() if getstate else obj.__dict__
+
+
+def set_state(obj, state):
+    """Restores an object's state, the way pickle would."""
+    setstate = getattr(obj, "__setstate__", None)
+    if setstate:
+        setstate(state)
+    else:
+        obj.__dict__.update(state)
+
+
+def read_index(f):
+    """Returns the index of an open save file, or None if it is not a chunked save file."""
+    f.seek(0)
+    if f.read(len(MAGIC)) != MAGIC:
+        return None
+
+    f.seek(-TRAILER.size, os.SEEK_END)
+    index_offset, = TRAILER.unpack(f.read(TRAILER.size))
+    f.seek(index_offset)
+    return json.loads(f.read(os.fstat(f.fileno()).st_size - TRAILER.size - index_offset))
+
+
+def read_chunk(f, index, name):
+    """Returns the compressed bytes of a chunk in an open save file."""
+    offset, length = index["chunks"][name]
+    f.seek(offset)
+    return f.read(length)
+
+
+def open_save(filename, game_id):
+    """Opens a save file of the game and reads its index. Raises ValueError if it isn't one."""
+    f = open(filename, "rb")
+    index = read_index(f)
+    if not index or index["game_id"] != game_id:
+        f.close()
+        raise ValueError(f"{filename} is not a save file of this game.")
+    return f, index
+
+
+def saved_chunks(filename, game_id):
+    """Returns the names of the chunks in a save file of the game, or an empty set if it's not one."""
+    try:
+        with open(filename, "rb") as f:
+            index = read_index(f)
+    except OSError:
+        return set()
+
+    if not index or index["game_id"] != game_id:
+        return set()
+    return set(index["chunks"])
+
+
+def snapshot(engine, filename):
+    """ Pickles everything that has to be written to filename to save the game: the engine, and each level
+        that changed since the game was last saved to the same file (every level if it wasn't). Levels that
+        aren't in memory are copied from the file they will be loaded from, or read back from the spill file.
+        Returns the pickled chunks, the files to copy the other chunks from, and the index info for write.
+        The levels are marked as saved.
+
+        This is the part of saving that has to run on the game's thread. Compressing and writing the chunks
+        only touches the snapshot.
+    """
+    dungeon = engine.dungeon
+    filename = os.path.abspath(filename)
+    changed = dungeon.changed_levels
+    saved = set()
+    if dungeon.saved_to == filename:
+        saved = saved_chunks(filename, dungeon.game_id)
+
+    store = dungeon.level_store or LevelStore(dungeon)
+
+    chunks = {"engine": dump_engine(engine)}
+    sources = {}
+    for dlevel in range(1, len(dungeon.map_list) + 1):
+        name = level_chunk(dlevel)
+        if name in saved and dlevel not in changed:
+            sources[name] = filename
+        elif dlevel in store.files:
+            sources[name] = store.files[dlevel]
+        elif dlevel in store.spilled:
+            chunks[name] = store.read_spill(dlevel)
+        else:
+            chunks[name] = dump_level(dungeon, dlevel)
+
+    dungeon.saved_to = filename
+    dungeon.changed_levels = {dungeon.dlevel}
+
+    info = {"game_id": dungeon.game_id, "dlevel": dungeon.dlevel, "levels": len(dungeon.map_list)}
+    return chunks, sources, info
+
+
+def write(filename, chunks, sources, info):
+    """ Writes a save file from a snapshot. Compresses the pickled chunks and copies the others, as they are,
+        from their source files. The new file is written next to the old one and then renamed over it, so a
+        crash while saving never leaves a broken save behind.
+    """
+    names = ["engine"] + [level_chunk(i) for i in range(1, info["levels"] + 1)]
+    temp_name = filename + ".tmp"
+    opened = {}  # Source filename: (file, index)
+
+    try:
+        with open(temp_name, "wb") as f:
+            f.write(MAGIC)
+            index = {**info, "chunks": {}}
+
+            for name in names:
+                if name in chunks:
+                    data = lzma.compress(chunks[name])
+                else:
+                    source = os.path.abspath(sources[name])
+                    if source not in opened:
+                        opened[source] = open_save(source, info["game_id"])
+                    data = read_chunk(*opened[source], name)
+                index["chunks"][name] = [f.tell(), len(data)]
+                f.write(data)
+
+            index_offset = f.tell()
+            f.write(json.dumps(index).encode())
+            f.write(TRAILER.pack(index_offset))
+    finally:
+        for source, _ in opened.values():
+            source.close()
+
+    os.replace(temp_name, filename)
+
+
+def save(engine, filename):
+    """Saves the game to filename, only rewriting the levels that changed since it was last saved there."""
+    chunks, sources, info = snapshot(engine, filename)
+    try:
+        write(filename, chunks, sources, info)
+    except BaseException:
+        engine.dungeon.saved_to = None  # Nothing can be reused from the file next time.
+        raise
+
+
+def load(filename):
+    """ Loads a game saved with save and returns the Engine. Only the current level is loaded, the others are
+        loaded from the file when they are first needed (see LevelStore).
+    """
+    filename = os.path.abspath(filename)
+    with open(filename, "rb") as f:
+        index = read_index(f)
+        if index is None:
+            raise ValueError(f"{filename} is not a chunked save file.")
+
+        # The levels start out as empty GameMaps, so the engine can refer to them.
+        levels = {("level", i): GameMap.__new__(GameMap) for i in range(1, index["levels"] + 1)}
+        engine = loads(lzma.decompress(read_chunk(f, index, "engine")), levels)
+        dungeon = engine.dungeon
+        load_level(dungeon, index["dlevel"], lzma.decompress(read_chunk(f, index, level_chunk(index["dlevel"]))))
+
+    dungeon.level_store = LevelStore(dungeon)
+    for dlevel in range(1, index["levels"] + 1):
+        if dlevel != index["dlevel"]:
+            dungeon.level_store.add(dlevel, filename)
+
+    dungeon.saved_to = filename
+    dungeon.changed_levels = {dungeon.dlevel}
+    return engine
+
+
+class LevelStore:
+    """ Keeps track of the levels of a dungeon that aren't in memory. They are empty GameMaps in Dungeon.map_list
+        until Dungeon.get_map needs them, and then they are loaded again.
+
+        A level is either in a save file, because it hasn't been loaded since the game was loaded, or it was
+        evicted and is unchanged since the game was saved, or it is pickled in the spill file. The spill file is
+        a temporary file that only lives as long as the game.
+    """
+    def __init__(self, dungeon):
+        self.dungeon = dungeon
+        self.files = {}  # dlevel: the save file with the level's chunk.
+        self.spilled = {}  # dlevel: (offset, length) of the level's pickle in the spill file.
+        self.spill = None
+
+    def __contains__(self, dlevel):
+        return dlevel in self.files or dlevel in self.spilled
+
+    def add(self, dlevel, filename):
+        self.files[dlevel] = filename
+
+    def load(self, dlevel):
+        """Loads a level back into its GameMap in the dungeon."""
+        if dlevel in self.spilled:
+            data = self.read_spill(dlevel)
+            del self.spilled[dlevel]
+            if not self.spilled:
+                self.spill.truncate(0)  # Nothing left in it, so the space can be reused.
+        else:
+            f, index = open_save(self.files[dlevel], self.dungeon.game_id)
+            with f:
+                data = lzma.decompress(read_chunk(f, index, level_chunk(dlevel)))
+            del self.files[dlevel]
+
+        load_level(self.dungeon, dlevel, data)
+
+    def evict(self, dlevel):
+        """ Takes a level out of memory, leaving an empty GameMap in its place. A level that hasn't changed since
+            the game was saved is loaded from the save file again, anything else is pickled to the spill file.
+        """
+        dungeon = self.dungeon
+        if dungeon.saved_to and dlevel not in dungeon.changed_levels \
+                and level_chunk(dlevel) in saved_chunks(dungeon.saved_to, dungeon.game_id):
+            self.files[dlevel] = dungeon.saved_to
+        else:
+            data = dump_level(self.dungeon, dlevel)
+            if self.spill is None:
+                self.spill = tempfile.TemporaryFile(prefix="labhack", suffix=".spill")
+            self.spill.seek(0, os.SEEK_END)
+            self.spilled[dlevel] = (self.spill.tell(), len(data))
+            self.spill.write(data)
+
+        dungeon.map_list[dlevel - 1].__dict__.clear()
+
+    def read_spill(self, dlevel):
+        """Returns the pickle of a level in the spill file."""
+        offset, length = self.spilled[dlevel]
+        self.spill.seek(offset)
+        return self.spill.read(length)
@@ -0,0 +1,89 @@
+""" Event-time scheduling for the actors on a map, as an alternative to polling every actor every turn."""
+import heapq
+
+
+class EnergyScheduler:
+    """ Keeps the actors of one map in a heap, keyed by the turn they will next have enough energy to act.
+        Each turn, only the actors that are due are woken up; everyone else is left alone, and actors that
+        can never act (a refill of 0, like brown mold) are never woken at all.
+
+        Energy is added lazily: when an actor wakes up it is given the refills for all the turns it slept
+        through at once, so it acts on exactly the same turns as it would with Engine.add_energy adding
+        energy to everyone every turn.
+
+        The clock only advances when the scheduler runs, so actors on levels the player isn't on don't gain
+        energy, just like with add_energy.
+
+        The GameMap tells the scheduler when actors join or leave its living set (see add and remove), so it
+        never has to compare its actors against the map's.
+    """
+    def __init__(self):
+        self.time = 0  # The number of turns this scheduler has run.
+        self.queue = []  # Heap of (wake time, tiebreaker, actor)
+        self.actors = {}  # Each actor and a list of [the time its energy was last updated, its wake time]
+        self.counter = 0  # Tiebreaker so the heap never has to compare actors.
+        self.new_actors = set()  # Actors that were added since the last turn and still need to be scheduled.
+
+    def add(self, actor):
+        """Adds an actor that joined the map. It is scheduled at the start of the next turn."""
+        if actor not in self.actors:
+            self.new_actors.add(actor)
+
+    def remove(self, actor):
+        """Drops an actor that died or left the map. Its entry in the heap is skipped when it comes up."""
+        self.new_actors.discard(actor)
+        self.actors.pop(actor, None)
+
+    def ready_actors(self, player=None):
+        """ Starts a new turn and returns a list of the actors that can act this turn, with their energy
+            brought up to date. Any actors that were added since the last turn are scheduled first.
+            Call reschedule for each actor after it has taken its turn.
+
+        :param player: The player, who takes their turns outside the scheduler and is never scheduled.
+        """
+        self.time += 1
+        self.new_actors.discard(player)
+
+        # New actors are scheduled in order of their location, so a seeded game always plays out the same way.
+        for actor in sorted(self.new_actors, key=lambda a: a.xy):
+            self.schedule(actor, self.time - 1)
+        self.new_actors.clear()
+
+        ready = []
+        while self.queue and self.queue[0][0] <= self.time:
+            wake_time, _, actor = heapq.heappop(self.queue)
+            synced, scheduled_wake = self.actors.get(actor, (None, None))
+
+            if scheduled_wake != wake_time:
+                continue  # An outdated entry for an actor that was rescheduled or removed.
+
+            actor.energy.add_energy(self.time - synced)
+            self.actors[actor] = [self.time, None]
+            ready.append(actor)
+
+        return ready
+
+    def reschedule(self, actor):
+        """Schedules the next turn for an actor that just finished acting. Dead actors are dropped."""
+        if actor.is_alive and actor in self.actors:
+            self.schedule(actor, self.time)
+        else:
+            self.remove(actor)
+
+    def schedule(self, actor, synced):
+        """ Adds the actor to the heap for the next turn it will be able to act.
+
+        :param actor: The actor to schedule.
+        :param synced: The last turn the actor's energy was updated for.
+        """
+        turns = actor.energy.turns_until_ready()
+
+        if turns is None:
+            self.actors[actor] = [synced, None]  # This actor will never act, so it doesn't go in the heap.
+            return
+
+        # Energy is only added at the start of a turn, so the soonest the actor can act is the next turn.
+        wake_time = synced + max(turns, 1)
+        self.actors[actor] = [synced, wake_time]
+        heapq.heappush(self.queue, (wake_time, self.counter, actor))
+        self.counter += 1
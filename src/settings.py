@@ -12,8 +12,13 @@ title_extended = "Lab Hack: A Roguelike Venture in Super-Science!"
 tileset = "images/dejavu12x12_gs_tc.png"
 bg_img = "images/menu_background.png"
 save_file = "savegame.sav"
+autosave_interval = 5  # Turns between autosaves to save_file, written in the background (None turns it off)
 
 fov_radius = 1
+incremental_fov = True  # Reuse the cached transparency and light masks between FOV updates
+entity_prototypes = True  # Make entities by cloning a prototype instead of deepcopying a new one
+pregenerate_levels = True  # Build the next level in a background thread (see pregen.py)
+resident_levels = 1  # Levels kept in memory above and below the current one, the rest are evicted (None keeps all)
 AUTO_DELAY = .1  # For adding slight delay for AI running, paralysis, etc
 
 # Define screen dimensions
@@ -28,6 +33,9 @@ msg_panel_y = 0
 msg_panel_x = 1
 msg_panel_width = screen_width - 10
 msg_panel_height = 5
+msg_capacity = 500  # Messages kept in memory (and in save files)
+msg_keep_history = True  # Older messages are kept in a temporary file for the history screen
+msg_saved_history = 1000  # How many of those older messages are kept in save files
 
 # Map Panel
 map_panel_y = msg_panel_height
@@ -69,6 +77,7 @@ closed_door = '+'
 
 # Entity settings
 ENERGY_THRESHOLD = 12
+energy_scheduler = False  # Only wake actors when they have enough energy to act (see scheduler.py)
 
 max_items_by_floor = [
     (1, 1),
@@ -1,15 +1,17 @@
 """Handle the loading and initialization of game sessions."""
 from . import color, player
 from . import factory
+from . import savefile
 from .engine import Engine
-import lzma
-import pickle
 
 
-def new_game():
-    """Return a brand new game session as an Engine instance."""
+def new_game(seed=None):
+    """ Return a brand new game session as an Engine instance.
+        Games started with the same seed get the same dungeon and the same dice rolls.
+    """
     new_player = player.Player()
-    engine = Engine(player=new_player)
+    engine = Engine(player=new_player, seed=seed)
+    new_player.energy.stagger(engine.rng.spawn)
 
     new_map = engine.dungeon.current_map
 
@@ -47,9 +49,18 @@ def new_game():
 
 
 def load_game(filename):
-    """Load an Engine instance from a file."""
+    """Load an Engine instance from a file. Raises ValueError for saves made by older versions."""
     with open(filename, "rb") as f:
-        engine = pickle.loads(lzma.decompress(f.read()))
+        chunked = f.read(len(savefile.MAGIC)) == savefile.MAGIC
+
+    if not chunked:
+        raise ValueError("This save was made by an older version of Lab Hack and can't be loaded.")
+    engine = savefile.load(filename)
 
     assert isinstance(engine, Engine)
+    engine.update_fov()  # The visible tiles aren't saved.
+
+    # Get back to building the level below, with the seeds drawn before saving if there are any.
+    engine.dungeon.prepare_next_floor()
+    engine.dungeon.start_next_floor()
     return engine
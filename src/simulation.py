@@ -0,0 +1,189 @@
+""" Headless driver for running games without a tcod context or Renderer.
+The game loop is the same one main.py runs, except the player's actions come from a Policy instead of
+the keyboard, nothing is drawn, and there is no AUTO_DELAY sleep between automatic actions. This lets us
+run lots of unattended games at full CPU speed for balancing, regression and throughput measurements.
+
+Usage: python -m src.simulation --games 10 --turns 500 --policy diver
+"""
+from actions.bump_action import BumpAction
+from actions.downstairs_action import DownStairsAction
+from actions.search_action import SearchAction
+from actions.wait_action import WaitAction
+from collections import namedtuple
+from components import ai
+from . import handlers
+from . import settings
+from . import setup_game
+import argparse
+import random
+import time
+
+# Summary of a single finished simulation.
+GameResult = namedtuple("GameResult", ["turns", "dlevel", "alive", "steps", "elapsed"])
+
+
+class Policy:
+    """ Decides which action the player takes when the game is waiting for input.
+        Subclasses must override choose_action.
+    """
+    def __init__(self, seed=None):
+        # Policies keep their own random stream so they don't disturb the game's randomness.
+        self.rng = random.Random(seed)
+
+    def choose_action(self, engine):
+        """Returns the next Action for the player."""
+        raise NotImplementedError()
+
+
+class WaitPolicy(Policy):
+    """The player waits in place every turn, letting the rest of the level play out around them."""
+    def choose_action(self, engine):
+        return WaitAction(engine.player)
+
+
+class RandomWalkPolicy(Policy):
+    """The player bumps in a random direction every turn, which moves, attacks or fails against walls."""
+    def choose_action(self, engine):
+        dx, dy = self.rng.choice(settings.DIRECTIONS[1:])  # Skip the (0, 0) "stay" direction
+        return BumpAction(engine.player, dx, dy)
+
+
+class StairDiverPolicy(RandomWalkPolicy):
+    """ The player heads for the downstairs and descends as soon as they reach them, fighting anything
+        that is in the way and searching when something hidden (like a hidden corridor) blocks the path.
+        Once in a while the player takes a random step instead, so they can't get stuck in one spot forever.
+    """
+    def __init__(self, seed=None, wander=.1):
+        super().__init__(seed)
+        self.wander = wander  # Chance of taking a random step instead of following the path.
+
+    def choose_action(self, engine):
+        player = engine.player
+        stairs_x, stairs_y = engine.game_map.downstairs_location
+
+        if (player.x, player.y) == (stairs_x, stairs_y):
+            return DownStairsAction(entity=player, dungeon=engine.dungeon)
+
+        if self.rng.random() >= self.wander:
+            path = ai.TravelAI(player, stairs_x, stairs_y).path
+            if path:
+                dest_x, dest_y = path[0]
+                if engine.game_map.filter("hidden", x=dest_x, y=dest_y, blocks_movement=True):
+                    return SearchAction(player)
+                return BumpAction(player, dest_x - player.x, dest_y - player.y)
+
+        return super().choose_action(engine)
+
+
+POLICIES = {
+    "wait": WaitPolicy,
+    "random": RandomWalkPolicy,
+    "diver": StairDiverPolicy,
+}
+
+
+class Simulation:
+    """ Runs a single game with no console, no rendering and no input events.
+        The player's actions are processed through EventHandler.handle_action, exactly like the
+        interactive game, so monster turns, states and regeneration all run through Engine.end_of_turn.
+    """
+    def __init__(self, policy, engine=None, max_turns=1000, max_steps=None, seed=None):
+        self.policy = policy
+        self.engine = engine if engine else setup_game.new_game(seed)
+        # Levels are built when they are reached instead, so no worker thread competes with the game.
+        self.engine.dungeon.pregenerate = False
+        self.handler = handlers.EventHandler(self.engine)
+        self.max_turns = max_turns
+
+        # Safety net for policies that keep choosing impossible actions (which don't advance the turn).
+        self.max_steps = max_steps if max_steps else max_turns * 10
+        self.steps = 0
+
+    @property
+    def finished(self):
+        """Returns True when the player is dead or we have run out of turns or steps."""
+        if not self.engine.player.is_alive:
+            return True
+        return self.engine.turns >= self.max_turns or self.steps >= self.max_steps
+
+    def next_action(self):
+        """ Gets the player's next action in the same order of priority as main.py:
+            the player's AI (running, traveling, resting) first, then auto-states, then the policy.
+        """
+        player = self.engine.player
+
+        if player.ai:
+            if player.ai.can_perform():
+                return player.ai.yield_action()
+            player.ai = None
+
+        if player.states.autopilot:
+            return self.engine.handle_auto_states(player)
+
+        return self.policy.choose_action(self.engine)
+
+    def step(self):
+        """ Performs one player action. Returns True if the action advanced the turn."""
+        self.steps += 1
+        player = self.engine.player
+        player_ai = player.ai
+
+        action = self.next_action()
+        result = self.handler.handle_action(action)
+
+        # Mirror main.handle_ai: An AI action that didn't work turns the AI off.
+        if player_ai and player.ai is player_ai and not result:
+            player.ai = None
+
+        return result
+
+    def run(self):
+        """ Runs the game until it is finished and returns a GameResult."""
+        start = time.perf_counter()
+
+        while not self.finished:
+            self.step()
+
+        return GameResult(
+            turns=self.engine.turns,
+            dlevel=self.engine.dungeon.dlevel,
+            alive=self.engine.player.is_alive,
+            steps=self.steps,
+            elapsed=time.perf_counter() - start,
+        )
+
+
+def run_games(games, policy_cls=RandomWalkPolicy, max_turns=1000, seed=None):
+    """ Runs a batch of headless games one after another and returns a list of GameResults.
+        Each game and its policy are seeded from the seed passed in (if any), so a batch can be replayed.
+    """
+    results = []
+    for i in range(games):
+        game_seed = None if seed is None else seed + i
+        sim = Simulation(policy=policy_cls(seed=game_seed), max_turns=max_turns, seed=game_seed)
+        results.append(sim.run())
+    return results
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Run headless games of Lab Hack.")
+    parser.add_argument("--games", type=int, default=1, help="Number of games to run.")
+    parser.add_argument("--turns", type=int, default=1000, help="Maximum turns per game.")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random", help="Player policy.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the games and player policies.")
+    options = parser.parse_args(args)
+
+    results = run_games(options.games, POLICIES[options.policy], options.turns, options.seed)
+
+    for i, r in enumerate(results):
+        print(f"Game {i}: turns={r.turns} dlevel={r.dlevel} alive={r.alive} "
+              f"steps={r.steps} elapsed={r.elapsed:.3f}s")
+
+    total_turns = sum(r.turns for r in results)
+    total_time = sum(r.elapsed for r in results)
+    if total_time > 0:
+        print(f"{total_turns} turns in {total_time:.3f}s ({total_turns / total_time:.1f} turns/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -40,6 +40,23 @@ def new_tile(*, walkable, transparent, diggable, dark, light):
     return np.array((walkable, transparent, diggable, dark, light), dtype=tile_dt)
 
 
+def pack(tiles):
+    """ Packs a 2D array of tiles into a palette of the distinct tiles in it, and an array of indexes into the
+        palette (flattened in F order). Maps only use a handful of tile types, so this is much smaller than the
+        full array with the graphics of every tile.
+    """
+    # Compare the tiles as raw bytes, np.unique can't sort the nested graphics fields.
+    raw = tiles.ravel(order="F").view(f"V{tile_dt.itemsize}")
+    palette, index = np.unique(raw, return_inverse=True)
+    index_dt = np.uint8 if len(palette) <= 256 else np.uint16
+    return palette.view(tile_dt), index.astype(index_dt)
+
+
+def unpack(palette, index, shape):
+    """Rebuilds the 2D array of tiles from pack's palette and indexes."""
+    return palette[index].reshape(shape, order="F")
+
+
 # SHROUD represents unexplored, unseen tiles (as black tiles)
 SHROUD = np.array((ord(" "), (255, 255, 255), (0, 0, 0)), dtype=graphic_dt)
 
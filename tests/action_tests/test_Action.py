@@ -1,8 +1,11 @@
 """ Tests for actions.py """
 from actions.actions import Action
 from src import player
+from src.rng import GameRNG
 from tests import toolkit
+from types import SimpleNamespace
 import pytest
+import random
 
 
 @pytest.fixture
@@ -32,3 +35,14 @@ def test_perform__not_implemented(test_player):
     a = Action(test_player)
     with pytest.raises(NotImplementedError):
         a.perform()
+
+
+def test_rng__no_engine__random_module(test_map):
+    a = Action(test_map.player)
+    assert a.rng is random
+
+
+def test_rng__engine__combat_stream(test_map):
+    test_map.engine = SimpleNamespace(rng=GameRNG(seed=1))
+    a = Action(test_map.player)
+    assert a.rng is test_map.engine.rng.combat
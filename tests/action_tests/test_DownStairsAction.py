@@ -56,3 +56,13 @@ def test_perform__msg(test_dungeon):
     a = DownStairsAction(entity=player, dungeon=test_dungeon)
     a.perform()
     assert a.msg == "You descend the stairs."
+
+
+def test_perform__new_level__prepares_next_floor(test_dungeon):
+    player = test_dungeon.current_map.player
+    test_dungeon.place_entity(player, 2, *test_dungeon.current_map.downstairs_location)
+
+    a = DownStairsAction(entity=player, dungeon=test_dungeon)
+    a.perform()
+    assert test_dungeon.dlevel == len(test_dungeon.map_list) == 3
+    assert test_dungeon.next_level.dlevel == 4
@@ -1,7 +1,9 @@
-from src import dungeon, player
+from src import dungeon, player, pregen, settings
 from src.gamemap import GameMap
+from src.rng import GameRNG
 from tests import toolkit
 from types import SimpleNamespace
+import pickle
 import pytest
 
 
@@ -57,6 +59,105 @@ def test_generate_map__sets_new_maps_engine_ref():
     assert result.engine == e
 
 
+def test_init__prepares_next_floor(quik_d):
+    assert quik_d.next_level.dlevel == 2
+
+
+def test_init__next_floor_not_started(quik_d):
+    assert not quik_d.next_level.started
+
+
+def test_start_next_floor(quik_d, monkeypatch):
+    monkeypatch.setattr(quik_d, "pregenerate", True)
+    quik_d.start_next_floor()
+    assert quik_d.next_level.started
+
+
+def test_start_next_floor__pregenerate_off__does_nothing(monkeypatch):
+    monkeypatch.setattr(settings, "pregenerate_levels", False)
+    e = SimpleNamespace(game_map='testmap', player=player.Player())
+    d = dungeon.Dungeon(engine=e, test_map=toolkit.stair_map)
+    d.start_next_floor()
+    assert d.next_level.dlevel == 2
+    assert not d.next_level.started
+
+
+def test_prepare_next_floor__cancels_own_older_job(quik_d):
+    old_job = pregen.LevelJob(quik_d, 5)  # Not the level below this one.
+    old_job.start()
+    quik_d.next_level = old_job
+    quik_d.prepare_next_floor()
+    assert quik_d.next_level is not old_job
+    assert old_job.future.cancelled() or old_job.future.done()
+
+
+def test_prepare_next_floor__other_dungeon_job_kept(quik_d):
+    e = SimpleNamespace(game_map='testmap', player=player.Player())
+    other = dungeon.Dungeon(engine=e, test_map=toolkit.stair_map)
+    quik_d.next_level.start()
+    other.prepare_next_floor()
+    assert not quik_d.next_level.future.cancelled()
+
+
+def test_add_next_floor__same_level_with_pregenerate_on_or_off():
+    levels = []
+    for pregenerate in (True, False):
+        e = SimpleNamespace(game_map='testmap', player=player.Player(), rng=GameRNG(1))
+        d = dungeon.Dungeon(engine=e)
+        d.pregenerate = pregenerate
+        d.start_next_floor()
+        levels.append(d.add_next_floor())
+    assert (levels[0].tiles == levels[1].tiles).all()
+
+
+def test_prepare_next_floor__not_on_bottom_level__does_nothing(test_dungeon):
+    test_dungeon.next_level = None
+    test_dungeon.prepare_next_floor()
+    assert test_dungeon.next_level is None
+
+
+def test_add_next_floor__uses_prepared_level(quik_d):
+    quik_d.next_level.start()
+    expected = quik_d.next_level.result()
+    result = quik_d.add_next_floor()
+    assert result is expected
+    assert quik_d.map_list == [quik_d.get_map(1), expected]
+    assert quik_d.next_level is None
+
+
+def test_add_next_floor__nothing_prepared__builds_now(quik_d):
+    quik_d.next_level = None
+    result = quik_d.add_next_floor()
+    assert quik_d.get_map(2) is result
+    assert result.engine == quik_d.engine
+
+
+def test_add_next_floor__populates_level():
+    e = SimpleNamespace(game_map='testmap', player=player.Player())
+    d = dungeon.Dungeon(engine=e)
+    result = d.add_next_floor()
+    assert list(result.actors)
+
+
+def test_getstate__keeps_next_level_seeds(quik_d):
+    quik_d.next_level.start()
+    quik_d.next_level.result()
+    d = pickle.loads(pickle.dumps(quik_d))
+    assert d.next_level.mapgen_seed == quik_d.next_level.mapgen_seed
+    assert d.next_level.spawn_seed == quik_d.next_level.spawn_seed
+    assert not d.next_level.started
+    assert d.next_level.level is None
+    assert len(d.map_list) == 1
+
+
+def test_prepare_next_floor__keeps_job_for_next_level(quik_d):
+    job = quik_d.next_level
+    job.start()
+    quik_d.prepare_next_floor()
+    assert quik_d.next_level is job
+    assert not job.future.cancelled()
+
+
 @pytest.mark.skip(reason="Deal with populate")
 def test_generate_map__calls_populate():
     pass
@@ -1,5 +1,6 @@
 """ Tests for engine.py """
-from src import engine, dungeon, player
+from src import engine, dungeon, player, settings, simulation
+import numpy as np
 import pytest
 
 
@@ -10,7 +11,7 @@ def test_player():
 
 def test_init__msglog(test_player):
     e = engine.Engine(player=test_player)
-    assert e.msglog.messages == []
+    assert list(e.msglog.messages) == []
 
 
 def test_init__mouse_location(test_player):
@@ -56,9 +57,30 @@ def test_add_energy():
     pass
 
 
-@pytest.mark.skip(reason="Skeleton")
-def test_update_fov():
-    pass
+def test_update_fov__incremental_matches_full(monkeypatch):
+    sim = simulation.Simulation(policy=simulation.RandomWalkPolicy(seed=3), max_turns=40)
+    e = sim.engine
+
+    while not sim.finished:
+        sim.step()
+        e.update_fov()
+        visible, explored = e.game_map.visible.copy(), e.game_map.explored.copy()
+
+        monkeypatch.setattr(settings, "incremental_fov", False)
+        e.update_fov()
+        monkeypatch.setattr(settings, "incremental_fov", True)
+
+        assert np.array_equal(visible, e.game_map.visible)
+        assert np.array_equal(explored, e.game_map.explored)
+
+
+def test_fov_masks__match_cache(test_player):
+    sim = simulation.Simulation(policy=simulation.WaitPolicy())
+    e = sim.engine
+    transparent, lit = e.game_map.fov_cache.update(e.game_map)
+    full_transparent, full_lit = e.fov_masks()
+    assert np.array_equal(transparent, full_transparent)
+    assert np.array_equal(lit, full_lit)
 
 
 @pytest.mark.skip(reason="Skeleton")
@@ -81,3 +103,19 @@ def test_save_as():
 #  generate_monster(self):
 # reduce_timeouts(self):
 # handle_auto_states(self, actor):
+
+
+def test_end_of_turn__energy_scheduler(monkeypatch):
+    monkeypatch.setattr(settings, "energy_scheduler", True)
+    sim = simulation.Simulation(policy=simulation.WaitPolicy(), max_turns=20)
+    sim.run()
+    assert sim.engine.turns == 20 or not sim.engine.player.is_alive
+    assert sim.engine.game_map.scheduler.time == sim.engine.turns
+
+
+def test_end_of_turn__starts_next_floor(test_player, monkeypatch):
+    monkeypatch.setattr(settings, "pregenerate_levels", True)
+    e = engine.Engine(player=test_player)
+    assert not e.dungeon.next_level.started
+    e.end_of_turn()
+    assert e.dungeon.next_level.started
@@ -1,8 +1,10 @@
 import pytest
 
+from components.light import LightComponent
 from components.stackable import StackableComponent
 from src import player
 from src.entity import Entity
+from src.item import Item
 import toolkit
 
 
@@ -133,6 +135,31 @@ def test_move():
     assert e.y == 1
 
 
+def test_xy():
+    e = Entity(x=1, y=2)
+    assert e.xy == (1, 2)
+
+
+def test_xy__no_coordinates():
+    e = Entity()
+    assert e.xy == (None, None)
+
+
+def test_move__updates_parent_index(test_map):
+    e = Entity(name="fleeb", x=2, y=2)
+    test_map.add_entity(e)
+    e.move(1, 0)
+    assert test_map.get_entities_at(3, 2) == {e}
+    assert e not in test_map.get_entities_at(2, 2)
+
+
+def test_add_comp__xy_updates_parent_index(test_map):
+    e = Entity(name="fleeb", x=2, y=2)
+    test_map.add_entity(e)
+    e.add_comp(x=3, y=1)
+    assert test_map.get_entities_at(3, 1) == {e}
+
+
 def test_distance__same_point():
     e = Entity(x=0, y=0)
     assert e.x == 0
@@ -159,4 +186,25 @@ def test_is_player__non_player_returns_False():
 
 def test_is_player__player_returns_True():
     e = player.Player()
-    assert e.is_player()
\ No newline at end of file
+    assert e.is_player()
+
+
+def test_clone__same_type():
+    e = Item(name="fleeb")
+    result = e.clone()
+    assert type(result) is Item
+    assert result is not e
+
+
+def test_clone__no_parent():
+    e = Entity(name="fleeb")
+    e.parent = "a map"
+    assert e.clone().parent is None
+
+
+def test_clone__components_cloned():
+    e = Entity(name="fleeb", light=LightComponent(radius=2))
+    result = e.clone()
+    assert result.light is not e.light
+    assert result.light.radius == 2
+    assert result.light.parent is result
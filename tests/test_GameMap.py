@@ -3,6 +3,9 @@ from components.item_comp import ItemComponent
 from components.stackable import StackableComponent
 from src import factory, gamemap, room, tiles, player
 from src.entity import Entity
+from types import SimpleNamespace
+import numpy as np
+import pickle
 import pytest
 import toolkit
 
@@ -17,20 +20,6 @@ def test_map():
     return toolkit.test_map()
 
 
-@pytest.fixture
-def room_map():
-    m = gamemap.GameMap(width=20, height=20)
-    a = room.Room(0, 0, 3, 3)
-    b = room.Room(4, 0, 3, 3)
-    c = room.Room(0, 5, 3, 3)
-    d = room.Room(4, 4, 3, 3)
-    for i, r in enumerate([a, b, c, d]):
-        r.label = i
-        m.rooms.append(r)
-    m.room_coords = m.room_coordinates()
-    return m
-
-
 @pytest.fixture
 def test_player():
     p = player.Player()
@@ -272,21 +261,6 @@ def test_valid_door_neighbors__next_to_floor__facing_east():
     assert not m.valid_door_neighbors(r, 9, 1)
 
 
-def test_get_nearest_unconnected_room__no_connections(room_map):
-    a = room_map.rooms[0]
-    b = room_map.rooms[1]
-    c = room_map.rooms[2]
-    d = room_map.rooms[3]
-    assert room_map.get_nearest_unconnected_room(a) == b
-    assert room_map.get_nearest_unconnected_room(c) == d
-
-    # This should be b... must be a rounding issue
-    assert room_map.get_nearest_unconnected_room(d) == c
-
-
-# def test_get_nearest_unconnected_room__connections(room_map):
-
-
 def test_on_edge_of_map__x_is_0__returns_True():
     m = gamemap.GameMap(width=20, height=20)
     assert m.on_edge_of_map(x=0, y=5)
@@ -346,6 +320,36 @@ def test_get_actor_at__valid_actor(std_map):
     assert result == e
 
 
+def test_get_actor_at__dead_actor_returns_None(std_map):
+    e = factory.make("mouse")
+    std_map.place(e, 1, 1)
+    e.fighter.hp = 0
+    assert std_map.get_actor_at(1, 1) is None
+
+
+def test_get_actor_at__after_move(std_map):
+    e = factory.make("mouse")
+    std_map.place(e, 1, 1)
+    e.move(1, 1)
+    assert std_map.get_actor_at(1, 1) is None
+    assert std_map.get_actor_at(2, 2) == e
+
+
+def test_actors__excludes_dead(std_map):
+    e = factory.make("mouse")
+    f = factory.make("mouse")
+    std_map.place(e, 1, 1)
+    std_map.place(f, 2, 2)
+    f.fighter.hp = 0
+    assert list(std_map.actors) == [e]
+
+
+def test_items__only_items(std_map, testitem):
+    std_map.place(factory.make("mouse"), 1, 1)
+    std_map.add_entity(testitem)
+    assert list(std_map.items) == [testitem]
+
+
 def test_get_trap_at__DNE_returns_None(std_map):
     assert std_map.get_trap_at(0, 0) is None
 
@@ -374,3 +378,168 @@ def test_place__updates_xy(std_map):
     std_map.place(e, 2, 3)
     assert e.x == 2
     assert e.y == 3
+
+
+def test_movement_cost__walls_are_0(test_map):
+    cost = test_map.movement_cost()
+    assert cost[0, 0] == 0
+
+
+def test_movement_cost__floor_is_1(test_map):
+    cost = test_map.movement_cost()
+    assert cost[3, 3] == 1
+
+
+def test_movement_cost__blocker_adds_10(test_map):
+    cost = test_map.movement_cost()
+    assert cost[2, 5] == 11  # grid bug
+
+
+def test_distance_to_player__root_is_0(test_map):
+    test_map.engine = SimpleNamespace(player=test_map.player, turns=0)
+    distance = test_map.distance_to_player()
+    assert distance[5, 5] == 0
+
+
+def test_distance_to_player__cardinal_vs_diagonal(test_map):
+    test_map.engine = SimpleNamespace(player=test_map.player, turns=0)
+    diagonal = test_map.distance_to_player(3)
+    cardinal = test_map.distance_to_player(0)
+    assert diagonal[3, 3] < cardinal[3, 3]
+
+
+def test_distance_to_player__cached_for_turn(test_map):
+    test_map.engine = SimpleNamespace(player=test_map.player, turns=0)
+    assert test_map.distance_to_player() is test_map.distance_to_player()
+
+
+def test_distance_to_player__rebuilt_next_turn(test_map):
+    test_map.engine = SimpleNamespace(player=test_map.player, turns=0)
+    first = test_map.distance_to_player()
+    test_map.engine.turns = 1
+    assert test_map.distance_to_player() is not first
+
+
+def test_distance_to_player__rebuilt_when_player_moves(test_map):
+    test_map.engine = SimpleNamespace(player=test_map.player, turns=0)
+    first = test_map.distance_to_player()
+    test_map.player.move(-1, 0)
+    result = test_map.distance_to_player()
+    assert result is not first
+    assert result[4, 5] == 0
+
+
+def test_lit_walls__no_lighters__empty(test_map):
+    wall_x, wall_y = test_map.lit_walls()
+    assert len(wall_x) == 0 and len(wall_y) == 0
+
+
+def test_lit_walls__visible_floor_lights_wall(test_map):
+    test_map.lighters = room.Room(0, 0, 3, 3).wall_lighters()
+    test_map.visible[1, 1] = True
+    lit = np.full((test_map.width, test_map.height), fill_value=False, order="F")
+    lit[test_map.lit_walls()] = True
+    assert lit.sum() == 8
+    assert not lit[1, 1]
+
+
+def test_lit_walls__floor_not_visible__empty(test_map):
+    test_map.lighters = room.Room(0, 0, 3, 3).wall_lighters()
+    wall_x, wall_y = test_map.lit_walls()
+    assert len(wall_x) == 0
+
+
+def test_getstate__packs_arrays():
+    m = toolkit.test_map()
+    state = m.__getstate__()
+    assert "visible" not in state
+    assert "fov_cache" not in state
+    assert state["explored"].dtype == np.uint8
+    assert state["explored"].size == (m.width * m.height + 7) // 8
+
+
+def test_setstate__restores_arrays():
+    m = toolkit.test_map()
+    m.explored[1, 2] = True
+    m.lit[3, 1] = True
+    m.visible[2, 2] = True
+
+    result = pickle.loads(pickle.dumps(m))
+    assert (result.tiles == m.tiles).all()
+    assert result.tiles.flags.f_contiguous
+    assert (result.explored == m.explored).all()
+    assert (result.lit == m.lit).all()
+    assert not result.visible.any()
+    assert result.visible.shape == m.visible.shape
+
+
+def test_setstate__rebuilds_room_coords():
+    m = gamemap.GameMap(10, 10)
+    r = room.Room(1, 1, 4, 4)
+    m.rooms.append(r)
+    m.room_coords = m.room_coordinates()
+
+    result = pickle.loads(pickle.dumps(m))
+    assert result.room_coords.keys() == m.room_coords.keys()
+
+
+def test_setstate__unpacked_old_save__raises():
+    m = gamemap.GameMap(10, 10)
+    state = dict(m.__dict__)  # The full arrays, like maps were pickled before.
+    with pytest.raises(ValueError):
+        gamemap.GameMap.__new__(gamemap.GameMap).__setstate__(state)
+
+
+def test_distance_to_player__rebuilt_when_blocker_moves(test_map):
+    test_map.engine = SimpleNamespace(player=test_map.player, turns=0)
+    orc = Entity(name="orc", blocks_movement=True)
+    test_map.place(orc, 3, 3)
+    first = test_map.distance_to_player()
+    orc.x = 2
+    assert test_map.distance_to_player() is not first
+
+
+def test_getstate__drops_entity_indexes(test_map):
+    state = test_map.__getstate__()
+    assert not {"locations", "comp_index", "living", "opaque"} & state.keys()
+
+
+def test_setstate__rebuilds_entity_indexes(test_map):
+    mouse = factory.make("mouse")
+    test_map.place(mouse, 3, 3)
+
+    result = pickle.loads(pickle.dumps(test_map))
+    new_mouse = next(iter(result.get_entities_at(3, 3)))
+    assert new_mouse.name == "mouse"
+    assert new_mouse in result.living
+    assert new_mouse in result.has_comp("fighter")
+
+
+def test_setstate__loaded_through_entity(test_map):
+    # The player is unpickled before the map it is on, so the map's entities aren't ready in __setstate__.
+    player_copy = pickle.loads(pickle.dumps(test_map.player))
+    assert player_copy in player_copy.parent.get_entities_at(*player_copy.xy)
+    assert player_copy in player_copy.parent.living
+
+
+def test_place__actor_added_to_scheduler(test_map):
+    mouse = factory.make("mouse")
+    test_map.place(mouse, 3, 3)
+    assert mouse in test_map.scheduler.new_actors
+
+
+def test_rm_entity__actor_removed_from_scheduler(test_map):
+    mouse = factory.make("mouse")
+    test_map.place(mouse, 3, 3)
+    test_map.scheduler.ready_actors(test_map.player)
+    test_map.rm_entity(mouse)
+    assert mouse not in test_map.scheduler.actors
+
+
+def test_actor_dies__removed_from_scheduler(test_map):
+    mold = factory.make("brown mold")
+    test_map.place(mold, 3, 3)
+    test_map.scheduler.ready_actors(test_map.player)
+    assert mold in test_map.scheduler.actors
+    mold.fighter.hp = 0
+    assert mold not in test_map.scheduler.actors
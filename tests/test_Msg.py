@@ -22,3 +22,26 @@ def test_fulltext_count2():
     m = messages.Msg(test_text)
     m.count = 2
     assert m.full_text == f'{test_text} (x2)'
+
+
+def test_wrap():
+    m = messages.Msg(test_text)
+    assert m.wrap(4) == ['This', 'is a', 'test']
+
+
+def test_wrap__cached():
+    m = messages.Msg(test_text)
+    assert m.wrap(4) is m.wrap(4)
+
+
+def test_wrap__count_changed__wrapped_again():
+    m = messages.Msg(test_text)
+    m.wrap(40)
+    m.count = 2
+    assert m.wrap(40) == [f'{test_text} (x2)']
+
+
+def test_getstate__drops_wrapped_lines():
+    m = messages.Msg(test_text)
+    m.wrap(4)
+    assert m.__getstate__()["wrapped"] == {}
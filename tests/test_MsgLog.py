@@ -1,5 +1,6 @@
 """ Tests for msglog.py """
 from src import messages
+import pickle
 
 test_text = 'This is a test'
 
@@ -8,7 +9,7 @@ test_text = 'This is a test'
 
 def test_init__messages_list():
     ml = messages.MsgLog()
-    assert ml.messages == []
+    assert list(ml.messages) == []
 
 
 def test_add_message():
@@ -33,3 +34,144 @@ def test_wrap():
     assert list(result) == [
         'This', 'is a', 'test'
     ]
+
+
+def test_init__capacity():
+    ml = messages.MsgLog(capacity=3)
+    assert ml.messages.maxlen == 3
+
+
+def test_add_message__version_increments():
+    ml = messages.MsgLog()
+    ml.add_message(test_text)
+    ml.add_message(test_text)
+    assert ml.version == 2
+
+
+def test_add_message__over_capacity__oldest_dropped():
+    ml = messages.MsgLog(capacity=2)
+    for i in range(3):
+        ml.add_message(str(i))
+    assert [m.plain_text for m in ml.messages] == ['1', '2']
+    assert len(ml) == 2
+
+
+def test_add_message__over_capacity__spills_to_history_file():
+    ml = messages.MsgLog(capacity=2, keep_history=True)
+    for i in range(5):
+        ml.add_message(str(i))
+    assert ml.spilled == 3
+    assert len(ml) == 5
+    assert len(ml.messages) == 2
+
+
+def test_spill__own_file_per_log():
+    ml1 = messages.MsgLog(capacity=1, keep_history=True)
+    ml2 = messages.MsgLog(capacity=1, keep_history=True)
+    for i in range(3):
+        ml1.add_message(f"a{i}")
+        ml2.add_message(f"b{i}")
+    assert [m.plain_text for m in ml1.get_messages(0, 3)] == ['a0', 'a1', 'a2']
+    assert [m.plain_text for m in ml2.get_messages(0, 3)] == ['b0', 'b1', 'b2']
+
+
+def test_spill__no_history__dropped():
+    ml = messages.MsgLog(capacity=1)
+    ml.add_message("a")
+    ml.add_message("b")
+    assert ml.history is None
+    assert ml.spilled == 0
+
+
+def test_get_messages__from_memory():
+    ml = messages.MsgLog()
+    for i in range(5):
+        ml.add_message(str(i))
+    assert [m.plain_text for m in ml.get_messages(1, 3)] == ['1', '2']
+
+
+def test_get_messages__across_history_file():
+    ml = messages.MsgLog(capacity=2, keep_history=True)
+    for i in range(6):
+        ml.add_message(str(i), fg=(i, i, i))
+    ml.add_message('5')  # Stacks in memory
+
+    result = ml.get_messages(2, 6)
+    assert [m.full_text for m in result] == ['2', '3', '4', '5 (x2)']
+    assert result[0].fg == (2, 2, 2)
+
+
+def test_get_messages__spill_after_read():
+    ml = messages.MsgLog(capacity=1, keep_history=True)
+    for i in range(3):
+        ml.add_message(str(i))
+    assert [m.plain_text for m in ml.get_messages(0, 3)] == ['0', '1', '2']
+
+    ml.add_message('3')
+    assert [m.plain_text for m in ml.get_messages(0, 4)] == ['0', '1', '2', '3']
+
+
+def test_get_messages__out_of_range():
+    ml = messages.MsgLog()
+    ml.add_message(test_text)
+    assert ml.get_messages(-5, 1)[0].plain_text == test_text
+    assert ml.get_messages(3, 10) == []
+
+
+def test_getstate__drops_offsets():
+    ml = messages.MsgLog(capacity=1, keep_history=True)
+    for i in range(3):
+        ml.add_message(str(i))
+    ml.get_messages(0, 1)
+    assert ml.offsets is not None
+    assert ml.__getstate__()["offsets"] is None
+
+
+def test_pickle__keeps_history():
+    ml = messages.MsgLog(capacity=1, keep_history=True)
+    for i in range(4):
+        ml.add_message(str(i), fg=(i, i, i))
+
+    result = pickle.loads(pickle.dumps(ml))
+    assert [m.plain_text for m in result.get_messages(0, 4)] == ['0', '1', '2', '3']
+    assert result.get_messages(1, 2)[0].fg == (1, 1, 1)
+    assert result.history is not ml.history
+
+    result.add_message('4')
+    assert [m.plain_text for m in result.get_messages(0, 5)] == ['0', '1', '2', '3', '4']
+
+
+def test_pickle__saved_history__keeps_latest():
+    ml = messages.MsgLog(capacity=1, keep_history=True, saved_history=2)
+    for i in range(6):
+        ml.add_message(str(i))
+
+    result = pickle.loads(pickle.dumps(ml))
+    assert result.spilled == 2
+    assert [m.plain_text for m in result.get_messages(0, len(result))] == ['3', '4', '5']
+    assert len(ml) == 6  # The log itself still has all of them.
+
+
+def test_history_tail__nothing_spilled():
+    ml = messages.MsgLog(capacity=1, keep_history=True)
+    assert ml.history_tail(5) == (0, None)
+
+
+def test_setstate__short_history():
+    ml = messages.MsgLog(capacity=1, keep_history=True)
+    for i in range(4):
+        ml.add_message(str(i))
+    state = ml.__getstate__()
+    state["history"] = state["history"].split(b"\n", 1)[1]  # Lose the first line.
+
+    result = messages.MsgLog.__new__(messages.MsgLog)
+    result.__setstate__(state)
+    assert len(result) == 3
+    assert [m.plain_text for m in result.get_messages(0, 3)] == ['1', '2', '3']
+
+
+def test_read_history__past_end__empty():
+    ml = messages.MsgLog(capacity=1, keep_history=True)
+    ml.add_message("a")
+    ml.add_message("b")
+    assert ml.read_history(5, 6) == []
@@ -1,2 +1,113 @@
+from src import db  # Avoids a circular import with setup_game
+from src import rendering, setup_game, tiles
 from src.rendering import Renderer
+import pytest
 
+
+@pytest.fixture
+def renderer(mocker):
+    mocker.patch('tcod.context.new_terminal')
+    return Renderer()
+
+
+@pytest.fixture
+def engine():
+    return setup_game.new_game(seed=1)
+
+
+def test_init__nothing_rendered_yet(renderer):
+    assert renderer.msg_key is None
+    assert renderer.stats is None
+    assert renderer.map_snapshot.game_map is None
+
+
+def test_render_all__renders_panels(renderer, engine):
+    renderer.render_all(engine)
+    assert renderer.msg_key == (engine.msglog, engine.msglog.version)
+    assert renderer.stats == rendering.stat_panel_text(engine)
+    assert renderer.map_snapshot.game_map is engine.game_map
+    assert renderer.root.ch.any()
+
+
+def test_render_all__unchanged__panels_not_redrawn(mocker, renderer, engine):
+    renderer.render_all(engine)
+    render_map = mocker.patch('src.rendering.render_map')
+    render_messages = mocker.patch('src.rendering.render_messages')
+    render_stats = mocker.patch('src.rendering.render_stats')
+
+    renderer.render_all(engine)
+    render_map.assert_not_called()
+    render_messages.assert_not_called()
+    render_stats.assert_not_called()
+
+
+def test_render_all__unchanged__root_is_the_same(renderer, engine):
+    renderer.render_all(engine)
+    expected = renderer.root.rgba.copy()
+    renderer.root.clear()
+
+    renderer.render_all(engine)
+    assert (renderer.root.rgba == expected).all()
+
+
+def test_render_all__new_message__redraws_messages(mocker, renderer, engine):
+    renderer.render_all(engine)
+    render_messages = mocker.patch('src.rendering.render_messages')
+
+    engine.msglog.add_message("Hello")
+    renderer.render_all(engine)
+    render_messages.assert_called_once()
+
+
+def test_render_all__hp_changed__redraws_stats(mocker, renderer, engine):
+    renderer.render_all(engine)
+    render_stats = mocker.patch('src.rendering.render_stats')
+
+    engine.player.fighter.hp -= 1
+    renderer.render_all(engine)
+    render_stats.assert_called_once()
+
+
+def test_render_all__entity_moved__redraws_map(mocker, renderer, engine):
+    renderer.render_all(engine)
+    render_map = mocker.patch('src.rendering.render_map')
+
+    engine.player.x += 1
+    renderer.render_all(engine)
+    render_map.assert_called_once()
+
+
+def test_MapSnapshot_update__first_time__returns_True(engine):
+    snapshot = rendering.MapSnapshot()
+    assert snapshot.update(engine.game_map)
+
+
+def test_MapSnapshot_update__unchanged__returns_False(engine):
+    snapshot = rendering.MapSnapshot()
+    snapshot.update(engine.game_map)
+    assert snapshot.update(engine.game_map) is False
+
+
+def test_MapSnapshot_update__explored_changed__returns_True(engine):
+    snapshot = rendering.MapSnapshot()
+    snapshot.update(engine.game_map)
+    engine.game_map.explored[:] = True
+    assert snapshot.update(engine.game_map)
+
+
+def test_MapSnapshot_update__tiles_changed__returns_True(engine):
+    snapshot = rendering.MapSnapshot()
+    snapshot.update(engine.game_map)
+    engine.game_map.tiles[0, 0] = tiles.floor
+    assert snapshot.update(engine.game_map)
+
+
+def test_MapSnapshot_update__new_map__returns_True(engine):
+    snapshot = rendering.MapSnapshot()
+    snapshot.update(engine.game_map)
+    assert snapshot.update(engine.dungeon.add_next_floor())
+
+
+def test_stat_panel_text__mouse_location(engine):
+    result = rendering.stat_panel_text(engine)
+    assert result[0] == rendering.names_at_mouse_location(engine)
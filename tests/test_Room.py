@@ -287,3 +287,42 @@ def test_floor_light_dict__4x4_room():
         (1, 2): {(0, 2), (0, 3), (1, 3)},
         (2, 2): {(3, 2), (2, 3), (3, 3)}
     }
+
+
+def test_wall_lighters__shape():
+    r = room.Room(0, 0, 4, 4)
+    result = r.wall_lighters()
+    assert result.shape == (4, 12)
+
+
+def test_wall_lighters__matches_floor_light_dict():
+    r = room.Room(0, 0, 4, 4)
+    floor_x, floor_y, wall_x, wall_y = r.wall_lighters().tolist()
+    pairs = set(zip(zip(floor_x, floor_y), zip(wall_x, wall_y)))
+    expected = {(floor, wall) for floor, walls in r.floor_light_dict().items() for wall in walls}
+    assert pairs == expected
+
+
+def test_get_all_possible_doors__not_corners():
+    r = room.Room(0, 0, 4, 5)
+    doors = r.get_all_possible_doors()
+    assert {(d.x, d.y) for d in doors} == r.perimeter() - r.corners()
+
+
+def test_door_candidates__cached():
+    r = room.Room(0, 0, 4, 4)
+    assert r.door_candidates() is r.door_candidates()
+
+
+def test_door_candidates__arrays_match_doors():
+    r = room.Room(2, 3, 4, 5)
+    doors, xs, ys, facing = r.door_candidates()
+    assert xs.tolist() == [d.x for d in doors]
+    assert ys.tolist() == [d.y for d in doors]
+    assert facing.tolist() == [d.facing for d in doors]
+
+
+def test_getstate__door_cache_not_saved():
+    r = room.Room(0, 0, 4, 4)
+    r.door_candidates()
+    assert r.__getstate__()["door_cache"] is None
@@ -0,0 +1,106 @@
+""" Tests for autosave.py """
+from src import db  # Avoids a circular import with setup_game
+from src import autosave, savefile, setup_game
+import os
+import pytest
+
+
+@pytest.fixture
+def engine():
+    return setup_game.new_game(seed=1)
+
+
+@pytest.fixture
+def autosaver(tmp_path):
+    return autosave.Autosaver(str(tmp_path / "game.sav"), interval=10)
+
+
+def test_executor__is_shared():
+    assert autosave.executor() is autosave.executor()
+
+
+def test_update__before_interval__no_save(engine, autosaver):
+    engine.turns = 9
+    assert autosaver.update(engine) is False
+    assert not os.path.exists(autosaver.filename)
+
+
+def test_update__after_interval__saves(engine, autosaver):
+    autosaver.update(engine)
+    engine.turns = 10
+    assert autosaver.update(engine)
+    assert autosaver.wait()
+    assert savefile.load(autosaver.filename).turns == 10
+    assert engine.dungeon.saved_to == autosaver.filename
+
+
+def test_update__counts_from_last_save(engine, autosaver):
+    engine.turns = 10
+    autosaver.update(engine)
+    autosaver.wait()
+    engine.turns = 19
+    assert autosaver.update(engine) is False
+
+
+def test_update__new_engine__counts_from_its_turn(engine, autosaver):
+    engine.turns = 50
+    assert autosaver.update(engine) is False
+    assert autosaver.last_turn == 50
+
+
+def test_update__interval_None__no_save(engine, tmp_path):
+    autosaver = autosave.Autosaver(str(tmp_path / "game.sav"), interval=None)
+    autosaver.update(engine)
+    engine.turns = 1000
+    assert autosaver.update(engine) is False
+
+
+def test_update__still_writing__no_save(engine, autosaver, mocker):
+    autosaver.update(engine)
+    autosaver.future = mocker.Mock(done=lambda: False)
+    engine.turns = 10
+    assert autosaver.update(engine) is False
+
+
+def test_update__dead_player__no_save(engine, autosaver):
+    autosaver.update(engine)
+    engine.player.fighter.hp = 0
+    engine.turns = 10
+    assert autosaver.update(engine) is False
+
+
+def test_update__dead_player__deletes_save(engine, autosaver):
+    engine.turns = 10
+    autosaver.update(engine)
+    engine.player.fighter.hp = 0
+    autosaver.update(engine)  # Waits for the save being written, then deletes it.
+    assert not os.path.exists(autosaver.filename)
+    assert autosaver.future is None
+
+
+def test_update__dead_player__queued_save_dropped(engine, autosaver, mocker):
+    queued = mocker.Mock(cancel=lambda: True)
+    autosaver.update(engine)
+    autosaver.future = queued
+    engine.player.fighter.hp = 0
+    autosaver.update(engine)
+    assert not queued.result.called
+    assert autosaver.future is None
+
+
+def test_save__file_not_reused_until_written(engine, autosaver, mocker):
+    mocker.patch.object(autosave.executor(), "submit")
+    engine.dungeon.saved_to = autosaver.filename
+    autosaver.save(engine)
+    assert engine.dungeon.saved_to is None
+
+
+def test_write__fails__file_not_reused(engine, autosaver, mocker):
+    mocker.patch.object(savefile, "write", side_effect=OSError)
+    autosaver.save(engine)
+    assert autosaver.wait() is False
+    assert engine.dungeon.saved_to is None
+
+
+def test_wait__nothing_written():
+    assert autosave.Autosaver("game.sav", 10).wait()
@@ -0,0 +1,59 @@
+""" Tests for benchmark.py """
+from src import benchmark
+from src import savefile
+import json
+import pytest
+
+
+@pytest.mark.parametrize("name", list(benchmark.BENCHMARKS))
+def test_time_benchmark__runs(name):
+    result = benchmark.time_benchmark(name, number=1, repeat=1)
+    assert result["name"] == name
+    assert len(result["times"]) == 1
+    assert result["best"] > 0
+
+
+def test_populated_engine__player_survives():
+    engine = benchmark.populated_engine()
+    assert engine.player.fighter.hp == 10 ** 9
+
+
+def test_run_benchmarks__only_names():
+    result = benchmark.run_benchmarks(["factory_make"], number=1, repeat=1, seed=3)
+    assert result["seed"] == 3
+    assert [b["name"] for b in result["benchmarks"]] == ["factory_make"]
+
+
+def test_main__output_is_json(tmp_path):
+    filename = tmp_path / "results.json"
+    benchmark.main(["--only", "factory_make", "--number", "1", "--repeat", "1", "--output", str(filename)])
+    results = json.loads(filename.read_text())
+    assert results["benchmarks"][0]["name"] == "factory_make"
+
+
+def test_populated_engine__no_pregeneration():
+    assert not benchmark.populated_engine().dungeon.pregenerate
+
+
+@pytest.mark.parametrize("name", ["save_load", "save_load_delta"])
+def test_time_benchmark__removes_save_files(name, tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark.tempfile, "tempdir", str(tmp_path))
+    benchmark.time_benchmark(name, number=2, repeat=1)
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("name, full", [("save_load", True), ("save_load_delta", False)])
+def test_setup_save_load__full_or_delta(name, full, monkeypatch):
+    func = benchmark.BENCHMARKS[name](1)
+    save = savefile.save
+    saved_to = []
+
+    def spy(engine, filename):
+        saved_to.append(engine.dungeon.saved_to)
+        save(engine, filename)
+    monkeypatch.setattr(savefile, "save", spy)
+
+    func()
+    func()
+    func.cleanup()
+    assert all((s is None) == full for s in saved_to)
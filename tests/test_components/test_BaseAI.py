@@ -1,10 +1,12 @@
 """ Tests for ai.py """
 from components import ai
 from components.component import Component
-from src import gamemap
+from src import factory, gamemap
 from src import tiles
 from src.engine import Engine
+from src.player import Player
 from tests import toolkit
+from types import SimpleNamespace
 import pytest
 
 
@@ -47,3 +49,25 @@ def test_get_path_to():
     base_ai = ai.BaseAI()
     result = base_ai.engine
     assert isinstance(result, Engine)
+
+
+def test_get_path_downhill(player):
+    m = player.gamemap
+    m.engine = SimpleNamespace(player=player, turns=0)
+    grid_bug = m.get_actor_at(2, 5)
+    result = grid_bug.ai.get_path_downhill(m.distance_to_player(0), 0)
+    assert result[0] == (3, 5)
+    assert result[-1] == (5, 5)
+
+
+def test_get_path_downhill__unreachable__empty_list(empty_map):
+    p = Player()
+    empty_map.place(p, 0, 0)
+    empty_map.engine = SimpleNamespace(player=p, turns=0)
+    for y in range(10):
+        empty_map.tiles[5, y] = tiles.wall
+
+    base_ai = ai.BaseAI()
+    base_ai.parent = factory.make("grid bug")
+    empty_map.place(base_ai.parent, 8, 8)
+    assert base_ai.get_path_downhill(empty_map.distance_to_player()) == []
@@ -19,3 +19,26 @@ def test_gamemap__no_parent():
 def test_engine__no_parent():
     c = Component()
     assert c.engine is None
+
+
+def test_clone__no_parent():
+    c = Component()
+    c.parent = "fleeb"
+    result = c.clone()
+    assert result.parent is None
+    assert c.parent == "fleeb"
+
+
+def test_clone__copies_containers():
+    c = Component()
+    c.path = [(1, 1)]
+    result = c.clone()
+    result.path.append((2, 2))
+    assert c.path == [(1, 1)]
+
+
+def test_deep_clone__no_parent():
+    c = Component()
+    c.parent = Component()
+    result = c.deep_clone()
+    assert result.parent is None
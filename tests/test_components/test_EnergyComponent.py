@@ -4,6 +4,7 @@ from components.component import Component
 from components.energy import EnergyComponent
 from src.settings import ENERGY_THRESHOLD
 import pytest
+import random
 
 
 def test_init__is_Component():
@@ -56,3 +57,34 @@ def test_burned_out__success_uses_energy():
     ec.energy = 12  # Force set this for testing. Minimum is 12 for a turn.
     ec.burn_turn()
     assert ec.energy == 0
+
+
+def test_add_energy__multiple_turns():
+    ec = EnergyComponent(refill=5)
+    ec.energy = 0
+    ec.add_energy(3)
+    assert ec.energy == 15
+
+
+def test_turns_until_ready__enough_energy__0():
+    ec = EnergyComponent(refill=5)
+    ec.energy = ENERGY_THRESHOLD
+    assert ec.turns_until_ready() == 0
+
+
+def test_turns_until_ready__rounds_up():
+    ec = EnergyComponent(refill=5)
+    ec.energy = 1
+    assert ec.turns_until_ready() == 3  # 1 + 5 + 5 = 11 isn't enough
+
+
+def test_turns_until_ready__no_refill__None():
+    ec = EnergyComponent(refill=0)
+    assert ec.turns_until_ready() is None
+
+
+def test_stagger__uses_rng():
+    ec = EnergyComponent(refill=12)
+    ec.stagger(random.Random(1))
+    expected = random.Random(1).randint(0, 12)
+    assert ec.energy == expected
@@ -22,3 +22,11 @@ def test_init__requires_item_components():
 def test_init__capacity():
     i = Inventory(capacity=10)
     assert i.capacity == 10
+
+
+def test_clone__empty__new_Inventory():
+    i = Inventory(capacity=5)
+    result = i.clone()
+    assert result is not i
+    assert result.capacity == 5
+    assert result.is_empty()
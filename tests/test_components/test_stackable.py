@@ -97,4 +97,9 @@ def test_split_stack__full__stacksize_depleted(testitem):
 def test_split_stack__more_than_stacksize__raises_ValueError(testitem):
     assert testitem.stackable.size == 10
     with pytest.raises(ValueError):
-        testitem.stackable.split_stack(11)
\ No newline at end of file
+        testitem.stackable.split_stack(11)
+
+
+def test_split_stack__partial__copy_has_no_parent(testitem):
+    result = testitem.stackable.split_stack(1)
+    assert result.parent is None
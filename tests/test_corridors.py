@@ -0,0 +1,127 @@
+""" Tests for corridors.py """
+from src import corridors, gamemap, mapprofile, procgen, room, tiles
+import random
+
+
+def room_map():
+    new_map = gamemap.GameMap(30, 20)
+    procgen.draw_room(new_map, room.Room(10, 5, 6, 6))  # Inner floor from (11, 6) to (14, 9)
+    return new_map
+
+
+def test_valid__clear_path():
+    router = corridors.CorridorRouter(room_map())
+    assert router.valid([(0, 0), (1, 0), (2, 0)])
+
+
+def test_valid__along_room_wall():
+    router = corridors.CorridorRouter(room_map())
+    assert router.valid([(10, 7), (10, 8)])
+
+
+def test_valid__into_room_floor__False():
+    router = corridors.CorridorRouter(room_map())
+    assert not router.valid([(9, 7), (10, 7), (11, 7)])
+
+
+def test_valid__into_corner__False():
+    router = corridors.CorridorRouter(room_map())
+    assert not router.valid([(9, 5), (10, 5)])
+
+
+def test_valid__single_tile__False():
+    router = corridors.CorridorRouter(room_map())
+    assert not router.valid([(1, 1)])
+
+
+def test_valid__empty__False():
+    router = corridors.CorridorRouter(room_map())
+    assert not router.valid([])
+
+
+def test_path_to__goes_around_room():
+    router = corridors.CorridorRouter(room_map())
+    path = router.path_to((8, 7), (17, 7))
+    assert path[0] == (8, 7)
+    assert path[-1] == (17, 7)
+    assert router.valid(path)
+    assert len(path) > 10  # It can't go straight through.
+
+
+def test_path_to__unreachable__empty():
+    new_map = gamemap.GameMap(30, 20)
+    new_map.tiles[:, 10] = tiles.room_horz_wall
+    router = corridors.CorridorRouter(new_map)
+    assert router.path_to((5, 5), (5, 15)) == []
+    assert router.stats["unreachable"] == 1
+
+
+def test_nearest__picks_closest_target():
+    router = corridors.CorridorRouter(room_map())
+    i, path = router.nearest((2, 2), [(25, 15), (4, 2), (2, 12)])
+    assert i == 1
+    assert path == [(2, 2), (3, 2), (4, 2)]
+    assert router.stats["searches"] == 1
+    assert router.stats["targets"] == 3
+
+
+def test_nearest__skips_unreachable_target():
+    new_map = gamemap.GameMap(30, 20)
+    new_map.tiles[:, 10] = tiles.room_horz_wall
+    router = corridors.CorridorRouter(new_map)
+    i, path = router.nearest((5, 5), [(5, 12), (20, 8)])
+    assert i == 1
+    assert path[-1] == (20, 8)
+
+
+def test_dig__updates_map_and_grids():
+    new_map = room_map()
+    router = corridors.CorridorRouter(new_map)
+    router.dig([(11, 6), (12, 6)])
+
+    assert new_map.tiles[11, 6] == tiles.floor
+    assert router.cost[11, 6] == 1
+    assert not router.blocked[11, 6]
+    assert router.stats["dug"] == 2
+
+
+def two_room_map():
+    new_map = gamemap.GameMap(50, 30)
+    room1, room2 = room.Room(2, 2, 8, 8), room.Room(30, 15, 8, 8)
+    for label, r in enumerate((room1, room2)):
+        r.label = label
+        new_map.rooms.append(r)
+        procgen.draw_room(new_map, r)
+    return new_map, room1, room2
+
+
+def test_connect_room_to_room__connects_with_router():
+    new_map, room1, room2 = two_room_map()
+
+    router = corridors.CorridorRouter(new_map)
+    assert procgen.connect_room_to_room(new_map, room1, room2, random.Random(1), router)
+    assert room1.connections == [1]
+    assert router.stats["dug"] > 0
+
+
+class PickyRouter(corridors.CorridorRouter):
+    """Only accepts paths that end at one closet."""
+    def __init__(self, new_map, goal):
+        super().__init__(new_map)
+        self.goal = goal
+
+    def valid(self, path):
+        return super().valid(path) and path[-1] == self.goal
+
+
+def test_connect_room_to_room__rejected_path__tries_other_closets():
+    new_map, room1, room2 = two_room_map()
+    goal = room2.door_candidates()[0][-1]
+    router = PickyRouter(new_map, goal.closet())
+    profile = mapprofile.MapProfile()
+
+    assert procgen.connect_room_to_room(new_map, room1, room2, random.Random(1), router, profile)
+    assert goal in new_map.doors
+    # The first door in room1 got there by trying room2's closets one at a time.
+    assert profile.counts["door pairs tried"] == 1
+    assert router.stats["searches"] > 1
@@ -1,3 +1,4 @@
+from components.fighter import Fighter
 from components.stackable import StackableComponent
 from pytest_mock import mocker
 from src.entity import Entity
@@ -457,6 +458,161 @@ def test_filter__1_arg_1_kwarg(em):
     assert em.filter("name", x=0) == {e}
 
 
+def test_filter__location_kwargs(em):
+    e = Entity(name="fleeb", x=0, y=1)
+    f = Entity(name="fleeb", x=1, y=1)
+    em.add_entities(e, f)
+    assert em.filter("name", x=1, y=1) == {f}
+
+
+def test_filter__location_and_2_missing_args(em):
+    e = Entity(name="fleeb", x=0, y=1)
+    em.add_entities(e)
+    assert em.filter("item", "fighter", x=0, y=1) == set()
+
+
+def test_init__locations(em):
+    assert em.locations == {}
+
+
+def test_add_entity__indexes_location(em):
+    e = Entity(name="fleeb", x=2, y=3)
+    em.add_entity(e)
+    assert em.locations[(2, 3)] == {e}
+
+
+def test_rm_entity__unindexes_location(em):
+    e = Entity(name="fleeb", x=2, y=3)
+    em.add_entity(e)
+    em.rm_entity(e)
+    assert (2, 3) not in em.locations
+
+
+def test_get_entities_at__empty(em):
+    assert em.get_entities_at(0, 0) == set()
+
+
+def test_get_entities_at__multiple(em):
+    e = Entity(name="fleeb", x=2, y=3)
+    f = Entity(name="floob", x=2, y=3)
+    g = Entity(name="flab", x=1, y=3)
+    em.add_entities(e, f, g)
+    assert em.get_entities_at(2, 3) == {e, f}
+
+
+def test_reindex__setting_xy_updates_index(em):
+    e = Entity(name="fleeb", x=2, y=3)
+    em.add_entity(e)
+    e.x, e.y = 4, 5
+    assert em.get_entities_at(2, 3) == set()
+    assert em.get_entities_at(4, 5) == {e}
+
+
+def test_reindex__move_updates_index(em):
+    e = Entity(name="fleeb", x=2, y=3)
+    em.add_entity(e)
+    e.move(1, -1)
+    assert em.get_entities_at(3, 2) == {e}
+    assert (2, 3) not in em.locations
+
+
+def test_reindex__entity_not_in_manager__ignored(em):
+    e = Entity(name="fleeb", x=2, y=3)
+    em.reindex(e, (0, 0))
+    assert em.locations == {}
+
+
+def test_rm_item__full_stack__unindexes_location(em, fleeb3):
+    em.add_item(fleeb3)
+    em.rm_item(fleeb3)
+    assert em.locations == {}
+
+
+def test_init__comp_index(em):
+    assert em.comp_index == {}
+
+
+def test_init__living(em):
+    assert em.living == set()
+
+
+def test_add_entity__indexes_components(em):
+    e = Entity(name="fleeb", item=True)
+    em.add_entity(e)
+    assert em.comp_index["item"] == {e}
+    assert em.comp_index["name"] == {e}
+
+
+def test_rm_entity__unindexes_components(em):
+    e = Entity(name="fleeb", item=True)
+    em.add_entity(e)
+    em.rm_entity(e)
+    assert "item" not in em.comp_index
+
+
+def test_has_comp__after_add_comp(em):
+    e = Entity(name="fleeb")
+    em.add_entity(e)
+    e.add_comp(item=True)
+    assert em.has_comp("item") == {e}
+
+
+def test_has_comp__after_setattr_new_comp(em):
+    e = Entity(name="fleeb")
+    em.add_entity(e)
+    e.item = True
+    assert em.has_comp("item") == {e}
+
+
+def test_has_comp__after_rm_comp(em):
+    e = Entity(name="fleeb", item=True)
+    em.add_entity(e)
+    e.rm_comp("item")
+    assert em.has_comp("item") == set()
+
+
+def test_has_comp__returns_copy(em):
+    e = Entity(name="fleeb", item=True)
+    em.add_entity(e)
+    em.has_comp("item").clear()
+    assert em.has_comp("item") == {e}
+
+
+def test_living__live_fighter_added(em):
+    e = Entity(name="fleeb", fighter=Fighter(max_hp=5, base_ac=10))
+    em.add_entity(e)
+    assert em.living == {e}
+
+
+def test_living__fighter_dies__removed(em):
+    e = Entity(name="fleeb", fighter=Fighter(max_hp=5, base_ac=10))
+    em.add_entity(e)
+    e.fighter.hp = 0
+    assert em.living == set()
+
+
+def test_living__fighter_revived__added(em):
+    e = Entity(name="fleeb", fighter=Fighter(max_hp=5, base_ac=10))
+    em.add_entity(e)
+    e.fighter.hp = 0
+    e.fighter.hp = 3
+    assert em.living == {e}
+
+
+def test_living__dead_fighter_not_added(em):
+    e = Entity(name="fleeb", fighter=Fighter(max_hp=5, base_ac=10))
+    e.fighter.hp = 0
+    em.add_entity(e)
+    assert em.living == set()
+
+
+def test_living__rm_entity__removed(em):
+    e = Entity(name="fleeb", fighter=Fighter(max_hp=5, base_ac=10))
+    em.add_entity(e)
+    em.rm_entity(e)
+    assert em.living == set()
+
+
 def test_is_empty(em):
     assert len(em) == 0
     assert em.is_empty()
@@ -501,3 +657,61 @@ def test_get_similar__item_coordinates_returns_entity(em):
     e2 = Entity(name="fleeb", x=-1, y=-1)
     em.add_entities(e1)
     assert em.get_similar(e2) == e1
+
+
+def test_init__opaque(em):
+    assert em.opaque == set()
+
+
+def test_opaque__blocker_added(em):
+    e = Entity(name="boulder", transparent=False)
+    em.add_entity(e)
+    assert em.opaque == {e}
+
+
+def test_opaque__becomes_transparent__removed(em):
+    e = Entity(name="boulder", transparent=False)
+    em.add_entity(e)
+    e.transparent = True
+    assert em.opaque == set()
+
+
+def test_opaque__removed_entity(em):
+    e = Entity(name="boulder", transparent=False)
+    em.add_entity(e)
+    em.rm_entity(e)
+    assert em.opaque == set()
+
+
+def test_blocker_version__blocker_added(em):
+    em.add_entity(Entity(name="orc", x=1, y=1, blocks_movement=True))
+    assert em.blocker_version == 1
+
+
+def test_blocker_version__blocker_moves(em):
+    e = Entity(name="orc", x=1, y=1, blocks_movement=True)
+    em.add_entity(e)
+    e.x = 2
+    assert em.blocker_version == 2
+
+
+def test_blocker_version__stops_blocking(em):
+    e = Entity(name="orc", x=1, y=1, blocks_movement=True)
+    em.add_entity(e)
+    e.blocks_movement = False
+    assert em.blocker_version == 2
+
+
+def test_blocker_version__blocker_removed(em):
+    e = Entity(name="orc", x=1, y=1, blocks_movement=True)
+    em.add_entity(e)
+    em.rm_entity(e)
+    assert em.blocker_version == 2
+
+
+def test_blocker_version__non_blocker__unchanged(em):
+    e = Entity(name="fleeb", x=1, y=1, blocks_movement=False)
+    em.add_entity(e)
+    e.x = 2
+    em.rm_entity(e)
+    assert em.blocker_version == 0
@@ -1,6 +1,8 @@
-from src import factory
+from src import db, factory, settings
 from components.level import Level
 from src.entity import Entity
+import pytest
+import random
 
 actor_dict = {
     "guinea pig": {"level": Level(level_up_base=20, difficulty=5)},
@@ -26,6 +28,16 @@ def test_difficulty_specific_monster__xp1_dlevel1():
     assert result == "grid bug"
 
 
+def test_with_rng__copy_shares_entities():
+    ef = factory.EntityFactory(actor_dict)
+    rng = random.Random(1)
+    result = ef.with_rng(rng)
+    assert result is not ef
+    assert result.rng is rng
+    assert result.entities is ef.entities
+    assert ef.rng is random
+
+
 max_foos_by_floor = [
     (0, 1), (2, 2), (3, 3), (5, 5)
 ]
@@ -58,4 +70,44 @@ weighted_chances = {
     0: [('a', 5), ('b', 5)],
     1: [('a', 10), ('c', 5)],
     2: [('a', 15), ('d', 5)],
-}
\ No newline at end of file
+}
+
+
+def test_make__does_not_change_db():
+    factory.make("grid bug")
+    assert "name" not in db.actor_dict["grid bug"]
+
+
+def test_make__new_copy_each_time():
+    a, b = factory.make("grid bug"), factory.make("grid bug")
+    assert a is not b
+    assert a.fighter is not b.fighter
+
+
+def test_make__damage_does_not_change_prototype():
+    a = factory.make("grid bug")
+    a.fighter.hp -= 1
+    assert factory.prototypes.get("grid bug").fighter.hp == a.fighter.max_hp
+
+
+def test_make__prototypes_off__builds(monkeypatch):
+    monkeypatch.setattr(settings, "entity_prototypes", False)
+    result = factory.make("dagger")
+    assert result.name == "dagger"
+
+
+def test_PrototypeRegistry__get__builds_once():
+    r = factory.PrototypeRegistry()
+    assert r.get("dagger") is r.get("dagger")
+
+
+def test_PrototypeRegistry__make__is_clone():
+    r = factory.PrototypeRegistry()
+    result = r.make("dagger")
+    assert result is not r.get("dagger")
+    assert result.equippable.parent is result
+
+
+def test_build__invalid_name__raises_ValueError():
+    with pytest.raises(ValueError):
+        factory.build("fleeb")
@@ -0,0 +1,89 @@
+""" Tests for fov.py """
+from src import db, fov, gamemap, tiles
+from src.player import Player
+import copy
+import numpy as np
+import toolkit
+
+
+def blank_map():
+    return gamemap.GameMap(width=6, height=6, fill_tile=tiles.floor)
+
+
+def test_FovCache__init__empty():
+    c = fov.FovCache()
+    assert c.transparent is None
+    assert c.lit is None
+
+
+def test_FovCache__update__opaque_entity():
+    m = toolkit.test_map()
+    m.place(copy.deepcopy(db.hidden_corridor), 2, 2)
+    transparent, lit = fov.FovCache().update(m)
+    assert transparent[2, 2] is np.False_
+
+
+def test_FovCache__update__no_changes__reuses_masks():
+    m = toolkit.test_map()
+    c = fov.FovCache()
+    transparent, lit = c.update(m)
+    assert c.update(m)[0] is transparent
+    assert c.update(m)[1] is lit
+
+
+def test_FovCache__update__blocker_moves__rebuilds_transparent():
+    m = toolkit.test_map()
+    blocker = copy.deepcopy(db.hidden_corridor)
+    m.place(blocker, 2, 2)
+    c = fov.FovCache()
+    c.update(m)
+    blocker.move(1, 0)
+
+    transparent, lit = c.update(m)
+    assert transparent[2, 2] == m.tiles[2, 2]["transparent"]
+    assert not transparent[3, 2]
+
+
+def test_FovCache__update__light_moves__rebuilds_lit():
+    m = blank_map()
+    p = Player()
+    m.place(p, 2, 2)
+    c = fov.FovCache()
+    c.update(m)
+    p.move(3, 0)
+
+    transparent, lit = c.update(m)
+    assert not lit[1, 1]
+    assert lit[5, 2]
+
+
+def test_FovCache__update__tile_changes__rebuilds_transparent():
+    m = toolkit.test_map()
+    c = fov.FovCache()
+    c.update(m)
+    m.tiles[2, 2] = tiles.wall
+
+    transparent, lit = c.update(m)
+    assert not transparent[2, 2]
+
+
+def test_FovCache__update__light_skips_room_walls():
+    m = blank_map()
+    m.tiles[1, 1] = tiles.room_walls[0]
+    p = Player()
+    m.place(p, 2, 2)
+
+    transparent, lit = fov.FovCache().update(m)
+    assert not lit[1, 1]
+    assert lit[2, 1]
+
+
+def test_light_area__clipped_to_map():
+    m = toolkit.test_map()
+    result = fov.light_area(m, 0, 0, 1)
+    assert result == (slice(0, 2), slice(0, 2))
+
+
+def test_light_area__off_map__None():
+    m = toolkit.test_map()
+    assert fov.light_area(m, -5, -5, 1) is None
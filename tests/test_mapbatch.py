@@ -0,0 +1,51 @@
+""" Tests for mapbatch.py """
+from src import gamemap, mapbatch, settings
+import concurrent.futures
+
+SMALL = dict(max_rooms=4, map_width=40, map_height=30)
+
+
+def test_map_options__defaults():
+    result = mapbatch.map_options()
+    assert result["max_rooms"] == settings.max_rooms
+    assert result["difficulty"] == 1
+
+
+def test_map_options__override():
+    result = mapbatch.map_options(max_rooms=3)
+    assert result["max_rooms"] == 3
+
+
+def test_generate_maps__count():
+    result = mapbatch.generate_maps(2, seed=1, workers=1, **SMALL)
+    assert len(result) == 2
+    assert all(isinstance(m, gamemap.GameMap) for m in result)
+
+
+def test_generate_maps__same_seed__same_maps():
+    maps1 = mapbatch.generate_maps(2, seed=1, workers=1, **SMALL)
+    maps2 = mapbatch.generate_maps(2, seed=1, workers=1, **SMALL)
+    assert all((m1.tiles == m2.tiles).all() for m1, m2 in zip(maps1, maps2))
+
+
+def test_generate_maps__pool_matches_serial():
+    serial = mapbatch.generate_maps(2, seed=5, workers=1, **SMALL)
+    pooled = mapbatch.generate_maps(2, seed=5, workers=2, **SMALL)
+    assert all((m1.tiles == m2.tiles).all() for m1, m2 in zip(serial, pooled))
+
+
+def test_save_maps__load_maps(tmp_path):
+    filename = tmp_path / "maps.xz"
+    maps = mapbatch.generate_maps(1, seed=1, workers=1, **SMALL)
+    mapbatch.save_maps(maps, filename)
+    result = mapbatch.load_maps(filename)
+    assert (result[0].tiles == maps[0].tiles).all()
+
+
+def test_generate_maps__executor():
+    serial = mapbatch.generate_maps(2, seed=5, workers=1, **SMALL)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+        pooled = mapbatch.generate_maps(2, seed=5, executor=executor, **SMALL)
+        again = mapbatch.generate_maps(2, seed=5, executor=executor, **SMALL)
+    assert all((m1.tiles == m2.tiles).all() for m1, m2 in zip(serial, pooled))
+    assert all((m1.tiles == m2.tiles).all() for m1, m2 in zip(serial, again))
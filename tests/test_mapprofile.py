@@ -0,0 +1,116 @@
+""" Tests for mapprofile.py """
+from src import mapbatch, mapprofile, procgen
+import os
+import pathlib
+import random
+import subprocess
+import sys
+
+SMALL = dict(max_rooms=4, room_min_size=6, room_max_size=10, map_width=40, map_height=30, max_distance=50,
+             difficulty=1)
+
+
+def test_stage__adds_up():
+    profile = mapprofile.MapProfile()
+    with profile.stage("rooms"):
+        pass
+    first = profile.times["rooms"]
+    with profile.stage("rooms"):
+        pass
+    assert profile.times["rooms"] >= first
+
+
+def test_count():
+    profile = mapprofile.MapProfile()
+    profile.count("room tries")
+    profile.count("room tries", 2)
+    assert profile.counts["room tries"] == 3
+
+
+def test_merge():
+    a, b = mapprofile.MapProfile(), mapprofile.MapProfile()
+    a.times["rooms"], b.times["rooms"] = 1.0, 2.0
+    a.count("rooms", 4)
+    b.count("rooms", 6)
+    a.merge(b)
+    assert a.maps == 2
+    assert a.times["rooms"] == 3.0
+    assert a.counts["rooms"] == 10
+
+
+def test_report__one_map():
+    profile = mapprofile.MapProfile()
+    profile.times["rooms"] = 0.002
+    profile.count("rooms", 5)
+    assert profile.report() == ["Time: 2.0ms", "  rooms: 2.0ms", "Counts:", "  rooms: 5"]
+
+
+def test_report__averages_merged_maps():
+    a, b = mapprofile.MapProfile(), mapprofile.MapProfile()
+    a.times["rooms"], b.times["rooms"] = 0.001, 0.003
+    a.count("rooms", 4)
+    b.count("rooms", 5)
+    a.merge(b)
+    assert a.report() == ["Time per map: 2.0ms", "  rooms: 2.0ms", "Counts per map:", "  rooms: 4.5"]
+
+
+def test_NullProfile__records_nothing():
+    profile = mapprofile.NullProfile()
+    with profile.stage("rooms"):
+        profile.count("rooms")
+    assert not profile.times
+    assert not profile.counts
+
+
+def test_generate_map__no_profile():
+    new_map = procgen.generate_map(**SMALL, rng=random.Random(1))
+    assert new_map.profile is None
+    assert not mapprofile.NO_PROFILE.counts
+
+
+def test_generate_map__profiled():
+    profile = mapprofile.MapProfile()
+    new_map = procgen.generate_map(**SMALL, rng=random.Random(1), profile=profile)
+
+    assert new_map.profile is profile
+    assert list(profile.times) == ["rooms", "draw rooms", "corridors", "doors & stairs", "hidden features",
+                                   "closets"]
+    assert profile.counts["rooms"] == len(new_map.rooms)
+    assert profile.counts["room tries"] >= len(new_map.rooms)
+    assert profile.counts["door pairs tried"] == profile.counts["L paths"] + profile.counts["routed paths"]
+    assert profile.counts["corridor dug"] > 0
+
+
+def test_generate_map__profiled__same_map():
+    plain = procgen.generate_map(**SMALL, rng=random.Random(2))
+    profiled = procgen.generate_map(**SMALL, rng=random.Random(2), profile=mapprofile.MapProfile())
+    assert (plain.tiles == profiled.tiles).all()
+
+
+def test_generate_maps__profile():
+    maps = mapbatch.generate_maps(2, seed=1, workers=1, profile=True, max_rooms=4, map_width=40, map_height=30)
+    assert all(m.profile.counts["rooms"] == len(m.rooms) for m in maps)
+
+
+def test_profile_maps__merges():
+    total, maps = mapprofile.profile_maps(3, seed=1, workers=1, max_rooms=4, map_width=40, map_height=30)
+    assert total.maps == 3
+    assert total.counts["rooms"] == sum(len(m.rooms) for m in maps)
+
+
+def test_main__prints_report(capsys):
+    mapprofile.main(["--count", "2", "--width", "40", "--height", "30", "--rooms", "4"])
+    out = capsys.readouterr().out
+    assert "Maps: 2 (seeds 1 to 2)" in out
+    assert "Time per map" in out
+    assert "room tries" in out
+
+
+def test_import__fresh_interpreter(tmp_path):
+    # Nothing else has imported procgen first, so a circular import would fail here. It runs in tmp_path so the
+    # log files it makes don't end up in the repo.
+    root = pathlib.Path(__file__).resolve().parent.parent
+    env = dict(os.environ, PYTHONPATH=str(root))
+    result = subprocess.run([sys.executable, "-c", "import src.mapprofile"], cwd=tmp_path, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,70 @@
+""" Tests for placement.py """
+from src import placement
+from src.room import Room
+import random
+
+
+def test_is_free__empty_grid():
+    grid = placement.OccupancyGrid(20, 10)
+    assert grid.is_free(0, 0, 19, 9)
+
+
+def test_is_free__overlaps_room():
+    grid = placement.OccupancyGrid(20, 10)
+    grid.add(Room(5, 2, 4, 4))  # Covers (5, 2) to (8, 5)
+    assert not grid.is_free(8, 5, 12, 8)
+    assert not grid.is_free(0, 0, 19, 9)
+
+
+def test_is_free__next_to_room():
+    grid = placement.OccupancyGrid(20, 10)
+    grid.add(Room(5, 2, 4, 4))
+    assert grid.is_free(9, 2, 12, 5)
+    assert grid.is_free(0, 0, 4, 9)
+
+
+def test_free_positions__in_bounds():
+    grid = placement.OccupancyGrid(20, 10)
+    # Same bounds as procgen.generate_random_room: x from 0 to 20 - 5 - 1
+    assert grid.free_positions(5, 4).shape == (15, 6)
+
+
+def test_free_positions__too_big():
+    grid = placement.OccupancyGrid(20, 10)
+    assert not grid.free_positions(5, 10).any()
+
+
+def test_free_positions__matches_intersects():
+    grid = placement.OccupancyGrid(30, 20)
+    rooms = [Room(2, 2, 6, 5), Room(15, 8, 8, 7)]
+    for r in rooms:
+        grid.add(r)
+
+    free = grid.free_positions(5, 4)
+    for x in range(free.shape[0]):
+        for y in range(free.shape[1]):
+            new_room = Room(x, y, 5, 4)
+            assert free[x, y] == (not any(new_room.intersects(r) for r in rooms))
+
+
+def test_free_positions__max_distance():
+    grid = placement.OccupancyGrid(100, 20, max_distance=10)
+    grid.add(Room(0, 0, 5, 5))  # Center (2, 2)
+
+    free = grid.free_positions(5, 5)
+    xs, ys = free.nonzero()
+    assert free.any()
+    assert ((xs + 2 - 2) ** 2 + (ys + 2 - 2) ** 2 <= 10 ** 2).all()
+
+
+def test_random_position__fits():
+    grid = placement.OccupancyGrid(30, 20)
+    grid.add(Room(2, 2, 6, 5))
+    x, y = grid.random_position(5, 4, random.Random(1))
+    assert grid.is_free(x, y, x + 4, y + 3)
+
+
+def test_random_position__no_space__None():
+    grid = placement.OccupancyGrid(10, 10)
+    grid.add(Room(0, 0, 10, 10))
+    assert grid.random_position(3, 3, random.Random(1)) is None
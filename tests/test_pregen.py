@@ -0,0 +1,90 @@
+from src import dungeon, player, pregen
+from src.rng import GameRNG
+from tests import toolkit
+from types import SimpleNamespace
+import copy
+import pytest
+
+
+@pytest.fixture
+def quik_d():
+    plyr = player.Player()
+    e = SimpleNamespace(game_map='testmap', player=plyr)
+    return dungeon.Dungeon(engine=e, test_map=toolkit.stair_map)
+
+
+@pytest.fixture
+def seeded_d():
+    plyr = player.Player()
+    e = SimpleNamespace(game_map='testmap', player=plyr, rng=GameRNG(1))
+    return dungeon.Dungeon(engine=e)
+
+
+def test_executor__is_shared():
+    assert pregen.executor() is pregen.executor()
+
+
+def test_LevelJob_init(quik_d):
+    job = pregen.LevelJob(quik_d, 2)
+    assert job.dlevel == 2
+    assert job.difficulty == 1
+    assert job.player_level == quik_d.engine.player.level.current_level
+    assert not job.started
+
+
+def test_build__map_is_not_added_to_dungeon(quik_d):
+    job = pregen.LevelJob(quik_d, 2)
+    new_map = job.build()
+    assert new_map not in quik_d.map_list
+
+
+def test_build__populates_map(seeded_d):
+    job = pregen.LevelJob(seeded_d, 2)
+    new_map = job.build()
+    assert list(new_map.actors)
+    assert all(a.xy != new_map.upstairs_location for a in new_map.actors)
+
+
+def test_result__not_started__builds_now(quik_d):
+    job = pregen.LevelJob(quik_d, 2)
+    assert job.result().dlevel == 1
+
+
+def test_result__started(quik_d):
+    job = pregen.LevelJob(quik_d, 2)
+    job.start()
+    assert job.result() is not None
+    assert job.future.done()
+
+
+def test_cancel__queued_job__built_now(quik_d):
+    job = pregen.LevelJob(quik_d, 2)
+    job.start()
+    job.cancel()
+    assert job.future.cancelled() or job.future.done()
+    assert job.result() is not None
+
+
+def test_cancel__not_started(quik_d):
+    job = pregen.LevelJob(quik_d, 2)
+    job.cancel()
+    assert not job.started
+
+
+def test_result__same_level_in_background_or_now(seeded_d):
+    job = pregen.LevelJob(seeded_d, 2)
+    background_job = copy.copy(job)  # Same seeds
+    now = job.result()
+
+    background_job.start()
+    background = background_job.result()
+    assert now.rooms and len(now.rooms) == len(background.rooms)
+    assert (now.tiles == background.tiles).all()
+    assert sorted(str(e) for e in now.entities) == sorted(str(e) for e in background.entities)
+    assert {(e.x, e.y) for e in now.entities} == {(e.x, e.y) for e in background.entities}
+
+
+def test_result__same_level_every_time(quik_d):
+    job = pregen.LevelJob(quik_d, 2)
+    job.start()
+    assert job.result() is job.result()
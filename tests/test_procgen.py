@@ -1,5 +1,7 @@
 """ Tests for procgen.py """
-from src import procgen
+from src import gamemap, procgen, room, settings, utils
+import pytest
+import random
 
 
 def test_generate_random_room__in_bounds():
@@ -57,3 +59,90 @@ def test_get_L_path__straight_line_vert():
 
     # corner is repeated
     assert result == [(0, 0), (0, 1), (0, 2)]
+
+
+def test_generate_rooms__no_overlaps():
+    new_map = gamemap.GameMap(80, 45)
+    procgen.generate_rooms(new_map, 15, 6, 10, rng=random.Random(1))
+    rooms = new_map.rooms
+    assert not any(a.intersects(b) for i, a in enumerate(rooms) for b in rooms[i + 1:])
+
+
+def test_generate_rooms__labels_match_index():
+    new_map = gamemap.GameMap(80, 45)
+    procgen.generate_rooms(new_map, 15, 6, 10, rng=random.Random(1))
+    assert [r.label for r in new_map.rooms] == list(range(len(new_map.rooms)))
+
+
+def test_generate_rooms__large_map__all_rooms_placed():
+    new_map = gamemap.GameMap(200, 200)
+    procgen.generate_rooms(new_map, 150, 6, 10, max_distance=300, rng=random.Random(1))
+    assert len(new_map.rooms) == 150
+
+
+def test_generate_rooms__large_map__default_distance_scales():
+    # With the distance meant for the standard map, the rooms used to stay in one 50 tile cluster (~28 rooms).
+    new_map = gamemap.GameMap(200, 200)
+    procgen.generate_rooms(new_map, 200, 6, 10, rng=random.Random(1))
+    assert len(new_map.rooms) >= 150
+
+
+def test_generate_rooms__no_max_distance():
+    new_map = gamemap.GameMap(200, 200)
+    procgen.generate_rooms(new_map, 150, 6, 10, max_distance=None, rng=random.Random(1))
+    assert len(new_map.rooms) == 150
+
+
+def test_scale_distance__standard_map__unchanged():
+    assert procgen.scale_distance(50, settings.map_width, settings.map_height) == 50
+
+
+def test_scale_distance__small_map__unchanged():
+    assert procgen.scale_distance(50, 20, 20) == 50
+
+
+def test_scale_distance__bigger_map__scaled_by_diagonal():
+    result = procgen.scale_distance(50, settings.map_width * 2, settings.map_height * 2)
+    assert result == pytest.approx(100)
+
+
+def test_door_pair_arrays__matches_door_checks():
+    new_map = gamemap.GameMap(40, 30)
+    room1, room2 = room.Room(0, 2, 8, 6), room.Room(6, 9, 7, 9)  # Overlapping x, room1 on the map edge.
+    distances, valid, facing = procgen.door_pair_arrays(new_map, room1, room2)
+
+    for i, a in enumerate(room1.get_all_possible_doors()):
+        for j, b in enumerate(room2.get_all_possible_doors()):
+            assert valid[i, j] == procgen.valid_pair_of_doors(new_map, a, b)
+            assert facing[i, j] == a.facing_other(b)
+            assert distances[i, j] == pytest.approx(utils.distance(a.x, a.y, b.x, b.y))
+
+
+def test_door_pair_arrays__side_by_side_rooms():
+    new_map = gamemap.GameMap(40, 30)
+    room1, room2 = room.Room(2, 2, 6, 6), room.Room(20, 3, 6, 6)
+    distances, valid, facing = procgen.door_pair_arrays(new_map, room1, room2)
+
+    for i, a in enumerate(room1.get_all_possible_doors()):
+        for j, b in enumerate(room2.get_all_possible_doors()):
+            assert valid[i, j] == procgen.valid_pair_of_doors(new_map, a, b)
+            assert facing[i, j] == a.facing_other(b)
+
+
+def test_build_lighters__no_rooms__empty():
+    result = procgen.build_lighters([])
+    assert result.shape == (4, 0)
+
+
+def test_build_lighters__combines_rooms():
+    rooms = [room.Room(0, 0, 3, 3), room.Room(5, 5, 4, 4)]
+    result = procgen.build_lighters(rooms)
+    assert result.shape == (4, 8 + 12)
+
+
+def test_generate_map__same_rng_seed__same_map():
+    kwargs = dict(max_rooms=8, room_min_size=6, room_max_size=10, map_width=80, map_height=45,
+                  max_distance=50, difficulty=1)
+    map1 = procgen.generate_map(**kwargs, rng=random.Random(3))
+    map2 = procgen.generate_map(**kwargs, rng=random.Random(3))
+    assert (map1.tiles == map2.tiles).all()
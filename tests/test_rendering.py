@@ -1,4 +1,11 @@
 """ Tests for rendering.py"""
+from src import db  # Avoids a circular import with setup_game
+from src import factory, mapprofile, messages, rendering, settings, setup_game
+from tests import toolkit
+import numpy as np
+import pytest
+import tcod
+
 # render_bar
 
 # render_dungeon_lvl_text
@@ -9,7 +16,123 @@
 
 # render_messages
 
-# render_map
+
+def test_render_history__pages_through_history_file():
+    msglog = messages.MsgLog(capacity=2, keep_history=True)
+    for i in range(100):
+        msglog.add_message(f"Message {i}")
+
+    console = tcod.Console(40, 20, order="F")
+    rendering.render_history(console, "History", 9, msglog)
+    rows = ["".join(chr(c) for c in console.ch[:, y]) for y in range(console.height)]
+    assert any("Message 9 " in row for row in rows)
+    assert any("Message 0 " in row for row in rows)
+    assert not any("Message 10" in row for row in rows)
+
+
+def render_map_per_entity(console, game_map):
+    """The original render_map, which prints the entities one at a time."""
+    console.tiles_rgb[0: game_map.width, 0: game_map.height] = np.select(
+        condlist=[game_map.visible, game_map.explored],
+        choicelist=[game_map.tiles["light"], game_map.tiles["dark"]],
+        default=rendering.tiles.SHROUD,
+    )
+    for entity in sorted(game_map.entities, key=lambda x: x.render_order.value):
+        if game_map.visible[entity.x, entity.y]:
+            if "hidden" not in entity:
+                console.print(x=entity.x, y=entity.y, string=entity.char, fg=entity.color)
+
+        if game_map.explored[entity.x, entity.y]:
+            item_or_trap = "item" in entity or "trap" in entity
+            if item_or_trap and "hidden" not in entity:
+                console.print(x=entity.x, y=entity.y, string=entity.char, fg=entity.color)
+
+
+def new_console():
+    return tcod.Console(settings.map_width, settings.map_height, order="F")
+
+
+@pytest.fixture
+def test_map():
+    m = toolkit.test_map()
+    m.visible[:] = False
+    m.explored[:] = False
+    return m
+
+
+def test_render_map__same_as_per_entity():
+    engine = setup_game.new_game(seed=1)
+    game_map = engine.game_map
+    game_map.explored[:, : game_map.height // 2] = True
+
+    expected, result = new_console(), new_console()
+    render_map_per_entity(expected, game_map)
+    rendering.render_map(result, game_map)
+    assert (result.rgba == expected.rgba).all()
+
+
+def test_entity_layer__no_entities():
+    m = toolkit.stair_map()
+    x, y, ch, fg = rendering.entity_layer(m)
+    assert len(x) == len(y) == len(ch) == len(fg) == 0
+
+
+def test_entity_layer__not_visible__not_drawn(test_map):
+    factory.spawn("grid bug", test_map, 2, 2)
+    x, y, ch, fg = rendering.entity_layer(test_map)
+    assert len(x) == 0
+
+
+def test_entity_layer__visible__drawn(test_map):
+    test_map.visible[2, 2] = True
+    bug = factory.spawn("grid bug", test_map, 2, 2)
+    x, y, ch, fg = rendering.entity_layer(test_map)
+    assert (x.tolist(), y.tolist()) == ([2], [2])
+    assert ch.tolist() == [ord(bug.char)]
+    assert fg.tolist() == [list(bug.color)]
+
+
+def test_entity_layer__hidden__not_drawn(test_map):
+    test_map.visible[2, 2] = True
+    bug = factory.spawn("grid bug", test_map, 2, 2)
+    bug.add_comp(hidden=True)
+    x, y, ch, fg = rendering.entity_layer(test_map)
+    assert len(x) == 0
+
+
+def test_entity_layer__explored_item__drawn(test_map):
+    test_map.explored[2, 2] = True
+    factory.spawn("dagger", test_map, 2, 2)
+    x, y, ch, fg = rendering.entity_layer(test_map)
+    assert (x.tolist(), y.tolist()) == ([2], [2])
+
+
+def test_entity_layer__explored_actor__not_drawn(test_map):
+    test_map.explored[2, 2] = True
+    factory.spawn("grid bug", test_map, 2, 2)
+    x, y, ch, fg = rendering.entity_layer(test_map)
+    assert len(x) == 0
+
+
+def test_entity_layer__highest_render_order_wins(test_map):
+    test_map.visible[2, 2] = True
+    factory.spawn("dagger", test_map, 2, 2)
+    bug = factory.spawn("grid bug", test_map, 2, 2)
+    factory.spawn("money", test_map, 2, 2)
+    x, y, ch, fg = rendering.entity_layer(test_map)
+    assert ch.tolist() == [ord(bug.char)]
 
 
+def test_render_map_profile__top_right():
+    console = tcod.Console(80, 50, order="F")
+    profile = mapprofile.MapProfile()
+    profile.times["rooms"] = 0.001
+    profile.count("rooms", 3)
+    rendering.render_map_profile(console, profile)
 
+    x = 80 - len("  rooms: 1.0ms") - 2  # The box is as wide as the longest line, against the right edge.
+    assert console.ch[x, 1] == ord("┌")
+    assert console.ch[79, 1] == ord("┐")
+    assert "".join(chr(c) for c in console.ch[x + 1:x + 12, 2]) == "Time: 1.0ms"
+    assert "".join(chr(c) for c in console.ch[x + 1:x + 8, 4]) == "Counts:"
+    assert console.ch[x - 1, 2] == ord(" ")
@@ -0,0 +1,39 @@
+""" Tests for rng.py """
+from src.rng import GameRNG
+import pickle
+import random
+
+
+def test_init__seed():
+    r = GameRNG(seed=5)
+    assert r.seed == 5
+
+
+def test_init__no_seed__picks_one():
+    r = GameRNG()
+    assert isinstance(r.seed, int)
+
+
+def test_init__streams_are_Random():
+    r = GameRNG(seed=5)
+    for stream in (r.mapgen, r.spawn, r.combat):
+        assert isinstance(stream, random.Random)
+
+
+def test_init__same_seed__same_streams():
+    r1, r2 = GameRNG(seed=5), GameRNG(seed=5)
+    assert r1.mapgen.random() == r2.mapgen.random()
+    assert r1.spawn.random() == r2.spawn.random()
+    assert r1.combat.random() == r2.combat.random()
+
+
+def test_init__streams_are_independent():
+    r = GameRNG(seed=5)
+    assert r.mapgen.random() != r.spawn.random()
+
+
+def test_pickle__continues_where_it_left_off():
+    r = GameRNG(seed=5)
+    r.combat.random()
+    copy = pickle.loads(pickle.dumps(r))
+    assert copy.combat.random() == r.combat.random()
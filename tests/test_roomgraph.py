@@ -0,0 +1,82 @@
+""" Tests for roomgraph.py """
+from src import gamemap, procgen, roomgraph
+from src.room import Room
+from src.utils import distance
+import pytest
+import random
+
+
+def labeled(rooms):
+    for i, r in enumerate(rooms):
+        r.label = i
+    return rooms
+
+
+@pytest.fixture
+def rooms():
+    new_map = gamemap.GameMap(120, 80)
+    procgen.generate_rooms(new_map, 30, 6, 10, max_distance=200, rng=random.Random(1))
+    return new_map.rooms
+
+
+def tree_weight(edges):
+    return sum(distance(*a.center, *b.center) for a, b in edges)
+
+
+def naive_tree_weight(rooms):
+    """Prim's Algorithm comparing every visited and unvisited pair, like procgen used to."""
+    visited, unvisited = [rooms[0]], rooms[1:]
+    total = 0
+    while unvisited:
+        dist, i = min((distance(*r.center, *u.center), i) for r in visited for i, u in enumerate(unvisited))
+        total += dist
+        visited.append(unvisited.pop(i))
+    return total
+
+
+def test_min_spanning_tree__no_rooms():
+    assert roomgraph.RoomGraph([]).min_spanning_tree() == []
+
+
+def test_min_spanning_tree__one_room():
+    assert roomgraph.RoomGraph(labeled([Room(0, 0, 5, 5)])).min_spanning_tree() == []
+
+
+def test_min_spanning_tree__connects_all_rooms(rooms):
+    edges = roomgraph.RoomGraph(rooms).min_spanning_tree()
+    assert len(edges) == len(rooms) - 1
+
+    plan = roomgraph.RoomGraph(rooms)
+    for a, b in edges:
+        plan.connect(a, b)
+    assert all(plan.graph.connected(rooms[0].label, r.label) for r in rooms)
+
+
+def test_min_spanning_tree__minimum_weight(rooms):
+    edges = roomgraph.RoomGraph(rooms).min_spanning_tree()
+    assert tree_weight(edges) == pytest.approx(naive_tree_weight(rooms))
+
+
+def test_nearest_unconnected__closest_room():
+    a, b, c = labeled([Room(0, 0, 5, 5), Room(20, 0, 5, 5), Room(8, 0, 5, 5)])
+    assert roomgraph.RoomGraph([a, b, c]).nearest_unconnected(a) is c
+
+
+def test_nearest_unconnected__skips_connected():
+    a, b, c = labeled([Room(0, 0, 5, 5), Room(20, 0, 5, 5), Room(8, 0, 5, 5)])
+    plan = roomgraph.RoomGraph([a, b, c])
+    plan.connect(a, c)
+    assert plan.nearest_unconnected(a) is b
+
+
+def test_nearest_unconnected__all_connected__None():
+    a, b = labeled([Room(0, 0, 5, 5), Room(20, 0, 5, 5)])
+    plan = roomgraph.RoomGraph([a, b])
+    plan.connect(a, b)
+    assert plan.nearest_unconnected(a) is None
+
+
+def test_nearest_unconnected__measures_to_nearest_tile():
+    # b's center is closer, but c's wall is closer to a's center.
+    a, b, c = labeled([Room(0, 0, 5, 5), Room(0, 12, 5, 5), Room(8, 0, 10, 30)])
+    assert roomgraph.RoomGraph([a, b, c]).nearest_unconnected(a) is c
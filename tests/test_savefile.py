@@ -0,0 +1,270 @@
+""" Tests for savefile.py """
+from src import db  # Avoids a circular import with setup_game
+from src import savefile, settings, setup_game
+import lzma
+import pickle
+import pytest
+
+
+@pytest.fixture
+def engine():
+    # A new game with 3 levels, the player is on level 2.
+    e = setup_game.new_game(seed=1)
+    e.dungeon.add_next_floor()
+    e.dungeon.add_next_floor()
+    e.dungeon.move_downstairs(e.player)
+    return e
+
+
+def chunks_of(filename):
+    with open(filename, "rb") as f:
+        index = savefile.read_index(f)
+        return {name: savefile.read_chunk(f, index, name) for name in index["chunks"]}
+
+
+def test_save__index(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    with open(filename, "rb") as f:
+        index = savefile.read_index(f)
+    assert index["dlevel"] == 2
+    assert index["levels"] == 3
+    assert set(index["chunks"]) == {"engine", "level 1", "level 2", "level 3"}
+
+
+def test_load__same_game(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    result = savefile.load(filename)
+
+    assert result.dungeon.dlevel == 2
+    assert result.turns == engine.turns
+    for dlevel in range(1, 4):
+        old_map, new_map = engine.dungeon.get_map(dlevel), result.dungeon.get_map(dlevel)
+        assert (old_map.tiles == new_map.tiles).all()
+        assert sorted(map(str, old_map.entities)) == sorted(map(str, new_map.entities))
+        assert new_map.engine is result
+
+
+def test_load__shared_objects_are_joined_up(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    result = savefile.load(filename)
+
+    assert result.game_map is result.dungeon.current_map
+    assert result.player.parent is result.game_map
+    assert result.player in result.game_map.entities
+    assert result.dungeon.engine is result
+
+
+def test_load__not_chunked__raises_ValueError(tmp_path):
+    filename = tmp_path / "game.sav"
+    filename.write_bytes(b"not a save")
+    with pytest.raises(ValueError):
+        savefile.load(str(filename))
+
+
+def test_snapshot__first_save__all_levels(engine, tmp_path):
+    chunks, sources, info = savefile.snapshot(engine, str(tmp_path / "game.sav"))
+    assert set(chunks) == {"engine", "level 1", "level 2", "level 3"}
+    assert info["levels"] == 3
+
+
+def test_snapshot__marks_levels_saved(engine, tmp_path):
+    savefile.snapshot(engine, str(tmp_path / "game.sav"))
+    assert engine.dungeon.changed_levels == {2}
+
+
+def test_save__again__only_changed_levels_rewritten(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    old_chunks = chunks_of(filename)
+
+    chunks, sources, info = savefile.snapshot(engine, filename)
+    assert set(chunks) == {"engine", "level 2"}
+
+    savefile.write(filename, chunks, sources, info)
+    new_chunks = chunks_of(filename)
+    assert new_chunks["level 1"] == old_chunks["level 1"]
+    assert new_chunks["level 3"] == old_chunks["level 3"]
+
+
+def test_save__visited_level_rewritten(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    engine.dungeon.move_downstairs(engine.player)
+
+    chunks, sources, info = savefile.snapshot(engine, filename)
+    assert set(chunks) == {"engine", "level 2", "level 3"}
+
+
+def test_save__other_file__all_levels(engine, tmp_path):
+    savefile.save(engine, str(tmp_path / "game.sav"))
+    chunks, sources, info = savefile.snapshot(engine, str(tmp_path / "other.sav"))
+    assert len(chunks) == 4
+
+
+def test_save__file_of_other_game__all_levels(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    savefile.save(setup_game.new_game(seed=2), filename)
+
+    chunks, sources, info = savefile.snapshot(engine, filename)
+    assert len(chunks) == 4
+
+
+def test_save__loaded_game__reuses_levels(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    result = savefile.load(filename)
+
+    chunks, sources, info = savefile.snapshot(result, filename)
+    assert set(chunks) == {"engine", "level 2"}
+
+
+def test_load__only_current_level_loaded(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    result = savefile.load(filename)
+
+    assert 1 in result.dungeon.level_store
+    assert 2 not in result.dungeon.level_store
+    assert 3 in result.dungeon.level_store
+    assert not hasattr(result.dungeon.map_list[0], "tiles")
+
+
+def test_get_map__loads_level(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    result = savefile.load(filename)
+
+    game_map = result.dungeon.get_map(1)
+    assert 1 not in result.dungeon.level_store
+    assert (game_map.tiles == engine.dungeon.get_map(1).tiles).all()
+    assert game_map.engine is result
+
+
+def test_move_upstairs__loads_level(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    result = savefile.load(filename)
+
+    assert result.dungeon.move_upstairs(result.player)
+    assert result.player.parent is result.dungeon.get_map(1)
+    assert result.player in result.game_map.entities
+    assert 1 not in result.dungeon.level_store
+
+
+def test_save__loaded_game__other_file__copies_unloaded_levels(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    result = savefile.load(filename)
+
+    other = str(tmp_path / "other.sav")
+    savefile.save(result, other)
+    assert chunks_of(other)["level 1"] == chunks_of(filename)["level 1"]
+    assert 1 in result.dungeon.level_store
+
+    reloaded = savefile.load(other)
+    assert (reloaded.dungeon.get_map(3).tiles == engine.dungeon.get_map(3).tiles).all()
+
+
+def test_move_downstairs__evicts_far_levels(engine):
+    level_1 = engine.dungeon.map_list[0]
+    engine.dungeon.move_downstairs(engine.player)
+
+    assert 1 in engine.dungeon.level_store.spilled
+    assert 2 not in engine.dungeon.level_store
+    assert not hasattr(level_1, "tiles")
+
+
+def test_move_downstairs__resident_levels_None__keeps_all(engine, monkeypatch):
+    monkeypatch.setattr(settings, "resident_levels", None)
+    engine.dungeon.move_downstairs(engine.player)
+    assert 1 not in engine.dungeon.level_store
+    assert hasattr(engine.dungeon.map_list[0], "tiles")
+
+
+def test_move_upstairs__restores_evicted_level(engine):
+    tiles = engine.dungeon.get_map(1).tiles.copy()
+    entities = sorted(map(str, engine.dungeon.get_map(1).entities))
+    engine.dungeon.move_downstairs(engine.player)
+    engine.dungeon.move_upstairs(engine.player)
+    engine.dungeon.move_upstairs(engine.player)
+
+    level_1 = engine.dungeon.get_map(1)
+    assert engine.game_map is level_1
+    assert (level_1.tiles == tiles).all()
+    assert sorted(map(str, level_1.entities)) == sorted(entities + [str(engine.player)])
+    assert 1 not in engine.dungeon.level_store
+    assert 3 in engine.dungeon.level_store
+
+
+def test_evict__unchanged_saved_level__uses_save_file(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    engine.dungeon.move_downstairs(engine.player)
+
+    assert engine.dungeon.level_store.files == {1: filename}
+    assert not engine.dungeon.level_store.spilled
+
+
+def test_save__evicted_level(engine, tmp_path):
+    tiles = engine.dungeon.get_map(1).tiles.copy()
+    engine.dungeon.move_downstairs(engine.player)
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+
+    assert 1 in engine.dungeon.level_store
+    assert (savefile.load(filename).dungeon.get_map(1).tiles == tiles).all()
+
+
+def test_save__no_temp_file_left(engine, tmp_path):
+    savefile.save(engine, str(tmp_path / "game.sav"))
+    assert [p.name for p in tmp_path.iterdir()] == ["game.sav"]
+
+
+def test_save__helplog_not_saved(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+    engine_chunk = lzma.decompress(chunks_of(filename)["engine"])
+    assert b"HelpInfo" not in engine_chunk
+    assert savefile.load(filename).helplog.messages
+
+
+def test_load__keeps_message_history(engine, tmp_path):
+    for i in range(settings.msg_capacity + 10):
+        engine.msglog.add_message(f"Message {i}", stack=False)
+    filename = str(tmp_path / "game.sav")
+    savefile.save(engine, filename)
+
+    msglog = savefile.load(filename).msglog
+    assert len(msglog) == len(engine.msglog)
+    assert [m.plain_text for m in msglog.get_messages(0, len(msglog))] == \
+        [m.plain_text for m in engine.msglog.get_messages(0, len(engine.msglog))]
+
+
+def test_load_game__chunked(engine, tmp_path):
+    filename = str(tmp_path / "game.sav")
+    engine.save_as(filename)
+    assert setup_game.load_game(filename).dungeon.dlevel == 2
+
+
+def test_load_game__restarts_next_level(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "pregenerate_levels", True)
+    e = setup_game.new_game(seed=1)
+    filename = str(tmp_path / "game.sav")
+    e.save_as(filename)
+
+    result = setup_game.load_game(filename).dungeon.next_level
+    assert result.started
+    assert result.mapgen_seed == e.dungeon.next_level.mapgen_seed
+    assert (result.result().tiles == e.dungeon.next_level.result().tiles).all()
+
+
+def test_load_game__whole_engine_pickle__raises(engine, tmp_path):
+    # Saves from before the chunked format pickled the whole Engine.
+    filename = tmp_path / "game.sav"
+    filename.write_bytes(lzma.compress(pickle.dumps(engine)))
+    with pytest.raises(ValueError):
+        setup_game.load_game(str(filename))
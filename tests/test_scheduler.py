@@ -0,0 +1,135 @@
+""" Tests for scheduler.py """
+from components.energy import EnergyComponent
+from components.fighter import Fighter
+from src.actor import Actor
+from src.scheduler import EnergyScheduler
+import pytest
+
+
+def make_actor(refill, energy, scheduler=None):
+    """Makes an actor, and adds it to the scheduler if one is given (like GameMap does for new actors)."""
+    a = Actor(name="fleeb", fighter=Fighter(max_hp=5, base_ac=10), energy=EnergyComponent(refill=refill))
+    a.energy.energy = energy
+    if scheduler:
+        scheduler.add(a)
+    return a
+
+
+def burn_all(actor):
+    """Burns turns like Engine.handle_actor_turn and returns how many turns the actor took."""
+    turns = 0
+    while not actor.energy.burned_out() and actor.is_alive:
+        actor.energy.burn_turn()
+        turns += 1
+    return turns
+
+
+@pytest.fixture
+def scheduler():
+    return EnergyScheduler()
+
+
+def test_init(scheduler):
+    assert scheduler.time == 0
+    assert scheduler.queue == []
+    assert scheduler.actors == {}
+    assert scheduler.new_actors == set()
+
+
+def test_add__scheduled_next_turn(scheduler):
+    a = make_actor(refill=12, energy=0, scheduler=scheduler)
+    assert scheduler.new_actors == {a}
+    scheduler.ready_actors()
+    assert scheduler.new_actors == set()
+    assert a in scheduler.actors
+
+
+def test_add__already_scheduled__ignored(scheduler):
+    a = make_actor(refill=12, energy=0, scheduler=scheduler)
+    scheduler.ready_actors()
+    scheduler.add(a)
+    assert scheduler.new_actors == set()
+
+
+def test_remove__not_scheduled_yet(scheduler):
+    a = make_actor(refill=12, energy=0, scheduler=scheduler)
+    scheduler.remove(a)
+    assert scheduler.ready_actors() == []
+    assert a not in scheduler.actors
+
+
+def test_remove__no_refill__dropped(scheduler):
+    a = make_actor(refill=0, energy=0, scheduler=scheduler)
+    scheduler.ready_actors()
+    assert a in scheduler.actors
+    scheduler.remove(a)
+    assert a not in scheduler.actors
+
+
+def test_ready_actors__advances_time(scheduler):
+    scheduler.ready_actors()
+    assert scheduler.time == 1
+
+
+def test_ready_actors__player__never_scheduled(scheduler):
+    player = make_actor(refill=12, energy=0, scheduler=scheduler)
+    assert scheduler.ready_actors(player) == []
+    assert player not in scheduler.actors
+
+
+def test_ready_actors__normal_speed__ready_every_turn(scheduler):
+    a = make_actor(refill=12, energy=0, scheduler=scheduler)
+    assert scheduler.ready_actors() == [a]
+    burn_all(a)
+    scheduler.reschedule(a)
+    assert scheduler.ready_actors() == [a]
+
+
+def test_ready_actors__slow__sleeps(scheduler):
+    a = make_actor(refill=4, energy=0, scheduler=scheduler)
+    assert scheduler.ready_actors() == []
+    assert scheduler.ready_actors() == []
+    assert scheduler.ready_actors() == [a]
+    assert a.energy.energy == 12
+
+
+def test_ready_actors__no_refill__never_queued(scheduler):
+    make_actor(refill=0, energy=0, scheduler=scheduler)
+    assert scheduler.ready_actors() == []
+    assert scheduler.queue == []
+
+
+def test_ready_actors__actor_gone__dropped(scheduler):
+    a = make_actor(refill=12, energy=0, scheduler=scheduler)
+    scheduler.ready_actors()
+    burn_all(a)
+    scheduler.reschedule(a)
+    scheduler.remove(a)
+    assert scheduler.ready_actors() == []
+    assert a not in scheduler.actors
+
+
+def test_reschedule__dead_actor__dropped(scheduler):
+    a = make_actor(refill=12, energy=0, scheduler=scheduler)
+    scheduler.ready_actors()
+    a.fighter.hp = 0
+    scheduler.reschedule(a)
+    assert a not in scheduler.actors
+
+
+@pytest.mark.parametrize("refill, energy", [(3, 0), (5, 11), (12, 7), (13, 2), (24, 0), (30, 20), (0, 0)])
+def test_ready_actors__same_turns_as_polling(scheduler, refill, energy):
+    polled = make_actor(refill, energy)
+    scheduled = make_actor(refill, energy, scheduler)
+
+    for _ in range(50):
+        # The old way: Everyone gets energy every turn, then burns it.
+        polled.energy.add_energy()
+        expected = burn_all(polled)
+
+        result = 0
+        for actor in scheduler.ready_actors():
+            result += burn_all(actor)
+            scheduler.reschedule(actor)
+
+        assert result == expected
@@ -28,3 +28,16 @@ def test_new_game__first_msg():
 
 # TODO: Test load_game with mocks
 # def test_load_game
+
+
+def test_new_game__seed__same_dungeon():
+    game1 = setup_game.new_game(seed=5)
+    game2 = setup_game.new_game(seed=5)
+    assert (game1.game_map.tiles == game2.game_map.tiles).all()
+    assert sorted((e.name, e.xy) for e in game1.game_map.entities) == \
+        sorted((e.name, e.xy) for e in game2.game_map.entities)
+
+
+def test_new_game__seed__engine_rng():
+    game = setup_game.new_game(seed=5)
+    assert game.rng.seed == 5
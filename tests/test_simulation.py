@@ -0,0 +1,142 @@
+""" Tests for simulation.py """
+from actions.bump_action import BumpAction
+from actions.downstairs_action import DownStairsAction
+from actions.search_action import SearchAction
+from actions.wait_action import WaitAction
+from components import ai
+from src import db, player, simulation, tiles
+from src.engine import Engine
+from types import SimpleNamespace
+import copy
+import pytest
+import toolkit
+
+
+@pytest.fixture
+def sim():
+    return simulation.Simulation(policy=simulation.WaitPolicy(), max_turns=10)
+
+
+def test_Policy__choose_action__not_implemented(sim):
+    p = simulation.Policy()
+    with pytest.raises(NotImplementedError):
+        p.choose_action(sim.engine)
+
+
+def test_WaitPolicy__returns_WaitAction(sim):
+    result = simulation.WaitPolicy().choose_action(sim.engine)
+    assert isinstance(result, WaitAction)
+
+
+def test_RandomWalkPolicy__returns_BumpAction(sim):
+    result = simulation.RandomWalkPolicy(seed=1).choose_action(sim.engine)
+    assert isinstance(result, BumpAction)
+    assert (result.dx, result.dy) != (0, 0)
+
+
+def test_RandomWalkPolicy__same_seed_same_directions(sim):
+    p1 = simulation.RandomWalkPolicy(seed=5)
+    p2 = simulation.RandomWalkPolicy(seed=5)
+    dirs1 = [(a.dx, a.dy) for a in (p1.choose_action(sim.engine) for _ in range(10))]
+    dirs2 = [(a.dx, a.dy) for a in (p2.choose_action(sim.engine) for _ in range(10))]
+    assert dirs1 == dirs2
+
+
+def test_StairDiverPolicy__on_stairs__descends(sim):
+    player = sim.engine.player
+    player.x, player.y = sim.engine.game_map.downstairs_location
+    result = simulation.StairDiverPolicy().choose_action(sim.engine)
+    assert isinstance(result, DownStairsAction)
+
+
+def test_StairDiverPolicy__off_stairs__bumps(sim):
+    result = simulation.StairDiverPolicy(wander=0).choose_action(sim.engine)
+    assert isinstance(result, BumpAction)
+
+
+def test_StairDiverPolicy__hidden_blocker_on_path__searches():
+    # Wall off column 8 except for a hidden corridor at (8, 9), right next to the player.
+    m = toolkit.stair_map()
+    for y in range(9):
+        m.tiles[8, y] = tiles.wall
+    m.downstairs_location = (9, 9)
+    p = player.Player()
+    m.place(p, 7, 9)
+    m.place(copy.deepcopy(db.hidden_corridor), 8, 9)
+
+    engine = SimpleNamespace(player=p, game_map=m, dungeon=None)
+    result = simulation.StairDiverPolicy(wander=0).choose_action(engine)
+    assert isinstance(result, SearchAction)
+
+
+def test_Simulation__init__engine(sim):
+    assert isinstance(sim.engine, Engine)
+
+
+def test_Simulation__init__max_steps_default(sim):
+    assert sim.max_steps == 100
+
+
+def test_Simulation__step__advances_turn(sim):
+    assert sim.step()
+    assert sim.engine.turns == 1
+    assert sim.steps == 1
+
+
+def test_Simulation__next_action__uses_player_ai(sim):
+    sim.engine.player.add_comp(ai=ai.RestAI())
+    result = sim.next_action()
+    assert isinstance(result, WaitAction)
+
+
+def test_Simulation__next_action__ai_cannot_perform__ai_off(sim):
+    player = sim.engine.player
+    player.add_comp(ai=ai.TravelAI(player, player.x, player.y))  # Empty path
+    sim.next_action()
+    assert player.ai is None
+
+
+def test_Simulation__next_action__player_ai_before_auto_states(sim):
+    # Like main.py, the player's AI acts even when the player is paralyzed.
+    player = sim.engine.player
+    player.states.add_state("paralyzed", 5)
+    action = SearchAction(player)
+    player.add_comp(ai=SimpleNamespace(can_perform=lambda: True, yield_action=lambda: action))
+    assert sim.next_action() is action
+
+
+def test_Simulation__next_action__auto_states(sim):
+    sim.engine.player.states.add_state("paralyzed", 5)
+    assert isinstance(sim.next_action(), WaitAction)
+
+
+def test_Simulation__run__returns_GameResult(sim):
+    result = sim.run()
+    assert isinstance(result, simulation.GameResult)
+    assert result.turns == 10 or not result.alive
+
+
+def test_Simulation__run__max_steps_stops_stalled_policy():
+    class WallPolicy(simulation.Policy):
+        def choose_action(self, engine):
+            return BumpAction(engine.player, 0, 0)  # Attacking yourself is impossible
+
+    s = simulation.Simulation(policy=WallPolicy(), max_turns=10, max_steps=5)
+    result = s.run()
+    assert result.steps == 5
+    assert result.turns == 0
+
+
+def test_run_games__number_of_results():
+    results = simulation.run_games(2, simulation.WaitPolicy, max_turns=3, seed=1)
+    assert len(results) == 2
+
+
+def test_run_games__same_seed__same_results():
+    results1 = simulation.run_games(1, simulation.RandomWalkPolicy, max_turns=30, seed=4)
+    results2 = simulation.run_games(1, simulation.RandomWalkPolicy, max_turns=30, seed=4)
+    assert results1[0][:4] == results2[0][:4]
+
+
+def test_Simulation__init__no_pregeneration(sim):
+    assert not sim.engine.dungeon.pregenerate
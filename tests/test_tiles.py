@@ -108,3 +108,21 @@ def test_new_tile__stairs__walkable():
 def test_new_tile__stairs__transparent():
     stairs = tiles.down_stairs
     assert stairs['transparent']
+
+
+def test_pack__palette_of_distinct_tiles():
+    t = numpy.full((4, 3), fill_value=tiles.wall, order="F")
+    t[1, 1] = tiles.floor
+    palette, index = tiles.pack(t)
+    assert len(palette) == 2
+    assert index.dtype == numpy.uint8
+    assert index.shape == (12,)
+
+
+def test_unpack__same_tiles():
+    t = numpy.full((4, 3), fill_value=tiles.wall, order="F")
+    t[1, 2] = tiles.floor
+    t[3, 0] = tiles.door
+    result = tiles.unpack(*tiles.pack(t), t.shape)
+    assert result.dtype == tiles.tile_dt
+    assert (result == t).all()